@@ -4,7 +4,7 @@ from enum import Enum
 
 from PyQt5.QtCore import QLocale
 from qfluentwidgets import (qconfig, QConfig, ConfigItem, OptionsConfigItem, BoolValidator,
-                            OptionsValidator, Theme, ConfigSerializer)
+                            OptionsValidator, RangeConfigItem, RangeValidator, Theme, ConfigSerializer)
 
 from .setting import CONFIG_FILE, DEFAULT_DOWNLOAD_PATH
 
@@ -55,6 +55,12 @@ class Config(QConfig):
     
     # download settings
     downloadPath = ConfigItem("Download", "DownloadPath", DEFAULT_DOWNLOAD_PATH)
+    maxConcurrentDownloads = RangeConfigItem("Download", "MaxConcurrentDownloads", 3, RangeValidator(1, 10))
+    globalSpeedLimit = RangeConfigItem("Download", "GlobalSpeedLimit", 0, RangeValidator(0, 1024 * 1024))  # KB/s，0为不限速
+    taskSpeedLimit = RangeConfigItem("Download", "TaskSpeedLimit", 0, RangeValidator(0, 1024 * 1024))  # KB/s，0为不限速
+    cacheSizeLimit = RangeConfigItem("Download", "CacheSizeLimit", 0, RangeValidator(0, 1024 * 1024))  # MB，0为禁用缓存
+    downloadSegments = RangeConfigItem("Download", "Segments", 4, RangeValidator(1, 16))
+    writeBufferSize = RangeConfigItem("Download", "WriteBufferSize", 4, RangeValidator(1, 64))  # MB，单次写盘大小
 
 
 cfg = Config()
@@ -16,12 +16,22 @@ HOME_URL = "https://aslant.top"
 HELP_URL = "https://aslant.top"
 REPO_URL = "https://github.com/Y-ASLant/SuperAppStore"
 APPS_LIST_URL = "https://aslant.top/Demo_1/apps.json" # 应用列表JSON数据
+APPS_REVISION_URL = "https://aslant.top/Demo_1/apps.revision.json" # 应用列表版本号
+APPS_DELTA_URL = "https://aslant.top/Demo_1/apps.delta/{revision}.json" # 应用列表增量数据
 VERSION_URL = "https://aslant.top/Demo_1/version.json" # 版本信息JSON数据
 
 CONFIG_FOLDER = Path('AppData').absolute() # 配置文件夹
 CONFIG_FILE = CONFIG_FOLDER / "config.json" # 配置文件
 APPS_FILE = CONFIG_FOLDER / "apps.json" # 本地应用列表文件
+APPS_REVISION_FILE = CONFIG_FOLDER / "apps.revision.json" # 本地应用列表对应的版本号
+PINYIN_FILE = CONFIG_FOLDER / "apps.pinyin.json" # 应用名称的拼音缓存
+CATALOG_SNAPSHOT_FILE = CONFIG_FOLDER / "apps.snapshot" # 解析并建好索引的应用列表快照
+SEARCH_INDEX_SNAPSHOT_FILE = CONFIG_FOLDER / "apps.index.snapshot" # 应用列表的搜索索引快照
+VERSION_FILE = CONFIG_FOLDER / "version.json" # 本地版本信息文件
+HTTP_VALIDATORS_FILE = CONFIG_FOLDER / "http_validators.json" # 应用列表和版本信息的ETag/Last-Modified
 DOWNLOADED_APPS_FILE = CONFIG_FOLDER / "downloaded_apps.json" # 已下载应用记录文件
+VERIFIED_FILES_FILE = CONFIG_FOLDER / "verified_files.json" # 已校验文件记录
+CACHE_FOLDER = CONFIG_FOLDER / "cache" # 安装包缓存目录
 
 # 默认下载路径 - 从Windows注册表获取系统下载文件夹位置
 def get_default_download_path():
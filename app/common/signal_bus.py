@@ -8,7 +8,7 @@ class SignalBus(QObject):
     checkUpdateSig = pyqtSignal()
     micaEnableChanged = pyqtSignal(bool)
     animationEnableChanged = pyqtSignal(bool)
-    downloadApp = pyqtSignal(dict)  # 传递app_data字典
+    downloadApp = pyqtSignal(object)  # 传递应用目录中的 AppEntry
 
 
 signalBus = SignalBus()
\ No newline at end of file
@@ -0,0 +1,109 @@
+# coding: utf-8
+"""应用目录中的条目
+
+应用列表解析后每个应用是一个字典，应用较多时字典本身和其中大量重复的
+分类、格式等字符串占用了大部分内存。目录中的应用改为使用 ``AppEntry``：
+常用字段存放在 ``__slots__`` 中，重复的取值使用驻留字符串共用同一个对象。
+目录是应用数据的唯一来源，列表、信号和下载任务都引用目录中的同一个对象，
+不再复制。
+"""
+import sys
+from collections.abc import Mapping
+from itertools import repeat
+
+
+FIELDS = ('id', 'name', 'version', 'description', 'category', 'tags', 'format', 'publisher',
+          'size', 'update_date', 'download_url', 'sha256', 'block_manifest')
+FIELD_SET = frozenset(FIELDS)
+MISSING = ...  # 字段不存在，与值为 null 区分（JSON 中不会出现 Ellipsis）
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+_MISSING_VALUES = repeat(MISSING)
+
+
+class AppEntry(Mapping):
+    """应用目录中的一个应用
+
+    支持只读的字典访问，例如 ``entry['name']``、``entry.get('version', '')``，
+    与原来的应用字典用法相同；``dict(entry)`` 得到原始的字典。不在 FIELDS 中的
+    字段保存在 extra 中。
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, id=MISSING, name=MISSING, version=MISSING, description=MISSING,
+                 category=MISSING, tags=MISSING, format=MISSING, publisher=MISSING,
+                 size=MISSING, update_date=MISSING, download_url=MISSING, sha256=MISSING,
+                 block_manifest=MISSING, extra=None):
+        self.id = id
+        self.name = name
+        self.version = version
+        self.description = description
+        # 以下取值在很多应用之间重复，使用驻留字符串
+        self.category = sys.intern(category) if type(category) is str else category
+        self.tags = tuple(map(_intern, tags)) if isinstance(tags, (list, tuple)) else tags
+        self.format = sys.intern(format) if type(format) is str else format
+        self.publisher = sys.intern(publisher) if type(publisher) is str else publisher
+        self.size = size
+        self.update_date = update_date
+        self.download_url = download_url
+        self.sha256 = sha256
+        self.block_manifest = block_manifest
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """由应用字典创建"""
+        if type(data) is cls:  # 已经在目录中的应用
+            return data
+        extra = None
+        if not data.keys() <= FIELD_SET:
+            extra = {key: value for key, value in data.items() if key not in FIELD_SET}
+        return cls(*map(data.get, FIELDS, _MISSING_VALUES), extra)
+
+    @classmethod
+    def from_state(cls, state):
+        """由 state() 的结果创建"""
+        return cls(*state)
+
+    def state(self):
+        """所有字段的值，只包含内置类型，可以直接序列化"""
+        return (self.id, self.name, self.version, self.description, self.category, self.tags,
+                self.format, self.publisher, self.size, self.update_date, self.download_url,
+                self.sha256, self.block_manifest, self.extra)
+
+    def __getitem__(self, key):
+        if key in FIELD_SET:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key, MISSING) if self.extra else MISSING
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in FIELD_SET:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key, MISSING) if self.extra else MISSING
+        return default if value is MISSING else value
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field) is not MISSING:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"AppEntry({dict(self)!r})"
@@ -0,0 +1,247 @@
+# coding: utf-8
+"""应用列表同步
+
+应用列表较大时每次刷新都下载完整的 ``apps.json`` 既浪费流量也耗费解析时间，
+因此服务器以静态文件的形式额外发布版本号和增量数据::
+
+    apps.json                完整的应用列表
+    apps.revision.json       {"revision": 最新版本号, "oldest": 最早可增量更新的版本号}
+    apps.delta/<版本号>.json  {"revision": 版本号, "base": 版本号 - 1,
+                              "upsert": [新增或修改的应用], "remove": [删除的应用ID]}
+
+客户端记录本地列表对应的版本号，依次获取缺少的增量数据并在内存中合并，
+全部成功后一次性原子写入；版本相差过多、增量数据不可用或服务器未发布版本号
+时回退为下载完整列表。
+
+发布新版本时可用 ``python -m app.utils.catalog 新的apps.json 发布目录`` 生成
+上述文件。
+"""
+import json
+import os
+import sys
+
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..common.setting import APPS_DELTA_URL, APPS_FILE, APPS_LIST_URL, APPS_REVISION_FILE, APPS_REVISION_URL
+from . import http_client
+from .catalog_snapshot import snapshot_matches
+from .http_cache import conditional_get, save_response, validators
+
+
+MAX_DELTA_STEPS = 20  # 最多依次应用的增量数量，超出后直接下载完整列表
+
+
+def app_id(app):
+    """应用的唯一标识"""
+    return app.get('id', app['name'])
+
+
+def load_apps_list():
+    """读取本地保存的应用列表，不存在或损坏时返回空列表"""
+    try:
+        if os.path.exists(APPS_FILE):
+            with open(APPS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"读取应用列表出错: {e}")
+    return []
+
+
+def fetch_apps_list(timeout=5):
+    """从服务器获取完整的应用列表
+
+    使用条件请求，服务器返回304时既不写入文件也不解析内容。写入是原子的，
+    写入中断时不会破坏上一次的有效列表。
+
+    Returns:
+        list: 内容有变化时返回新的应用列表并写入本地文件，与本地一致时返回None
+    """
+    response = conditional_get(APPS_LIST_URL, APPS_FILE, timeout=timeout)
+    if response is None:
+        return None
+
+    apps = json.loads(response.content)
+    if not isinstance(apps, list):
+        raise ValueError("应用列表格式错误")
+
+    if not save_response(APPS_LIST_URL, response, APPS_FILE):
+        return None
+    print(f"应用列表已更新: {APPS_FILE}")
+    return apps
+
+
+def sync_apps_list(timeout=5):
+    """按版本号同步应用列表，优先使用增量数据
+
+    本地应用列表不存在或已损坏时，本地记录的版本号和校验值都不再可信，
+    直接下载完整列表。版本号无法获取或解析（服务器没有发布、返回错误或
+    内容格式不对）时同样回退为下载完整列表。
+
+    Returns:
+        list: 内容有变化时返回新的应用列表并写入本地文件，没有变化时返回None
+    """
+    local_valid = _local_list_valid()
+    if not local_valid:
+        validators.set(APPS_REVISION_URL, '', '')
+        validators.set(APPS_LIST_URL, '', '')
+
+    try:
+        response = conditional_get(APPS_REVISION_URL, APPS_REVISION_FILE, timeout=timeout)
+        if response is None:
+            return None  # 版本号未变化
+        remote = response.json()
+        latest = int(remote['revision'])
+        oldest = int(remote.get('oldest', latest))
+    except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+        print(f"获取应用列表版本号失败，改为下载完整列表: {e}")
+        return fetch_apps_list(timeout)
+
+    local = _local_revision() if local_valid else None
+
+    if local == latest:
+        apps = None
+    elif local is None or local > latest or local < oldest or latest - local > MAX_DELTA_STEPS:
+        apps = fetch_apps_list(timeout)
+    else:
+        apps = _apply_deltas(local, latest, timeout)
+
+    # 应用列表写入成功后才记录新的版本号
+    save_response(APPS_REVISION_URL, response, APPS_REVISION_FILE)
+    return apps
+
+
+def merge_delta(apps, delta):
+    """将一个增量合并到应用列表，修改的应用保持原位置，新增的应用追加到末尾"""
+    removed = set(delta.get('remove', []))
+    upserts = {app_id(app): app for app in delta.get('upsert', [])}
+
+    merged = []
+    for app in apps:
+        key = app_id(app)
+        if key in removed:
+            continue
+        merged.append(upserts.pop(key, app))
+    merged.extend(upserts.values())
+    return merged
+
+
+def make_delta(old_apps, new_apps, revision):
+    """比较两个版本的应用列表，生成增量数据"""
+    old = {app_id(app): app for app in old_apps}
+    new_ids = set()
+    upsert = []
+    for app in new_apps:
+        key = app_id(app)
+        new_ids.add(key)
+        if old.get(key) != app:
+            upsert.append(app)
+    remove = [key for key in old if key not in new_ids]
+    return {'revision': revision, 'base': revision - 1, 'upsert': upsert, 'remove': remove}
+
+
+def _local_list_valid():
+    """本地应用列表是否存在且可以解析，与应用目录快照一致时无需重新解析"""
+    if not os.path.exists(APPS_FILE):
+        return False
+    if snapshot_matches(APPS_FILE):
+        return True
+    try:
+        with open(APPS_FILE, 'r', encoding='utf-8') as f:
+            return isinstance(json.load(f), list)
+    except Exception:
+        return False
+
+
+def _local_revision():
+    """本地应用列表对应的版本号，未知时返回None"""
+    if not os.path.exists(APPS_FILE):
+        return None
+    try:
+        with open(APPS_REVISION_FILE, 'r', encoding='utf-8') as f:
+            return int(json.load(f)['revision'])
+    except Exception:
+        return None
+
+
+def _apply_deltas(local, latest, timeout):
+    """依次获取并合并 local 之后的增量，任何一步失败时回退为下载完整列表"""
+    try:
+        with open(APPS_FILE, 'r', encoding='utf-8') as f:
+            apps = json.load(f)
+        for revision in range(local + 1, latest + 1):
+            url = APPS_DELTA_URL.format(revision=revision)
+            with http_client.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                delta = response.json()
+            if delta.get('base') != revision - 1:
+                raise ValueError(f"增量数据版本不连续: {url}")
+            apps = merge_delta(apps, delta)
+    except Exception as e:
+        print(f"增量同步应用列表失败，改为下载完整列表: {e}")
+        return fetch_apps_list(timeout)
+
+    tmp_path = f"{APPS_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(apps, f, ensure_ascii=False)
+    os.replace(tmp_path, APPS_FILE)
+    # 本地文件已不是上次完整下载的内容，不能再用其校验值发送条件请求
+    validators.set(APPS_LIST_URL, '', '')
+    print(f"应用列表已增量更新到版本 {latest}")
+    return apps
+
+
+def publish(apps_path, folder):
+    """将新的应用列表发布到目录，生成完整列表、版本号和增量数据"""
+    with open(apps_path, 'r', encoding='utf-8') as f:
+        new_apps = json.load(f)
+
+    revision_path = os.path.join(folder, "apps.revision.json")
+    list_path = os.path.join(folder, "apps.json")
+    if os.path.exists(revision_path) and os.path.exists(list_path):
+        with open(revision_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        with open(list_path, 'r', encoding='utf-8') as f:
+            old_apps = json.load(f)
+        revision = state['revision'] + 1
+        oldest = state.get('oldest', state['revision'])
+        delta = make_delta(old_apps, new_apps, revision)
+        os.makedirs(os.path.join(folder, "apps.delta"), exist_ok=True)
+        with open(os.path.join(folder, "apps.delta", f"{revision}.json"), 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False)
+    else:
+        revision = oldest = 1
+
+    with open(list_path, 'w', encoding='utf-8') as f:
+        json.dump(new_apps, f, ensure_ascii=False)
+    with open(revision_path, 'w', encoding='utf-8') as f:
+        json.dump({'revision': revision, 'oldest': oldest}, f)
+    return revision
+
+
+class FetchAppsThread(QThread):
+    """后台获取应用列表线程
+
+    界面启动时先显示本地保存的应用列表，再由该线程向服务器确认是否有更新，
+    网络缓慢或不可用时不会阻塞界面。
+    """
+    fetchFinished = pyqtSignal(bool, bool, object)  # 是否成功，是否有变化，新的应用列表（不经QVariant复制）
+
+    def run(self):
+        try:
+            apps = sync_apps_list()
+            if apps is None:
+                self.fetchFinished.emit(True, False, [])
+            else:
+                self.fetchFinished.emit(True, True, apps)
+        except Exception as e:
+            print(f"获取应用列表出错: {str(e)}")
+            self.fetchFinished.emit(False, False, [])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("用法: python -m app.utils.catalog 新的apps.json 发布目录")
+        sys.exit(1)
+
+    print(f"已发布应用列表版本: {publish(sys.argv[1], sys.argv[2])}")
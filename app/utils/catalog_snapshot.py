@@ -0,0 +1,98 @@
+# coding: utf-8
+"""应用目录的二进制快照
+
+每次启动都解析 ``apps.json`` 并重新计算排序键和分面索引，应用较多时明显
+拖慢启动。目录建好后将其数据和索引以二进制形式保存在应用列表旁，下次启动
+时源文件没有变化就直接从快照恢复。
+
+文件由定长的文件头和 ``marshal`` 序列化的内容组成::
+
+    魔数 | 格式版本 | Python版本 | 源文件大小 | 源文件修改时间 | 源文件SHA-256 | 内容
+
+读取时通过 mmap 映射文件，内容直接从映射的内存反序列化。``marshal`` 的格式
+随 Python 版本变化，因此 Python 版本不同时快照失效。源文件的大小和修改时间
+一致时认为快照有效；只有修改时间不同时再比较哈希，内容相同的快照仍然可用。
+
+搜索索引在后台线程中建立，单独保存为同样格式的快照（同样以 ``apps.json``
+校验），启动时目录快照不必连同索引一起读取，更新索引后也不必重写目录快照。
+"""
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+from ..common.setting import CATALOG_SNAPSHOT_FILE
+
+
+SNAPSHOT_MAGIC = b'SASNAP\r\n'
+SNAPSHOT_VERSION = 2
+HEADER = struct.Struct('<8sII QQ 32s')  # 魔数、格式版本、Python版本、源文件大小、修改时间(ns)、SHA-256
+PYTHON_VERSION = sys.version_info[0] << 8 | sys.version_info[1]
+
+
+def _file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').digest()
+
+
+def _header_matches(header, source_path):
+    """文件头是否与当前的源文件对应"""
+    magic, version, python, size, mtime, digest = HEADER.unpack_from(header)
+    if (magic, version, python) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, PYTHON_VERSION):
+        return False
+    stat = os.stat(source_path)
+    if size != stat.st_size:
+        return False
+    return mtime == stat.st_mtime_ns or digest == _file_digest(source_path)
+
+
+def snapshot_matches(source_path, path=CATALOG_SNAPSHOT_FILE):
+    """快照是否与源文件对应，只读取文件头，可用来确认源文件曾被成功解析"""
+    try:
+        if not os.path.exists(source_path) or not os.path.exists(path):
+            return False
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        return len(header) == HEADER.size and _header_matches(header, source_path)
+    except Exception as e:
+        print(f"读取应用目录快照出错: {e}")
+    return False
+
+
+def load_snapshot(source_path, path=CATALOG_SNAPSHOT_FILE):
+    """读取与源文件对应的快照
+
+    Returns:
+        快照内容，快照不存在、已损坏或源文件已变化时返回None
+    """
+    try:
+        if not os.path.exists(source_path) or not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            return None
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if not _header_matches(data, source_path):
+                return None
+            with memoryview(data) as view, view[HEADER.size:] as content:
+                return marshal.loads(content)
+    except Exception as e:
+        print(f"读取应用目录快照出错: {e}")
+    return None
+
+
+def save_snapshot(state, source_path, path=CATALOG_SNAPSHOT_FILE):
+    """保存快照，state 只能包含内置类型，写入是原子的"""
+    try:
+        stat = os.stat(source_path)
+        header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, PYTHON_VERSION,
+                             stat.st_size, stat.st_mtime_ns, _file_digest(source_path))
+        content = marshal.dumps(state)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"保存应用目录快照出错: {e}")
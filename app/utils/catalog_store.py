@@ -0,0 +1,304 @@
+# coding: utf-8
+import os
+import re
+from datetime import datetime
+from enum import Enum
+from urllib.parse import urlsplit
+
+from PyQt5.QtCore import QCollator, QLocale, Qt
+
+from ..common.setting import APPS_FILE
+from .app_entry import AppEntry
+from .catalog import load_apps_list
+from .catalog_snapshot import load_snapshot, save_snapshot
+
+
+class SortKey(Enum):
+    """排序方式"""
+    DEFAULT = "default"  # 应用列表中的原始顺序
+    NAME = "name"  # 名称（按中文习惯排序，数字按数值比较）
+    SIZE = "size"  # 大小，从大到小
+    UPDATED = "updated"  # 更新时间，从新到旧
+    VERSION = "version"  # 版本号，从高到低
+
+
+FACETS = ('category', 'tags', 'format', 'publisher')  # 建立分面索引的字段
+UNCATEGORIZED = '其他'  # 没有分类的应用归入的分类
+
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+              'G': 1024 ** 3, 'GB': 1024 ** 3, 'T': 1024 ** 4, 'TB': 1024 ** 4}
+
+
+def parse_size(value):
+    """解析大小，支持字节数或 ``"12.5 MB"`` 形式的字符串，无法解析时返回None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B?)\s*', value.upper())
+        if match:
+            try:
+                return float(match.group(1)) * SIZE_UNITS[match.group(2)]
+            except ValueError:
+                pass
+    return None
+
+
+def parse_date(value):
+    """解析更新时间，支持时间戳或ISO格式的日期，无法解析时返回None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+        except (ValueError, OverflowError, OSError):
+            pass
+    return None
+
+
+def parse_version(value):
+    """解析版本号为整数元组，例如 ``"v1.10.2-beta"`` -> ``(1, 10, 2)``"""
+    return tuple(int(part) for part in re.findall(r'\d+', str(value or '')))
+
+
+def app_format(app):
+    """应用的文件格式，未指定时取下载链接的扩展名，例如 ``"zip"``"""
+    value = app.get('format')
+    if not value:
+        value = os.path.splitext(urlsplit(app.get('download_url') or '').path)[1].lstrip('.')
+    return value.lower() or None
+
+
+def facet_values(app, facet):
+    """应用在某个分面上的取值，可能有多个"""
+    if facet == 'category':
+        return [app.get('category') or UNCATEGORIZED]
+    if facet == 'format':
+        value = app_format(app)
+        return [value] if value else []
+    value = app.get(facet)
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str) and item]
+    return [value] if isinstance(value, str) and value else []
+
+
+def positions_to_bits(positions, size):
+    """一组位置 -> 位集合（第 i 位为1表示包含位置 i 的应用）"""
+    flags = bytearray((size + 7) // 8)
+    for position in positions:
+        flags[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(flags, 'little')
+
+
+def bits_to_positions(bits):
+    """位集合 -> 从小到大的位置列表"""
+    positions = []
+    binary = bin(bits)[:1:-1]  # 去掉 "0b" 并反转，下标即位置
+    position = binary.find('1')
+    while position != -1:
+        positions.append(position)
+        position = binary.find('1', position + 1)
+    return positions
+
+
+class CatalogStore:
+    """应用目录
+
+    加载时为每个应用计算好各种排序所需的键，每种排序方式的结果以位置的
+    排列保存，首次使用时计算并缓存。对搜索结果等子集排序时只需按预先计算
+    的名次比较整数，不再访问应用数据。
+
+    应用以其在列表中的位置标识，位置在目录重新加载之前保持不变；同名或
+    重复ID的应用也各自占有一个位置。
+
+    目录中的应用保存为 AppEntry，是应用数据的唯一来源，界面和下载任务都
+    引用这里的对象。
+
+    同时为分类、标签、格式和发布者建立分面索引：每个取值对应一个位集合
+    （Python 整数，第 i 位表示位置 i 的应用），分类页面和筛选条件都是这些
+    位集合的交集，可直接统计数量，查询时不再遍历应用列表。
+    """
+
+    def __init__(self, apps=()):
+        self.apps = [AppEntry.from_dict(app) for app in apps]
+        self.ids = [app.get('id', app['name']) for app in self.apps]
+        self._facets = self._build_facets()
+        self._keys = {
+            SortKey.NAME: self._name_ranks(),
+            SortKey.SIZE: self._descending([parse_size(app.get('size')) for app in self.apps]),
+            SortKey.UPDATED: self._descending([parse_date(app.get('update_date')) for app in self.apps]),
+            SortKey.VERSION: self._descending([parse_version(app.get('version')) or None for app in self.apps]),
+        }
+        self._init_lookups()
+
+    @classmethod
+    def from_snapshot(cls, state):
+        """从 snapshot() 的结果恢复目录，不再重新计算排序键和分面索引"""
+        store = cls.__new__(cls)
+        store.apps = [AppEntry.from_state(values) for values in state['apps']]
+        store.ids = state['ids']
+        store._facets = state['facets']
+        store._keys = {SortKey(key): values for key, values in state['keys'].items()}
+        if not (len(store.ids) == len(store.apps)
+                and all(len(values) == len(store.apps) for values in store._keys.values())
+                and store._facets.keys() == set(FACETS)):
+            raise ValueError("快照数据不完整")
+        store._init_lookups()
+        return store
+
+    def snapshot(self):
+        """目录的全部数据和索引，只包含内置类型，可以直接序列化"""
+        return {
+            'apps': [app.state() for app in self.apps],
+            'ids': self.ids,
+            'facets': self._facets,
+            'keys': {key.value: values for key, values in self._keys.items()},
+        }
+
+    def __len__(self):
+        return len(self.apps)
+
+    def facet_counts(self, facet, bits=None):
+        """分面上每个取值的应用数量，bits 不为None时只统计其中的应用
+
+        Returns:
+            dict: {取值: 数量}，按数量从多到少排列，不包含数量为0的取值
+        """
+        counts = {}
+        for value, value_bits in self._facets[facet].items():
+            count = (value_bits if bits is None else value_bits & bits).bit_count()
+            if count:
+                counts[value] = count
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def facet_bits(self, facet, value):
+        """分面上取值为 value 的应用的位集合"""
+        return self._facets[facet].get(value, 0)
+
+    def select(self, bits=None, **filters):
+        """按分面筛选，返回位集合
+
+        每个参数是一个分面，值为单个取值或取值列表（满足其一即可），
+        不同分面之间取交集，例如 ``select(category='游戏', format=['zip', '7z'])``。
+        """
+        result = self.all_bits if bits is None else bits
+        for facet, values in filters.items():
+            if isinstance(values, str):
+                values = [values]
+            value_bits = 0
+            for value in values:
+                value_bits |= self.facet_bits(facet, value)
+            result &= value_bits
+        return result
+
+    def bits_of(self, positions):
+        """一组位置的位集合"""
+        return positions_to_bits(positions, len(self.apps))
+
+    def positions(self, bits):
+        """位集合中的位置，从小到大排列"""
+        return bits_to_positions(bits)
+
+    def position(self, app_id):
+        """应用ID对应的位置，不存在时返回None"""
+        return self._positions.get(app_id)
+
+    def order(self, sort_key=SortKey.DEFAULT):
+        """按指定方式排列的所有位置"""
+        order = self._orders.get(sort_key)
+        if order is None:
+            keys = self._keys[sort_key]
+            order = self._orders[sort_key] = sorted(range(len(self.apps)), key=keys.__getitem__)
+        return order
+
+    def rank(self, sort_key=SortKey.DEFAULT):
+        """位置 -> 按指定方式排列后的名次"""
+        ranks = self._ranks.get(sort_key)
+        if ranks is None:
+            ranks = [0] * len(self.apps)
+            for rank, position in enumerate(self.order(sort_key)):
+                ranks[position] = rank
+            self._ranks[sort_key] = ranks
+        return ranks
+
+    def sort(self, positions, sort_key=SortKey.DEFAULT):
+        """按指定方式排列一组位置"""
+        return sorted(positions, key=self.rank(sort_key).__getitem__)
+
+    def _init_lookups(self):
+        """根据应用列表建立ID索引和排序缓存"""
+        self._positions = {}
+        for position, app_id in enumerate(self.ids):
+            self._positions.setdefault(app_id, position)
+        self.all_bits = (1 << len(self.apps)) - 1
+        self._orders = {SortKey.DEFAULT: list(range(len(self.apps)))}
+        self._ranks = {SortKey.DEFAULT: self._orders[SortKey.DEFAULT]}
+
+    def _build_facets(self):
+        """遍历一次应用列表，建立所有分面的位集合"""
+        flags = {facet: {} for facet in FACETS}
+        size = (len(self.apps) + 7) // 8
+        for position, app in enumerate(self.apps):
+            byte, bit = position >> 3, 1 << (position & 7)
+            for facet in FACETS:
+                for value in facet_values(app, facet):
+                    value_flags = flags[facet].get(value)
+                    if value_flags is None:
+                        value_flags = flags[facet][value] = bytearray(size)
+                    value_flags[byte] |= bit
+        return {
+            facet: {value: int.from_bytes(value_flags, 'little') for value, value_flags in values.items()}
+            for facet, values in flags.items()
+        }
+
+    def _name_ranks(self):
+        """名称的排序键：按本地化规则比较一次后得到的名次，名称相同的名次相同"""
+        collator = QCollator(QLocale(QLocale.Chinese, QLocale.China))
+        collator.setNumericMode(True)
+        collator.setCaseSensitivity(Qt.CaseInsensitive)
+
+        names = sorted({app['name'] for app in self.apps}, key=collator.sortKey)
+        ranks = {name: rank for rank, name in enumerate(names)}
+        return [ranks[app['name']] for app in self.apps]
+
+    @staticmethod
+    def _descending(values):
+        """从大到小排序的键，缺失的值排在最后"""
+        ranks = {value: rank for rank, value in enumerate(sorted({v for v in values if v is not None}, reverse=True))}
+        missing = len(ranks)
+        return [missing if value is None else ranks[value] for value in values]
+
+
+_shared_store = None
+
+
+def shared_store():
+    """进程内共享的应用目录
+
+    首次调用时加载：本地应用列表没有变化时从快照恢复，否则解析应用列表、
+    建立索引并保存快照。应用列表界面和下载界面都从这里读取，同一次启动中
+    只加载一次。
+    """
+    global _shared_store
+    if _shared_store is None:
+        state = load_snapshot(APPS_FILE)
+        if state is not None:
+            try:
+                _shared_store = CatalogStore.from_snapshot(state)
+            except Exception as e:
+                print(f"恢复应用目录快照出错: {e}")
+        if _shared_store is None:
+            update_shared_store(load_apps_list())
+    return _shared_store
+
+
+def update_shared_store(apps):
+    """用新的应用列表替换共享的应用目录并保存快照
+
+    apps 应与本地应用列表文件的内容一致（获取或增量更新后已写入该文件），
+    快照以该文件的大小、修改时间和哈希判断是否有效。
+    """
+    global _shared_store
+    _shared_store = CatalogStore(apps)
+    if _shared_store.apps and os.path.exists(APPS_FILE):
+        save_snapshot(_shared_store.snapshot(), APPS_FILE)
+    return _shared_store
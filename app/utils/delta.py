@@ -0,0 +1,346 @@
+# coding: utf-8
+"""分块增量更新
+
+参照zsync的思路：服务器为新版本安装包发布一份分块校验清单（每个数据块的
+弱校验和与强哈希），客户端用滚动校验和在旧版本文件中查找内容相同的数据块
+并直接复用，只通过Range请求下载发生变化的部分。
+
+清单格式（JSON）::
+
+    {
+        "version": 1,
+        "block_size": 65536,
+        "size": 文件总大小,
+        "sha256": 文件SHA-256,
+        "blocks": [[弱校验和, 强哈希], ...]
+    }
+
+服务器端可用 ``python -m app.utils.delta 文件路径 [块大小]`` 生成清单，
+输出到 ``文件路径.blocks.json``。
+"""
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import sys
+import time
+
+from . import http_client
+from .downloader import CancelToken, DownloadCancelled, DownloadError
+from .integrity import IntegrityError
+from .rate_limiter import global_limiter
+from .retry import RetryPolicy, TransientError, call_with_retry
+
+
+MANIFEST_VERSION = 1
+DEFAULT_BLOCK_SIZE = 64 * 1024
+# 逐字节滚动查找在Python中约每秒2MB且占用GIL，只在限定的时间内进行，超出后只按块对齐查找
+ROLLING_SCAN_TIME = 0.5  # 秒
+ROLLING_CHECK_INTERVAL = 64 * 1024  # 每滚动这么多字节检查一次用时
+MAX_RANGE_SIZE = 8 * 1024 * 1024  # 合并后单次Range请求的最大字节数
+DELTA_SUFFIX = ".delta.part"  # 增量下载的临时文件后缀，与完整下载的 .part 文件分开
+
+
+def weak_checksum(data):
+    """rsync风格的弱校验和，返回 (a, b)"""
+    a = sum(data) & 0xffff
+    # b = Σ(L - i) * x_i，等于各前缀和之和
+    b = sum(itertools.accumulate(data)) & 0xffff
+    return a, b
+
+
+def strong_hash(data):
+    """数据块的强哈希"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def build_manifest(path, block_size=DEFAULT_BLOCK_SIZE):
+    """为文件生成分块校验清单"""
+    blocks = []
+    file_hash = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            a, b = weak_checksum(data)
+            blocks.append([a | (b << 16), strong_hash(data)])
+            file_hash.update(data)
+            size += len(data)
+
+    return {
+        'version': MANIFEST_VERSION,
+        'block_size': block_size,
+        'size': size,
+        'sha256': file_hash.hexdigest(),
+        'blocks': blocks,
+    }
+
+
+def match_blocks(manifest, old_path):
+    """在旧文件中查找与清单中相同的数据块
+
+    在文件开头和每次命中之后，先直接比较下一个数据块的强哈希（由C实现，比在
+    Python中计算弱校验和快得多），内容未移动或整体错位的区域都能以接近读取
+    文件的速度扫描。不命中时才逐字节滚动弱校验和查找错位的数据块；滚动查找
+    只在 ROLLING_SCAN_TIME 内进行，超出后按块跳过，大文件中零散错位的数据块
+    可能找不到，改为下载。
+
+    Returns:
+        dict: 块序号 -> 旧文件中的偏移位置
+    """
+    block_size = manifest['block_size']
+    size = manifest['size']
+    full_blocks = size // block_size  # 末尾不足一块的数据直接下载
+
+    weak_map, strong_map = {}, {}
+    for index, (weak, strong) in enumerate(manifest['blocks'][:full_blocks]):
+        weak_map.setdefault(weak, []).append(index)
+        strong_map.setdefault(strong, []).append(index)
+
+    found = {}
+    if not weak_map or os.path.getsize(old_path) < block_size:
+        return found
+
+    def take(indices):
+        """记录命中的数据块，返回是否有新命中"""
+        matched = [index for index in indices or () if index not in found]
+        for index in matched:
+            found[index] = pos
+        return bool(matched)
+
+    with open(old_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        length = len(data)
+        deadline = time.monotonic() + ROLLING_SCAN_TIME
+        rolling = True
+        scan_budget = ROLLING_CHECK_INTERVAL
+        pos = 0
+        a = b = None  # 当前位置的弱校验和，尚未计算时为None
+
+        while pos + block_size <= length:
+            if a is None:
+                if take(strong_map.get(strong_hash(data[pos:pos + block_size]))):
+                    pos += block_size
+                    continue
+                if not rolling:
+                    pos += block_size
+                    continue
+                a, b = weak_checksum(data[pos:pos + block_size])
+            else:
+                indices = weak_map.get(a | (b << 16))
+                if indices and take(strong_map.get(strong_hash(data[pos:pos + block_size]))):
+                    pos += block_size
+                    a = b = None
+                    continue
+
+            if scan_budget <= 0:
+                scan_budget = ROLLING_CHECK_INTERVAL
+                rolling = time.monotonic() < deadline
+                if not rolling:
+                    # 超出滚动查找时间，之后只按块跳过
+                    pos += block_size
+                    a = b = None
+                    continue
+
+            # 滚动一个字节
+            if pos + block_size >= length:
+                break
+            out_byte = data[pos]
+            in_byte = data[pos + block_size]
+            a = (a - out_byte + in_byte) & 0xffff
+            b = (b - block_size * out_byte + a) & 0xffff
+            pos += 1
+            scan_budget -= 1
+
+    return found
+
+
+def plan_ranges(manifest, found):
+    """将需要下载的数据块合并为连续区间 [(start, end), ...]（闭区间）"""
+    block_size = manifest['block_size']
+    size = manifest['size']
+    ranges = []
+    for index in range(len(manifest['blocks'])):
+        if index in found:
+            continue
+        start = index * block_size
+        end = min(start + block_size, size) - 1
+        if ranges and ranges[-1][1] + 1 == start and end - ranges[-1][0] < MAX_RANGE_SIZE:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+class DeltaDownloader:
+    """增量下载器
+
+    复用旧版本文件中相同的数据块，只下载变化的部分，按顺序写入临时文件的
+    同时计算SHA-256，校验通过后重命名为目标文件。
+
+    临时文件不使用完整下载的 ``.part`` 文件：增量下载失败后会回退为完整下载，
+    不能破坏其中已暂停的下载数据。增量下载不支持续传，失败或取消时删除临时文件。
+    """
+
+    def __init__(self, url, manifest_url, old_path, save_path, timeout=None,
+                 progress_callback=None, rate_limiter=None, retry_policy=None, retry_callback=None,
+                 cancel_token=None):
+        self.url = url
+        self.manifest_url = manifest_url
+        self.old_path = old_path
+        self.save_path = save_path
+        self.part_path = save_path + DELTA_SUFFIX
+        self.timeout = timeout
+        self.progress_callback = progress_callback
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_callback = retry_callback
+
+        self.total_size = 0
+        self.downloaded_size = 0  # 已处理的字节数（包括复用的）
+        self.fetched_size = 0  # 实际从网络下载的字节数
+        self.reused_size = 0  # 从旧文件复用的字节数
+        self.sha256 = None
+        self._cancel_event = cancel_token or CancelToken()
+
+    def cancel(self):
+        """取消下载"""
+        self._cancel_event.set()
+
+    def run(self):
+        """执行增量下载，失败时抛出异常"""
+        manifest = call_with_retry(self._fetch_manifest, self.retry_policy,
+                                   self._cancel_event, self.retry_callback)
+
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise DownloadError(f"不支持的分块清单版本: {manifest.get('version')}")
+
+        self.total_size = manifest['size']
+        found = match_blocks(manifest, self.old_path)
+        ranges = plan_ranges(manifest, found)
+
+        os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
+        file_hash = hashlib.sha256()
+        try:
+            self._assemble(manifest, found, ranges, file_hash)
+        except BaseException:
+            self._discard()
+            raise
+
+        digest = file_hash.hexdigest()
+        if digest != manifest['sha256'].lower():
+            self._discard()
+            raise IntegrityError(f"SHA-256校验失败: 应为 {manifest['sha256']}，实际为 {digest}")
+
+        self.sha256 = digest
+        os.replace(self.part_path, self.save_path)
+
+    def _assemble(self, manifest, found, ranges, file_hash):
+        """按顺序写入复用的数据块和下载的区间"""
+        block_size = manifest['block_size']
+        with open(self.old_path, 'rb') as old_file, open(self.part_path, 'wb') as f:
+            pending = iter(ranges)
+            next_range = next(pending, None)
+            index = 0
+            block_count = len(manifest['blocks'])
+
+            while index < block_count:
+                if self._cancel_event.is_set():
+                    raise DownloadCancelled("下载已取消")
+
+                if index in found:
+                    # 复用旧文件中的数据块
+                    old_file.seek(found[index])
+                    data = old_file.read(block_size)
+                    f.write(data)
+                    file_hash.update(data)
+                    self.reused_size += len(data)
+                    self._report(len(data))
+                    index += 1
+                else:
+                    # 下载变化的区间
+                    start, end = next_range
+                    written = self._fetch_range(start, end, f, file_hash)
+                    if written != end - start + 1:
+                        raise DownloadError(f"分段数据不完整: {written}/{end - start + 1}")
+                    index = (end + 1 + block_size - 1) // block_size
+                    next_range = next(pending, None)
+
+    def _discard(self):
+        try:
+            if os.path.exists(self.part_path):
+                os.remove(self.part_path)
+        except OSError as e:
+            print(f"删除增量下载临时文件出错: {e}")
+
+    def _fetch_manifest(self):
+        with http_client.get(self.manifest_url, timeout=self.timeout) as response:
+            response.raise_for_status()
+            return response.json()
+
+    def _fetch_range(self, start, end, f, file_hash):
+        """下载一个区间并顺序写入文件，临时错误时从已写入的位置重试"""
+        policy = self.retry_policy
+        written = 0
+        failures = 0
+        while True:
+            received = written
+            try:
+                written += self._fetch_range_once(start + written, end, f, file_hash)
+                return written
+            except DownloadCancelled:
+                raise
+            except Exception as e:
+                written = f.tell() - start
+                failures = 1 if written > received else failures + 1
+                if failures >= policy.max_attempts or not policy.is_retryable(e):
+                    raise
+                delay = policy.get_delay(failures, e)
+                if self.retry_callback:
+                    self.retry_callback(failures + 1, policy.max_attempts)
+                if not policy.sleep(delay, self._cancel_event):
+                    raise DownloadCancelled("下载已取消")
+
+    def _fetch_range_once(self, start, end, f, file_hash):
+        headers = {'Range': f'bytes={start}-{end}'}
+        written = 0
+        with http_client.get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise DownloadError("服务器不支持Range请求，无法增量下载")
+
+            for chunk in response.iter_content(chunk_size=DEFAULT_BLOCK_SIZE):
+                if self._cancel_event.is_set():
+                    raise DownloadCancelled("下载已取消")
+                if chunk:
+                    f.write(chunk)
+                    file_hash.update(chunk)
+                    written += len(chunk)
+                    self.fetched_size += len(chunk)
+                    self._report(len(chunk))
+                    if self.rate_limiter:
+                        self.rate_limiter.consume(len(chunk), self._cancel_event)
+                    global_limiter.consume(len(chunk), self._cancel_event)
+
+        if written != end - start + 1:
+            raise TransientError(f"连接提前关闭，分段数据不完整: {written}/{end - start + 1}")
+        return written
+
+    def _report(self, size):
+        self.downloaded_size += size
+        if self.progress_callback:
+            self.progress_callback(self.downloaded_size, self.total_size)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("用法: python -m app.utils.delta 文件路径 [块大小]")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BLOCK_SIZE
+    with open(f"{file_path}.blocks.json", 'w', encoding='utf-8') as output:
+        json.dump(build_manifest(file_path, size), output)
+    print(f"已生成分块清单: {file_path}.blocks.json")
@@ -0,0 +1,229 @@
+# coding: utf-8
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+from ..common.setting import CACHE_FOLDER
+
+
+COPY_SIZE = 1024 * 1024  # 复制文件时的块大小
+
+class DownloadCache:
+    """按内容寻址的本地安装包缓存
+
+    缓存对象以SHA-256（已知时）或 URL+ETag 的哈希为键保存在缓存目录中，
+    需要时还原到下载目录，无需重新下载。缓存总大小超过上限时按最近最少
+    使用的顺序淘汰，上限为0（默认）时不缓存。
+
+    放入和还原都是复制而不是硬链接：硬链接与下载目录中的文件共用同一份
+    数据，用户修改下载的文件会同时破坏缓存。复制的同时计算SHA-256并记录
+    在索引中，还原时再次计算，与记录不一致的缓存对象直接丢弃。
+    """
+
+    def __init__(self, folder=CACHE_FOLDER, size_limit=0):
+        self.folder = str(folder)
+        self.index_path = os.path.join(self.folder, "index.json")
+        self.size_limit = size_limit  # 字节，0表示禁用缓存
+        self._lock = threading.Lock()
+        self._entries = {}  # 键 -> {'size': 文件大小, 'sha256': 内容哈希, 'last_access': 最近使用时间}
+        self._queue = queue.Queue()  # 等待在后台放入缓存的文件
+        self._worker = None
+        self._load()
+
+    @property
+    def enabled(self):
+        return self.size_limit > 0
+
+    @property
+    def total_size(self):
+        with self._lock:
+            return sum(entry['size'] for entry in self._entries.values())
+
+    @staticmethod
+    def url_key(url, validator):
+        """由URL和ETag/Last-Modified生成缓存键"""
+        return hashlib.sha256(f"{url}\n{validator}".encode('utf-8')).hexdigest()
+
+    def set_size_limit(self, size_limit):
+        """调整缓存上限并按需淘汰"""
+        self.size_limit = max(0, size_limit)
+        with self._lock:
+            self._evict()
+            self._save()
+
+    def contains(self, key):
+        """是否已缓存，不更新最近使用时间，可在界面线程中调用"""
+        if not key or not self.enabled:
+            return False
+        with self._lock:
+            return key in self._entries
+
+    def lookup(self, key):
+        """查找缓存对象，返回其路径，不存在时返回None"""
+        if not key or not self.enabled:
+            return None
+        path = self._object_path(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            if not os.path.exists(path):
+                # 缓存文件被外部删除
+                del self._entries[key]
+                self._save()
+                return None
+            self._entries[key]['last_access'] = time.time()
+            self._save()
+        return path
+
+    def restore(self, key, target_path):
+        """将缓存对象复制到目标路径
+
+        Returns:
+            str: 还原的文件与缓存时的内容一致时返回其SHA-256，否则返回None
+        """
+        path = self.lookup(key)
+        if not path:
+            return None
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        digest = _copy_with_hash(path, target_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.get('sha256') == digest:
+                return digest
+            # 缓存对象已损坏或是没有记录哈希的旧版本缓存
+            self._remove_object(key)
+            self._save()
+        os.remove(target_path)
+        return None
+
+    def store_later(self, key, file_path, sha256=None):
+        """在后台线程中将文件放入缓存，不阻塞下载完成
+
+        文件在复制之前被修改或删除时不放入缓存。
+        """
+        if not key or not self.enabled:
+            return
+        stat = os.stat(file_path)
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._store_worker, daemon=True)
+                self._worker.start()
+        self._queue.put((key, file_path, sha256, (stat.st_size, stat.st_mtime_ns)))
+
+    def store(self, key, file_path, sha256=None, stat=None):
+        """将下载完成的文件复制到缓存
+
+        Args:
+            sha256: 文件应有的SHA-256，复制时计算的结果不一致则不放入缓存
+            stat: 文件完成下载时的 (大小, 修改时间)，复制后文件已变化则不放入缓存
+        """
+        if not key or not self.enabled:
+            return
+
+        size = os.path.getsize(file_path)
+        if size > self.size_limit:
+            return
+
+        path = self._object_path(key)
+        with self._lock:
+            if key in self._entries and os.path.exists(path):
+                self._entries[key]['last_access'] = time.time()
+                self._save()
+                return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        digest = _copy_with_hash(file_path, tmp_path)
+        current = os.stat(file_path)
+        if (sha256 and digest != sha256.lower()) or (stat and stat != (current.st_size, current.st_mtime_ns)):
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._entries[key] = {'size': os.path.getsize(path), 'sha256': digest, 'last_access': time.time()}
+            self._evict()
+            self._save()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_object(key)
+            self._save()
+
+    def _store_worker(self):
+        """逐个处理 store_later 提交的文件"""
+        while True:
+            key, file_path, sha256, stat = self._queue.get()
+            try:
+                self.store(key, file_path, sha256, stat)
+            except Exception as e:
+                print(f"写入缓存出错: {e}")
+
+    def _evict(self):
+        """按最近最少使用淘汰缓存，调用方需持有锁"""
+        total = sum(entry['size'] for entry in self._entries.values())
+        if total <= self.size_limit:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k]['last_access']):
+            total -= self._entries[key]['size']
+            self._remove_object(key)
+            if total <= self.size_limit:
+                break
+
+    def _remove_object(self, key):
+        """删除缓存对象，调用方需持有锁"""
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._object_path(key))
+        except OSError:
+            pass
+
+    def _object_path(self, key):
+        return os.path.join(self.folder, "objects", key[:2], key)
+
+    def _load(self):
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+        except Exception as e:
+            print(f"加载缓存索引出错: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """保存索引，调用方需持有锁"""
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"保存缓存索引出错: {e}")
+
+
+def _copy_with_hash(source, target):
+    """复制文件，同时计算SHA-256，返回十六进制摘要"""
+    file_hash = hashlib.sha256()
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        while True:
+            data = src.read(COPY_SIZE)
+            if not data:
+                break
+            file_hash.update(data)
+            dst.write(data)
+    return file_hash.hexdigest()
+
+
+download_cache = DownloadCache()
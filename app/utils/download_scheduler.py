@@ -0,0 +1,91 @@
+# coding: utf-8
+import heapq
+import itertools
+import threading
+
+
+class DownloadScheduler:
+    """下载调度器
+
+    维护一个带优先级的等待队列（同优先级按先进先出）和固定数量的工作线程，
+    同时运行的下载任务数不会超过设定的最大并发数，其余任务排队等待。
+    """
+
+    def __init__(self, max_concurrency=3):
+        self._queue = []  # (优先级, 序号, 任务ID, 任务函数)
+        self._queued_ids = set()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._max_concurrency = max(1, max_concurrency)
+        self._worker_count = 0
+        self._spawn_workers()
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    def set_max_concurrency(self, value):
+        """调整最大并发数，多余的工作线程会在当前任务完成后退出"""
+        with self._condition:
+            self._max_concurrency = max(1, value)
+            self._condition.notify_all()
+        self._spawn_workers()
+
+    def submit(self, task_id, func, priority=0):
+        """提交任务，func(task_id) 会在工作线程中执行
+
+        Args:
+            task_id: 任务ID
+            func: 任务函数
+            priority: 优先级，数值越小越先执行
+        """
+        with self._condition:
+            if task_id in self._queued_ids:
+                return False
+            heapq.heappush(self._queue, (priority, next(self._counter), task_id, func))
+            self._queued_ids.add(task_id)
+            self._condition.notify()
+        return True
+
+    def remove(self, task_id):
+        """从等待队列中移除尚未开始的任务"""
+        with self._condition:
+            if task_id not in self._queued_ids:
+                return False
+            self._queue = [item for item in self._queue if item[2] != task_id]
+            heapq.heapify(self._queue)
+            self._queued_ids.discard(task_id)
+        return True
+
+    def is_queued(self, task_id):
+        """任务是否仍在等待队列中"""
+        with self._condition:
+            return task_id in self._queued_ids
+
+    def _spawn_workers(self):
+        """补足工作线程"""
+        with self._condition:
+            while self._worker_count < self._max_concurrency:
+                self._worker_count += 1
+                thread = threading.Thread(target=self._worker_loop, daemon=True)
+                thread.start()
+
+    def _worker_loop(self):
+        """工作线程循环"""
+        while True:
+            with self._condition:
+                while not self._queue and self._worker_count <= self._max_concurrency:
+                    self._condition.wait()
+
+                # 并发数被调低，多余的线程退出
+                if self._worker_count > self._max_concurrency:
+                    self._worker_count -= 1
+                    return
+
+                _, _, task_id, func = heapq.heappop(self._queue)
+                self._queued_ids.discard(task_id)
+
+            try:
+                func(task_id)
+            except Exception as e:
+                print(f"下载任务出错: {e}")
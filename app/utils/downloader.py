@@ -0,0 +1,463 @@
+# coding: utf-8
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from . import http_client
+from .file_writer import BufferedRange, FileWriter
+from .integrity import IntegrityError, StreamingHasher
+from .rate_limiter import global_limiter
+from .retry import RetryPolicy, TransientError, call_with_retry
+
+
+CHUNK_SIZE = 1024 * 1024  # 每次读取的数据块大小 1MB
+WRITE_SIZE = 4 * 1024 * 1024  # 默认单次写盘大小 4MB
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024  # 每个分段的最小大小 4MB，文件太小时不分段
+JOURNAL_INTERVAL = 1.0  # 下载状态日志的最短写入间隔（秒）
+
+PART_SUFFIX = ".part"  # 未完成文件后缀
+JOURNAL_SUFFIX = ".part.json"  # 下载状态日志后缀
+
+
+class DownloadError(Exception):
+    """下载失败异常"""
+
+
+class DownloadCancelled(DownloadError):
+    """下载被取消"""
+
+
+class RemoteChanged(DownloadError):
+    """远程文件在续传过程中发生了变化"""
+
+
+class CancelToken(threading.Event):
+    """协作式取消令牌
+
+    由界面线程设置，下载线程在读取数据、限速等待和重试等待时检查，尽快
+    结束并释放连接。``reason`` 区分暂停（保留已下载的数据以便继续）和取消。
+    """
+
+    PAUSE = 'pause'
+    CANCEL = 'cancel'
+
+    def __init__(self):
+        super().__init__()
+        self.reason = None
+
+    def cancel(self, reason=CANCEL):
+        self.reason = reason
+        self.set()
+
+    @property
+    def paused(self):
+        return self.reason == self.PAUSE
+
+
+@dataclass
+class RemoteFileInfo:
+    """远程文件信息"""
+    size: int = 0
+    accept_ranges: bool = False
+    etag: str = ""
+    last_modified: str = ""
+
+    @property
+    def validator(self):
+        """用于If-Range的校验值，优先使用强ETag"""
+        if self.etag and not self.etag.startswith('W/'):
+            return self.etag
+        return self.last_modified
+
+
+def probe(url, timeout=None):
+    """探测远程文件大小以及是否支持Range请求
+
+    先用 ``Range: bytes=0-0`` 发起GET请求，服务器返回206即说明支持分段下载，
+    并能从 ``Content-Range`` 中取得文件总大小。相比HEAD请求，这种方式对
+    CDN和对象存储的兼容性更好。
+    """
+    headers = {'Range': 'bytes=0-0'}
+    with http_client.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+
+        if response.status_code == 206:
+            # 读完仅1字节的响应体，让连接回到连接池中复用
+            response.content
+            # Content-Range: bytes 0-0/12345
+            content_range = response.headers.get('Content-Range', '')
+            total = content_range.rpartition('/')[2]
+            if total.isdigit():
+                return RemoteFileInfo(int(total), True, etag, last_modified)
+
+        # 服务器忽略了Range头，返回的是完整文件
+        size = int(response.headers.get('Content-Length', 0))
+        return RemoteFileInfo(size, False, etag, last_modified)
+
+
+def split_ranges(size, segments):
+    """将文件按分段数切分为闭区间 [(start, end), ...]"""
+    segments = max(1, min(segments, size // MIN_SEGMENT_SIZE))
+    segment_size = size // segments
+    ranges = []
+    for i in range(segments):
+        start = i * segment_size
+        end = size - 1 if i == segments - 1 else start + segment_size - 1
+        ranges.append((start, end))
+    return ranges
+
+
+class DownloadJournal:
+    """下载状态日志
+
+    与 ``.part`` 文件放在一起的JSON文件，记录URL、ETag/Last-Modified、文件
+    总大小以及每个分段的下载位置，用于中断后按Range继续下载。
+    """
+
+    def __init__(self, path, url, info, segments):
+        self.path = path
+        self.url = url
+        self.info = info
+        # 每个分段为 [起始位置, 结束位置, 下一个待下载字节位置]
+        self.segments = segments
+
+    @property
+    def completed_size(self):
+        """已完成的字节数"""
+        return sum(pos - start for start, _, pos in self.segments)
+
+    def matches(self, url, info):
+        """判断日志是否与当前远程文件一致"""
+        return (
+            self.url == url
+            and self.info.size == info.size
+            and self.info.etag == info.etag
+            and self.info.last_modified == info.last_modified
+        )
+
+    def save(self):
+        """原子地写入日志"""
+        data = {
+            'url': self.url,
+            'etag': self.info.etag,
+            'last_modified': self.info.last_modified,
+            'size': self.info.size,
+            'segments': self.segments,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        """删除日志"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @classmethod
+    def load(cls, path):
+        """读取日志，不存在或损坏时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            info = RemoteFileInfo(data['size'], True, data.get('etag', ''), data.get('last_modified', ''))
+            segments = [list(segment) for segment in data['segments']]
+            return cls(path, data['url'], info, segments)
+        except Exception:
+            return None
+
+
+def discard_partial(save_path):
+    """删除未完成的下载文件及其状态日志"""
+    for path in (save_path + PART_SUFFIX, save_path + JOURNAL_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class SegmentedDownloader:
+    """多连接分段下载器
+
+    服务器支持Range请求时，将文件切分为多个区间并行下载，由独立的写盘线程
+    按较大的块写入预分配好的 ``.part`` 文件中的对应偏移位置，并通过状态日志
+    记录进度，中断后可以用 ``Range``/``If-Range`` 继续下载；不支持时回退为
+    单连接流式下载。全部完成后才会将 ``.part`` 重命名为目标文件。
+
+    提供 ``expected_sha256``/``expected_size`` 时会在下载过程中同步计算
+    SHA-256，校验不通过则删除已下载的数据并抛出 :class:`IntegrityError`。
+
+    超时、连接重置、5xx/429等临时错误按 ``retry_policy`` 退避重试，分段下载
+    从该分段已接收的位置继续，不影响其他分段；每次重试前调用
+    ``retry_callback(第几次尝试, 最多尝试次数)``。
+
+    传入 ``cancel_token`` 时可由外部暂停或取消下载，此时抛出
+    :class:`DownloadCancelled`，已下载的数据和状态日志会保留。
+    """
+
+    def __init__(self, url, save_path, segments=4, timeout=None, progress_callback=None, rate_limiter=None,
+                 expected_sha256=None, expected_size=0, info=None, write_size=WRITE_SIZE,
+                 retry_policy=None, retry_callback=None, cancel_token=None):
+        self.url = url
+        self.save_path = save_path
+        self.part_path = save_path + PART_SUFFIX
+        self.journal_path = save_path + JOURNAL_SUFFIX
+        self.segments = max(1, segments)
+        self.timeout = timeout
+        self.progress_callback = progress_callback
+        self.rate_limiter = rate_limiter  # 单任务限速器，所有分段共享
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.expected_size = expected_size or 0
+        self.sha256 = None  # 校验通过后的SHA-256
+        self.info = info  # 已探测过的远程文件信息，为None时在run中探测
+        self.write_size = max(CHUNK_SIZE, write_size)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_callback = retry_callback
+
+        self.total_size = 0
+        self.downloaded_size = 0
+        self._lock = threading.Lock()
+        self._errors = []
+        self._cancel_event = cancel_token or CancelToken()
+        self._journal = None
+        self._last_journal_time = 0
+        self._hasher = None
+        self._writer = None
+
+    def cancel(self):
+        """取消下载，已下载的部分会保留以便续传"""
+        self._cancel_event.set()
+
+    def run(self):
+        """执行下载，失败时抛出异常"""
+        os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
+
+        info = self.info = self.info or self._with_retry(lambda: probe(self.url, self.timeout))
+        self.total_size = info.size
+
+        # 大小与应用列表不一致时无需下载即可判定失败
+        if self.expected_size and info.size and info.size != self.expected_size:
+            raise IntegrityError(f"文件大小不一致: 应为 {self.expected_size} 字节，实际为 {info.size} 字节")
+
+        if info.accept_ranges and info.size > 0:
+            try:
+                self._download_ranges(info)
+            except RemoteChanged:
+                # 远程文件已变化，丢弃旧数据后从头下载
+                discard_partial(self.save_path)
+                self.downloaded_size = 0
+                self._errors = []
+                self.info = self._with_retry(lambda: probe(self.url, self.timeout))
+                self._download_ranges(self.info)
+        else:
+            # 无法续传，重试时只能从头下载
+            self._with_retry(self._download_single)
+
+        self._verify()
+        os.replace(self.part_path, self.save_path)
+
+    def _verify(self):
+        """校验下载完成的文件，不通过时删除已下载的数据"""
+        if self.expected_size and self.downloaded_size != self.expected_size:
+            discard_partial(self.save_path)
+            raise IntegrityError(
+                f"文件大小不一致: 应为 {self.expected_size} 字节，实际为 {self.downloaded_size} 字节")
+
+        if self._hasher:
+            digest = self._hasher.finish()
+            if digest != self.expected_sha256:
+                discard_partial(self.save_path)
+                raise IntegrityError(f"SHA-256校验失败: 应为 {self.expected_sha256}，实际为 {digest}")
+            self.sha256 = digest
+
+    def _with_retry(self, func):
+        """按重试策略调用 func，等待重试期间被取消时抛出 :class:`DownloadCancelled`"""
+        try:
+            return call_with_retry(func, self.retry_policy, self._cancel_event, self.retry_callback)
+        except DownloadCancelled:
+            raise
+        except Exception:
+            if self._cancel_event.is_set():
+                raise DownloadCancelled("下载已取消")
+            raise
+
+    def _download_single(self):
+        """单连接流式下载，服务器不支持Range时无法续传"""
+        discard_partial(self.save_path)
+        self._hasher = None
+        with self._lock:
+            self.downloaded_size = 0
+
+        with http_client.get(self.url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            self.total_size = int(response.headers.get('Content-Length', 0))
+
+            # 已知大小时预分配文件，减少磁盘碎片
+            with open(self.part_path, 'wb') as f:
+                if self.total_size:
+                    f.truncate(self.total_size)
+
+            if self.expected_sha256:
+                self._hasher = StreamingHasher(self.part_path)
+
+            callback = self._hasher.feed if self._hasher else None
+            writer = FileWriter(self.part_path, self.write_size)
+            buffer = BufferedRange(writer, 0, callback)
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if self._cancel_event.is_set():
+                        raise DownloadCancelled("下载已取消")
+                    if chunk:  # 过滤keep-alive新块
+                        buffer.append(chunk)
+                        self._report(len(chunk))
+                        self._throttle(len(chunk))
+                buffer.flush()
+            finally:
+                writer.close()
+
+            if self.total_size and self.downloaded_size != self.total_size:
+                raise TransientError(f"连接提前关闭: {self.downloaded_size}/{self.total_size}")
+
+    def _download_ranges(self, info):
+        """按Range并行下载各分段，支持断点续传"""
+        journal = DownloadJournal.load(self.journal_path)
+        if journal and journal.matches(self.url, info) and os.path.exists(self.part_path):
+            # 继续上次未完成的下载
+            self.downloaded_size = journal.completed_size
+        else:
+            # 预分配文件，各分段写入各自的偏移位置
+            with open(self.part_path, 'wb') as f:
+                f.truncate(info.size)
+            segments = [[start, end, start] for start, end in split_ranges(info.size, self.segments)]
+            journal = DownloadJournal(self.journal_path, self.url, info, segments)
+            journal.save()
+        self._journal = journal
+        if self.expected_sha256:
+            # 续传时已下载的部分会在计算推进到它们时从文件中补读
+            self._hasher = StreamingHasher(self.part_path, journal.segments)
+        self._report(0)
+
+        self._writer = FileWriter(self.part_path, self.write_size)
+        try:
+            threads = []
+            for segment in journal.segments:
+                if segment[2] > segment[1]:
+                    continue  # 该分段已完成
+                thread = threading.Thread(target=self._download_range, args=(segment,), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+            for thread in threads:
+                thread.join()
+        finally:
+            # 等待写盘线程写完所有已接收的数据
+            try:
+                self._writer.close()
+            except Exception as e:
+                self._errors.append(e)
+
+            # 无论成功与否都记录最新进度，便于下次续传
+            with self._lock:
+                journal.save()
+
+        if self._errors:
+            raise self._errors[0]
+
+        if self.downloaded_size != info.size:
+            raise DownloadError(f"文件大小不一致: {self.downloaded_size}/{info.size}")
+
+        journal.remove()
+
+    def _download_range(self, segment):
+        """下载单个分段，交给写盘线程写入文件对应位置，临时错误时从已接收的位置重试"""
+        start, end, pos = segment
+
+        def on_written(offset, data):
+            # 数据写入文件后才推进分段位置，保证状态日志只记录已落盘的数据
+            segment[2] = offset + len(data)
+            if self._hasher:
+                self._hasher.feed(offset, data)
+
+        buffer = BufferedRange(self._writer, pos, on_written)
+        policy = self.retry_policy
+        failures = 0
+        try:
+            while True:
+                pos = buffer.position
+                try:
+                    self._fetch_range(pos, end, buffer)
+                    break
+                except (DownloadCancelled, RemoteChanged):
+                    raise
+                except Exception as e:
+                    if self._errors:
+                        raise
+                    # 本次连接收到了数据则重新计数，只有连续失败才会放弃
+                    failures = 1 if buffer.position > pos else failures + 1
+                    if failures >= policy.max_attempts or not policy.is_retryable(e):
+                        raise
+                    delay = policy.get_delay(failures, e)
+                    if self.retry_callback:
+                        self.retry_callback(failures + 1, policy.max_attempts)
+                    if not policy.sleep(delay, self._cancel_event):
+                        raise DownloadCancelled("下载已取消")
+        except Exception as e:
+            with self._lock:
+                self._errors.append(e)
+        finally:
+            # 已接收的数据同样写入文件，续传时无需重新下载
+            try:
+                buffer.flush()
+            except Exception as e:
+                with self._lock:
+                    self._errors.append(e)
+
+    def _fetch_range(self, pos, end, buffer):
+        """请求 [pos, end] 区间并追加到缓冲区"""
+        headers = {'Range': f'bytes={pos}-{end}'}
+        validator = self._journal.info.validator
+        if validator:
+            # 远程文件发生变化时服务器会返回完整文件(200)而不是206
+            headers['If-Range'] = validator
+
+        with http_client.get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RemoteChanged("远程文件已变化，无法继续下载")
+
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if self._cancel_event.is_set():
+                    raise DownloadCancelled("下载已取消")
+                # 其他分段出错时尽快退出
+                if self._errors:
+                    return
+                if chunk:
+                    buffer.append(chunk)
+                    self._report(len(chunk))
+                    self._throttle(len(chunk))
+
+        if buffer.position <= end:
+            raise TransientError(f"连接提前关闭，分段数据不完整: {buffer.position}/{end + 1}")
+
+    def _throttle(self, size):
+        """按单任务限速和全局限速等待"""
+        if self.rate_limiter:
+            self.rate_limiter.consume(size, self._cancel_event)
+        global_limiter.consume(size, self._cancel_event)
+
+    def _report(self, size):
+        """累加已下载大小，定期写入状态日志并回调进度"""
+        with self._lock:
+            self.downloaded_size += size
+            downloaded = self.downloaded_size
+
+            current_time = time.time()
+            if self._journal and current_time - self._last_journal_time > JOURNAL_INTERVAL:
+                self._journal.save()
+                self._last_journal_time = current_time
+
+        if self.progress_callback:
+            self.progress_callback(downloaded, self.total_size)
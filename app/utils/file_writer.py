@@ -0,0 +1,91 @@
+# coding: utf-8
+import queue
+import threading
+
+
+MAX_PENDING_BYTES = 64 * 1024 * 1024  # 等待写入的数据上限，超出后下载线程会等待磁盘
+
+
+class FileWriter:
+    """后台写盘线程
+
+    下载线程只负责接收数据，攒够一定大小后放入有界队列，由独立的写盘线程
+    按偏移写入文件，网络读取和磁盘写入得以并行。写入较慢的磁盘（U盘、网络
+    共享目录）不会再拖慢网络连接；队列满时下载线程才会等待。
+
+    Args:
+        path: 文件路径，必须已存在（通常已预分配好大小）
+        write_size: 单次写入的大小
+    """
+
+    def __init__(self, path, write_size=4 * 1024 * 1024):
+        self.path = path
+        self.write_size = write_size
+        self._queue = queue.Queue(maxsize=max(2, MAX_PENDING_BYTES // write_size))
+        self._error = None
+        # 不使用缓冲，写入后其他文件句柄（如哈希补读）立即可见
+        self._file = open(path, 'r+b', buffering=0)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, offset, data, callback=None):
+        """提交一次写入，callback会在数据写入文件后于写盘线程中调用"""
+        if self._error:
+            raise self._error
+        self._queue.put((offset, data, callback))
+
+    def close(self):
+        """等待所有数据写入并关闭文件，写入出错时抛出异常"""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error:
+                continue  # 出错后丢弃剩余数据，只等待关闭
+
+            offset, data, callback = item
+            try:
+                self._file.seek(offset)
+                view = memoryview(data)
+                while view:
+                    written = self._file.write(view)
+                    view = view[written:]
+                if callback:
+                    callback(offset, data)
+            except Exception as e:
+                self._error = e
+
+
+class BufferedRange:
+    """按区间顺序攒数据的缓冲区，攒够 write_size 后交给写盘线程"""
+
+    def __init__(self, writer, offset, callback=None):
+        self.writer = writer
+        self.offset = offset  # 缓冲区数据在文件中的起始位置
+        self.callback = callback
+        self._buffer = bytearray()
+
+    @property
+    def position(self):
+        """下一个字节在文件中的位置（包括尚未交给写盘线程的数据）"""
+        return self.offset + len(self._buffer)
+
+    def append(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.writer.write_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        self.writer.write(self.offset, data, self.callback)
+        self.offset += len(data)
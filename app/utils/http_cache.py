@@ -0,0 +1,103 @@
+# coding: utf-8
+import json
+import os
+import threading
+
+from ..common.setting import HTTP_VALIDATORS_FILE
+from . import http_client
+
+
+class ValidatorStore:
+    """按URL保存上次响应的 ETag/Last-Modified
+
+    下次请求同一URL时作为 ``If-None-Match``/``If-Modified-Since`` 发送，
+    内容未变化时服务器返回304，无需重新下载和写入本地文件。
+    """
+
+    def __init__(self, path=HTTP_VALIDATORS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+        self._load()
+
+    def get(self, url):
+        with self._lock:
+            return dict(self._records.get(url, {}))
+
+    def set(self, url, etag, last_modified):
+        """记录校验值，两者都为空时删除记录"""
+        with self._lock:
+            if etag or last_modified:
+                record = {'etag': etag, 'last_modified': last_modified}
+                if self._records.get(url) == record:
+                    return
+                self._records[url] = record
+            elif self._records.pop(url, None) is None:
+                return
+            self._save()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._records = json.load(f)
+        except Exception as e:
+            print(f"加载请求校验值出错: {e}")
+            self._records = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._records, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存请求校验值出错: {e}")
+
+
+validators = ValidatorStore()
+
+
+def conditional_get(url, cache_path, timeout=None):
+    """发送条件请求
+
+    本地副本 ``cache_path`` 存在时附带上次的校验值。
+
+    Returns:
+        Response: 内容有变化（或无法使用条件请求）时返回响应，
+            调用方检查内容后用 :func:`save_response` 保存；304时返回None
+    """
+    headers = {}
+    record = validators.get(url)
+    if record and os.path.exists(cache_path):
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+
+    response = http_client.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return response
+
+
+def save_response(url, response, cache_path):
+    """原子地写入响应内容并记录校验值，内容与本地一致时不重写文件"""
+    content = response.content
+    try:
+        with open(cache_path, 'rb') as f:
+            unchanged = f.read() == content
+    except OSError:
+        unchanged = False
+
+    if not unchanged:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+
+    validators.set(url, response.headers.get('ETag', ''), response.headers.get('Last-Modified', ''))
+    return not unchanged
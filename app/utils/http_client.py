@@ -0,0 +1,48 @@
+# coding: utf-8
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 通用请求头
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Connection': 'keep-alive',
+}
+
+DEFAULT_TIMEOUT = (5, 30)  # 默认超时 (连接超时, 读取超时)
+POOL_CONNECTIONS = 8  # 缓存连接池的主机数
+POOL_MAXSIZE = 64  # 每个主机保持的最大连接数，覆盖 并发任务数 x 分段数 的常见情况
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """带默认超时的连接池适配器"""
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = DEFAULT_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+# 所有线程共享同一个适配器（即同一组连接池），urllib3的连接池本身是线程安全的；
+# Session对象（请求头、Cookie等状态）则按线程各自创建，避免多线程同时修改
+_adapter = TimeoutHTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+_local = threading.local()
+
+
+def get_session():
+    """获取当前线程的会话，会话之间复用连接池和keep-alive连接"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        session.mount('http://', _adapter)
+        session.mount('https://', _adapter)
+        _local.session = session
+    return session
+
+
+def get(url, **kwargs):
+    """使用共享连接池发送GET请求"""
+    return get_session().get(url, **kwargs)
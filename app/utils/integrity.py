@@ -0,0 +1,152 @@
+# coding: utf-8
+import hashlib
+import json
+import os
+import threading
+
+from ..common.setting import VERIFIED_FILES_FILE
+
+
+READ_SIZE = 1024 * 1024  # 补读已下载数据时的块大小
+
+
+class IntegrityError(Exception):
+    """文件完整性校验失败"""
+
+
+class StreamingHasher:
+    """边下载边计算SHA-256
+
+    SHA-256只能按顺序计算。``feed`` 传入的数据块恰好位于已校验位置时直接
+    参与计算；多分段下载时其他分段先写入的数据，会在已校验位置推进到它们
+    时从刚写入的文件中补读（通常仍在系统缓存中），无需下载完成后再完整
+    读取一遍文件。
+
+    Args:
+        path: 正在写入的文件路径
+        segments: 分段列表 [[起始位置, 结束位置, 下一个待下载字节位置], ...]，
+            为None时表示单连接顺序写入
+    """
+
+    def __init__(self, path, segments=None):
+        self.path = path
+        self.segments = sorted(segments, key=lambda s: s[0]) if segments else None
+        self.offset = 0  # 已参与计算的字节数
+        self._hash = hashlib.sha256()
+        self._lock = threading.Lock()
+
+    def feed(self, offset, data):
+        """传入刚写入文件 offset 处的数据"""
+        with self._lock:
+            if offset == self.offset:
+                self._hash.update(data)
+                self.offset += len(data)
+            if self.segments:
+                self._catch_up()
+
+    def finish(self):
+        """补齐剩余数据并返回十六进制摘要"""
+        with self._lock:
+            if self.segments:
+                self._catch_up()
+            return self._hash.hexdigest()
+
+    def _available(self):
+        """计算从文件开头起连续写入完成的字节数"""
+        for start, end, pos in self.segments:
+            if pos <= end:
+                return pos
+        return self.segments[-1][1] + 1
+
+    def _catch_up(self):
+        """从文件中补读已写入但尚未参与计算的数据"""
+        available = self._available()
+        if available <= self.offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            while self.offset < available:
+                data = f.read(min(READ_SIZE, available - self.offset))
+                if not data:
+                    break
+                self._hash.update(data)
+                self.offset += len(data)
+
+
+class VerifiedFiles:
+    """已校验文件记录
+
+    记录校验通过的文件路径、大小、修改时间和SHA-256。之后判断文件是否
+    已下载时只需比较文件大小和修改时间，无需重新计算哈希。
+    """
+
+    def __init__(self, path=VERIFIED_FILES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+        self._load()
+
+    def record(self, file_path, sha256):
+        """记录校验通过的文件"""
+        stat = os.stat(file_path)
+        with self._lock:
+            self._records[os.path.normcase(os.path.abspath(file_path))] = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'sha256': sha256.lower(),
+            }
+            self._save()
+
+    def get(self, file_path):
+        """返回文件的记录，文件不存在或已被修改时返回None"""
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self._lock:
+            record = self._records.get(key)
+        if not record:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size != record['size'] or stat.st_mtime_ns != record['mtime']:
+            return None
+        return record
+
+    def is_verified(self, file_path, sha256):
+        """文件是否已校验且哈希与给定值一致"""
+        record = self.get(file_path)
+        return record is not None and record['sha256'] == sha256.lower()
+
+    def has_record(self, file_path):
+        """是否存在该路径的校验记录（不检查文件是否变化）"""
+        with self._lock:
+            return os.path.normcase(os.path.abspath(file_path)) in self._records
+
+    def remove(self, file_path):
+        """删除文件记录"""
+        with self._lock:
+            if self._records.pop(os.path.normcase(os.path.abspath(file_path)), None):
+                self._save()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._records = json.load(f)
+        except Exception as e:
+            print(f"加载校验记录出错: {e}")
+            self._records = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存校验记录出错: {e}")
+
+
+verified_files = VerifiedFiles()
@@ -0,0 +1,143 @@
+# coding: utf-8
+"""应用名称的拼音
+
+用户常用拼音或首字母搜索中文应用，例如输入 ``weixin`` 或 ``wx`` 查找“微信”。
+名称转换为拼音较慢，因此结果按名称缓存在应用列表旁的文件中，加载应用列表
+时只查缓存，缺少的部分在后台线程中计算。
+
+拼音转换使用 ``pypinyin``（项目依赖）；万一运行环境中缺少它，不影响其他功能，
+只为英文名称生成首字母。
+"""
+import json
+import os
+import re
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..common.setting import PINYIN_FILE
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 已声明为依赖，这里只是保底，缺少时搜索仍可用
+    lazy_pinyin = None
+
+
+CACHE_VERSION = 1
+
+
+def _is_chinese(char):
+    return '一' <= char <= '鿿' or '㐀' <= char <= '䶿'
+
+
+def name_pinyin(name):
+    """名称的全拼和首字母，例如 ``"QQ音乐"`` -> ``("qqyinyue", "qyy")``
+
+    英文单词原样计入全拼、首字母取每个单词的第一个字母；中文按拼音计算。
+
+    Returns:
+        tuple: (全拼, 首字母)，名称只有一个英文单词等不需要别名时返回空元组；
+            名称包含中文但未安装 pypinyin 时返回None
+    """
+    has_chinese = any(_is_chinese(char) for char in name)
+    if has_chinese and lazy_pinyin is None:
+        return None
+
+    segments = lazy_pinyin(name) if has_chinese else [name]
+    full, initials = [], []
+    for segment in segments:
+        if segment and _is_chinese(segment[0]):
+            continue  # 无法转换的生僻字
+        words = re.findall(r'[a-z0-9]+', segment.lower())
+        full.extend(words)
+        initials.extend(word[0] for word in words)
+
+    full, initials = "".join(full), "".join(initials)
+    if not has_chinese and len(initials) < 2:
+        return ()
+    return full, initials
+
+
+class PinyinCache:
+    """名称 -> (全拼, 首字母) 的缓存，保存在应用列表旁"""
+
+    def __init__(self, path=PINYIN_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names = {}
+        self._load()
+
+    def get(self, name):
+        """已缓存的拼音，尚未计算时返回None"""
+        with self._lock:
+            return self._names.get(name)
+
+    def missing(self, names):
+        """尚未计算拼音的名称"""
+        with self._lock:
+            return [name for name in names if name not in self._names]
+
+    def update(self, names):
+        """计算缺少的拼音并保存，只保留 names 中的名称
+
+        Returns:
+            bool: 是否有新计算出的拼音
+        """
+        with self._lock:
+            cached = dict(self._names)
+
+        computed = {}
+        for name in set(names):
+            if name in cached:
+                computed[name] = cached[name]
+                continue
+            value = name_pinyin(name)
+            if value is not None:  # 缺少 pypinyin 时不缓存，安装后再计算
+                computed[name] = value
+
+        changed = computed.keys() != cached.keys()
+        with self._lock:
+            self._names = computed
+        if changed:
+            self._save(computed)
+        return any(name not in cached for name in computed)
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self._names = {name: tuple(value) for name, value in data['names'].items()}
+        except Exception as e:
+            print(f"加载拼音缓存出错: {e}")
+            self._names = {}
+
+    def _save(self, names):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'names': names}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存拼音缓存出错: {e}")
+
+
+pinyin_cache = PinyinCache()
+
+
+class PinyinThread(QThread):
+    """在后台计算缺少的拼音"""
+    pinyinReady = pyqtSignal()  # 有新计算出的拼音
+
+    def __init__(self, names, parent=None):
+        super().__init__(parent)
+        self.names = names
+
+    def run(self):
+        try:
+            if pinyin_cache.update(self.names):
+                self.pinyinReady.emit()
+        except Exception as e:
+            print(f"计算拼音出错: {e}")
@@ -0,0 +1,66 @@
+# coding: utf-8
+import threading
+import time
+
+
+SLEEP_SLICE = 0.1  # 单次等待的最长时间（秒），便于及时响应限速调整和取消
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    令牌以 ``rate`` 字节/秒的速度补充，桶容量为一秒的流量。消费的字节数可以
+    超过当前令牌数（例如一次读到了一整个数据块），此时令牌变为负数，调用方
+    会等待到令牌补足为止，从而保证长期平均速度不超过限制。
+    ``rate`` 为0表示不限速，运行过程中可随时通过 :meth:`set_rate` 调整。
+    """
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self._rate = max(0, rate)
+        self._tokens = float(self._rate)
+        self._last_time = time.monotonic()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def set_rate(self, rate):
+        """调整限速，单位字节/秒，0表示不限速"""
+        with self._lock:
+            self._refill()
+            self._rate = max(0, rate)
+            # 避免从不限速切换过来时残留大量欠账或令牌
+            self._tokens = min(max(self._tokens, 0.0), float(self._rate))
+
+    def consume(self, size, cancel_event=None):
+        """消费指定字节数的令牌，令牌不足时阻塞等待"""
+        with self._lock:
+            if self._rate <= 0:
+                return
+            self._refill()
+            self._tokens -= size
+
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+
+            with self._lock:
+                if self._rate <= 0:
+                    return
+                self._refill()
+                if self._tokens >= 0:
+                    return
+                wait_time = -self._tokens / self._rate
+
+            time.sleep(min(wait_time, SLEEP_SLICE))
+
+    def _refill(self):
+        """按经过的时间补充令牌，调用方需持有锁"""
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last_time) * self._rate, float(self._rate))
+        self._last_time = now
+
+
+# 全局限速器，所有下载共享
+global_limiter = TokenBucket()
@@ -0,0 +1,97 @@
+# coding: utf-8
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from requests import exceptions
+
+
+MAX_ATTEMPTS = 5  # 最多尝试次数（包括第一次）
+BASE_DELAY = 1.0  # 第一次重试前的等待时间（秒）
+MAX_DELAY = 30.0  # 退避等待时间上限（秒）
+MAX_RETRY_AFTER = 120.0  # 服务器 Retry-After 的采纳上限（秒）
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TransientError(Exception):
+    """可重试的临时错误，例如连接提前关闭导致数据不完整"""
+
+
+class RetryPolicy:
+    """重试策略
+
+    连接/读取超时、连接被重置、数据未接收完整以及5xx、429响应视为临时错误，
+    按指数退避加随机抖动等待后重试；服务器返回 ``Retry-After`` 时以其为准。
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable(self, error):
+        """判断错误是否值得重试"""
+        if isinstance(error, exceptions.HTTPError):
+            response = error.response
+            return response is not None and response.status_code in RETRY_STATUS
+        return isinstance(error, (
+            TransientError,
+            exceptions.ConnectionError,  # 包括连接超时和读取超时
+            exceptions.Timeout,
+            exceptions.ChunkedEncodingError,
+            ConnectionError,
+        ))
+
+    def get_delay(self, attempt, error=None):
+        """第 attempt 次失败后的等待时间（秒）"""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        # 全抖动：在 [0, 指数退避上限] 内随机，避免多个连接同时重试
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def sleep(self, delay, cancel_event=None):
+        """等待重试，等待期间被取消时返回False"""
+        if cancel_event is None:
+            time.sleep(delay)
+            return True
+        return not cancel_event.wait(delay)
+
+
+def call_with_retry(func, policy=None, cancel_event=None, retry_callback=None):
+    """调用 func，遇到临时错误时按策略重试
+
+    Args:
+        retry_callback: 重试前回调 retry_callback(第几次尝试, 最多尝试次数)
+    """
+    policy = policy or RetryPolicy()
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            attempt += 1
+            if attempt >= policy.max_attempts or not policy.is_retryable(e):
+                raise
+            delay = policy.get_delay(attempt, e)
+            if retry_callback:
+                retry_callback(attempt + 1, policy.max_attempts)
+            if not policy.sleep(delay, cancel_event):
+                raise
+
+
+def _retry_after(error):
+    """解析响应中的 Retry-After（秒数或HTTP日期）"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
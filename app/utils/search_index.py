@@ -0,0 +1,278 @@
+# coding: utf-8
+import re
+import string
+import threading
+import unicodedata
+from array import array
+from itertools import islice
+
+
+VERIFY_THRESHOLD = 64  # 候选数量不超过该值时停止求交集，直接逐个确认
+CANCEL_CHECK_SIZE = 4096  # 逐个确认候选时，每处理这么多条检查一次是否已取消
+SEPARATOR = "\x00"  # 名称、描述和别名之间的分隔符，保证查询不会跨越两者匹配
+FUZZY_MIN_LENGTH = 4  # 查询至少这么长时才允许一个字符的差错
+FUZZY_ALPHABET = string.ascii_lowercase + string.digits  # 生成差一个字符的候选词时使用的字符
+REBUILD_RATIO = 0.25  # 有变化的条目超过该比例时在锁外重建索引，而不是逐条更新
+PACKED_TYPECODE = 'I'  # 保存倒排表时键序号数组的类型
+STATE_VERSION = 2  # 索引项的选取方式变化时增加，旧的索引内容不能再恢复
+
+
+def normalize(text):
+    """统一全角/半角和大小写"""
+    return unicodedata.normalize('NFKC', text).lower() if text else ""
+
+
+class SearchCancelled(Exception):
+    """查询已被更新的查询取代"""
+
+
+def _text_grams(text):
+    """文本的索引项：所有三元组和双字（拼音首字母等两个字符的查询使用），以及非ASCII的单字"""
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    grams.update(char for char in text if not char.isascii())
+    return {gram for gram in grams if SEPARATOR not in gram}
+
+
+def _tokens(text):
+    """用于模糊匹配的词：连续的英文字母和数字"""
+    return {token for token in re.findall(r'[a-z0-9]+', text) if len(token) >= FUZZY_MIN_LENGTH - 1}
+
+
+def _edits(word):
+    """与 word 相差一个字符（删除、替换、插入或交换相邻字符）的所有字符串"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    edits = {left + right[1:] for left, right in splits if right}
+    edits.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    edits.update(left + char + right[1:] for left, right in splits if right for char in FUZZY_ALPHABET)
+    edits.update(left + char + right for left, right in splits for char in FUZZY_ALPHABET)
+    return edits
+
+
+def _query_grams(query):
+    """查询用到的索引项，为None时表示无法使用索引（单个ASCII字符的查询）"""
+    if len(query) >= 3:
+        return {query[i:i + 3] for i in range(len(query) - 2)}
+    if len(query) == 2 or not query.isascii():
+        return {query}
+    return None
+
+
+class SearchIndex:
+    """应用搜索索引
+
+    以三元组（连续三个字符）建立倒排索引，支持中英文任意子串查询：查询串的
+    每个三元组都必须出现在结果中，先按倒排表求交集得到少量候选，再逐个确认
+    名称或描述确实包含查询串。两个字符的查询（中文词语、拼音首字母）使用
+    双字索引，单个中文字使用单字索引，只有单个英文字母或数字需要逐个查找。
+
+    每个条目还可以有别名（例如名称的全拼和首字母），与名称一样参与子串匹配。
+    名称和别名中的英文单词另外记录在词表中，:meth:`fuzzy_search` 用来查找
+    与查询串只差一个字符的单词，弥补输入错误。
+
+    索引按键（应用ID）维护，应用列表刷新时调用 :meth:`update` 只会重新索引
+    新增或内容有变化的条目。更新和查询可以在不同线程中进行，建立索引较慢，
+    应在后台线程中更新。
+
+    :meth:`state` 得到的索引内容可以保存下来，下次用 :meth:`restore` 恢复，
+    不必重新建立。恢复的倒排表是压缩的键序号数组，查询用到时才展开为集合。
+    """
+
+    def __init__(self):
+        self._texts = {}  # 键 -> 规范化的 名称 + 分隔符 + 描述 + 分隔符 + 别名...
+        self._postings = {}  # 索引项 -> 键集合，恢复后尚未用到的为压缩的序号数组
+        self._words = {}  # 名称和别名中的单词 -> 键集合，同上
+        self._keys = []  # 恢复时的键列表，压缩的序号数组是其中的位置
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._texts)
+
+    def update(self, entries):
+        """增量更新索引，不能在多个线程中同时调用
+
+        大部分条目有变化时（例如首次建立索引）在锁外建立新的索引后整体替换，
+        建立期间查询仍使用原来的索引，不会被阻塞。
+
+        Args:
+            entries: {键: (名称, 描述, 别名列表)}，不在其中的已有条目会被删除
+
+        Returns:
+            bool: 索引是否有变化
+        """
+        texts = {
+            key: SEPARATOR.join([normalize(name), normalize(description), *map(normalize, aliases)])
+            for key, (name, description, aliases) in entries.items()
+        }
+        with self._lock:
+            removed = [key for key in self._texts if key not in texts]
+            changed = [key for key, text in texts.items() if self._texts.get(key) != text]
+        if not removed and not changed:
+            return False
+
+        if len(removed) + len(changed) > len(texts) * REBUILD_RATIO:
+            index = SearchIndex()
+            for key, text in texts.items():
+                index._add(key, text)
+            with self._lock:
+                old = self._postings, self._words
+                self._texts, self._postings, self._words = index._texts, index._postings, index._words
+                self._keys = index._keys
+            # 逐项释放原来的索引，一次性释放大量对象会长时间占用GIL，使界面卡顿
+            for table in old:
+                while table:
+                    table.popitem()
+            return True
+
+        with self._lock:
+            for key in removed:
+                self._remove(key)
+            for key in changed:
+                if key in self._texts:
+                    self._remove(key)
+                self._add(key, texts[key])
+        return True
+
+    def state(self):
+        """索引内容，只包含内置类型，可以用 marshal 保存；应与 update() 在同一线程中调用"""
+        with self._lock:
+            texts = dict(self._texts)
+            postings = dict(self._postings)
+            words = dict(self._words)
+            base = self._keys
+
+        # 恢复时已有的键保持原来的序号（已删除的留空），尚未用到的压缩倒排表可以直接保存；
+        # 删除或修改条目时涉及的倒排表都已展开，压缩的倒排表中不会有已删除的键
+        keys = [key if key in texts else None for key in base]
+        base = set(base)
+        keys.extend(key for key in texts if key not in base)
+        positions = {key: i for i, key in enumerate(keys) if key is not None}
+
+        def pack(table):
+            return {
+                item: value if type(value) is bytes
+                else array(PACKED_TYPECODE, map(positions.__getitem__, value)).tobytes()
+                for item, value in table.items()
+            }
+
+        return STATE_VERSION, keys, [texts.get(key) for key in keys], pack(postings), pack(words)
+
+    def restore(self, state):
+        """恢复 :meth:`state` 保存的索引内容，之后仍应调用 update() 确认与当前条目一致"""
+        version, keys, texts, postings, words = state
+        if version != STATE_VERSION:
+            raise ValueError(f"不支持的搜索索引版本: {version}")
+        if len(keys) != len(texts):
+            raise ValueError("搜索索引数据不完整")
+        texts = {key: text for key, text in zip(keys, texts) if key is not None}
+        with self._lock:
+            self._keys = keys
+            self._texts, self._postings, self._words = texts, postings, words
+
+    def search(self, query, within=None, cancelled=None):
+        """返回名称或描述包含 query 的键集合，query 为空时返回None表示不过滤
+
+        Args:
+            within: 只在这些键中查找，例如查询串在上一次查询的基础上加长时，
+                结果必然是上一次结果的子集
+            cancelled: 返回True时中止查询并抛出 :class:`SearchCancelled`
+        """
+        query = normalize(query.strip()).replace(SEPARATOR, "")
+        if not query:
+            return None
+
+        with self._lock:
+            grams = _query_grams(query)
+            if grams is None:
+                candidates = self._texts
+            else:
+                postings = sorted((self._entry(self._postings, gram) or () for gram in grams), key=len)
+                if not postings[0]:
+                    return set()
+                if query in grams and within is None:
+                    # 查询串本身就是索引项（三个字符或一两个中文字符），倒排表即为结果
+                    return set(postings[0])
+                candidates = postings[0]
+                for posting in postings[1:]:
+                    if len(candidates) <= VERIFY_THRESHOLD:
+                        break
+                    candidates = posting.intersection(candidates)
+
+            if within is not None and len(within) < len(candidates):
+                candidates = within
+
+            texts = self._texts
+            result = set()
+            keys = iter(candidates)
+            while True:
+                chunk = list(islice(keys, CANCEL_CHECK_SIZE))
+                if not chunk:
+                    return result
+                if cancelled and cancelled():
+                    raise SearchCancelled()
+                result.update(key for key in chunk if key in texts and query in texts[key])
+
+    def fuzzy_search(self, query):
+        """返回名称或别名中有单词与 query 只差一个字符的键集合
+
+        只用于较长的英文查询，查询串过短或包含其他字符时返回空集合。
+        """
+        query = normalize(query.strip())
+        if len(query) < FUZZY_MIN_LENGTH or not re.fullmatch(r'[a-z0-9]+', query):
+            return set()
+
+        result = set()
+        with self._lock:
+            for word in _edits(query):
+                keys = self._entry(self._words, word)
+                if keys:
+                    result.update(keys)
+        return result
+
+    def _add(self, key, text):
+        self._texts[key] = text
+        for gram in _text_grams(text):
+            posting = self._entry(self._postings, gram)
+            if posting is None:
+                self._postings[gram] = {key}
+            else:
+                posting.add(key)
+        for word in self._text_words(text):
+            keys = self._entry(self._words, word)
+            if keys is None:
+                self._words[word] = {key}
+            else:
+                keys.add(key)
+
+    def _remove(self, key):
+        text = self._texts.pop(key)
+        for gram in _text_grams(text):
+            posting = self._entry(self._postings, gram)
+            if posting is not None:
+                posting.discard(key)
+                if not posting:
+                    del self._postings[gram]
+        for word in self._text_words(text):
+            keys = self._entry(self._words, word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._words[word]
+
+    def _entry(self, table, item):
+        """table 中 item 对应的键集合，压缩的序号数组在首次用到时展开"""
+        keys = table.get(item)
+        if type(keys) is bytes:
+            positions = array(PACKED_TYPECODE)
+            positions.frombytes(keys)
+            keys = table[item] = set(map(self._keys.__getitem__, positions))
+        return keys
+
+    @staticmethod
+    def _text_words(text):
+        """名称和别名中的单词，不包括描述"""
+        fields = text.split(SEPARATOR)
+        words = _tokens(fields[0])
+        for alias in fields[2:]:
+            words.update(_tokens(alias))
+        return words
@@ -0,0 +1,147 @@
+# coding: utf-8
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from ..common.setting import APPS_FILE, SEARCH_INDEX_SNAPSHOT_FILE
+from .catalog_snapshot import load_snapshot, save_snapshot
+from .search_index import SearchCancelled, normalize
+
+
+class SearchWorker(QObject):
+    """后台搜索
+
+    查询在独立线程中执行，只保留最新的一次请求：新的请求到来时，尚未开始的
+    旧请求直接丢弃，正在执行的旧请求会尽快中止，结果也不会发给界面。
+    查询串在上一次查询的基础上加长时，只在上一次的结果中继续查找。
+    没有完全匹配的结果时，改为查找只差一个字符的单词。
+
+    每个实例有自己的线程，不再使用时调用 :meth:`stop` 结束线程。
+    """
+    resultReady = pyqtSignal(int, object)  # 请求序号，匹配的键集合（None表示不过滤）
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._pending = None  # (请求序号, 查询串)
+        self._last_query = ""  # 上一次完成的查询（规范化后）及其结果
+        self._last_result = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def search(self, query):
+        """提交查询，返回请求序号，结果通过 resultReady 发出"""
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, query)
+            self._condition.notify()
+            return self._generation
+
+    def cancel(self):
+        """丢弃所有未完成的查询，返回新的请求序号"""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            return self._generation
+
+    def invalidate(self):
+        """索引已更新，之后的查询不能再基于之前的结果缩小范围"""
+        with self._condition:
+            self._generation += 1
+            self._last_query = ""
+            self._last_result = None
+
+    def stop(self):
+        """中止未完成的查询并结束搜索线程，之后不再发出结果"""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            self._stopped = True
+            self._condition.notify()
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                generation, query = self._pending
+                self._pending = None
+                last_query, last_result = self._last_query, self._last_result
+
+            normalized = normalize(query.strip())
+            within = None
+            if last_query and last_result is not None and last_query in normalized:
+                within = last_result
+
+            fuzzy = False
+            try:
+                result = self.index.search(query, within, lambda: self._is_stale(generation))
+                if result is not None and not result:
+                    result = self.index.fuzzy_search(query)
+                    fuzzy = bool(result)
+            except SearchCancelled:
+                continue
+            except Exception as e:
+                print(f"搜索出错: {e}")
+                continue
+
+            with self._condition:
+                if self._is_stale(generation):
+                    continue
+                # 模糊匹配的结果不一定包含更长查询的结果，不能用来缩小范围
+                self._last_query = "" if fuzzy else normalized
+                self._last_result = None if fuzzy else result
+            self.resultReady.emit(generation, result)
+
+
+class IndexThread(QThread):
+    """在后台更新搜索索引，应用较多时建立索引需要数秒，不能阻塞界面
+
+    索引为空时（启动后第一次更新）先从快照恢复，再按当前的条目增量更新；
+    索引有变化后重新保存快照。快照与应用目录快照一样以 ``apps.json`` 校验，
+    只是为了避免加载明显过期的索引，恢复后总会与当前条目核对，即使快照
+    与条目不一致，结果也是正确的。
+    """
+    indexUpdated = pyqtSignal(bool)  # 索引是否有变化
+
+    def __init__(self, index, entries, parent=None):
+        """
+        Args:
+            index: 要更新的搜索索引
+            entries: 在后台线程中调用，返回 :meth:`SearchIndex.update` 的参数
+        """
+        super().__init__(parent)
+        self.index = index
+        self.entries = entries
+
+    def run(self):
+        restored = changed = False
+        try:
+            if not len(self.index):
+                restored = self._restore()
+            changed = self.index.update(self.entries())
+            if changed and len(self.index):
+                save_snapshot(self.index.state(), APPS_FILE, SEARCH_INDEX_SNAPSHOT_FILE)
+        except Exception as e:
+            print(f"更新搜索索引出错: {e}")
+        self.indexUpdated.emit(restored or changed)
+
+    def _restore(self):
+        """从快照恢复索引，返回是否成功"""
+        state = load_snapshot(APPS_FILE, SEARCH_INDEX_SNAPSHOT_FILE)
+        if state is None:
+            return False
+        try:
+            self.index.restore(state)
+            return True
+        except Exception as e:
+            print(f"恢复搜索索引出错: {e}")
+            return False
@@ -1,6 +1,7 @@
 # coding: utf-8
 import requests
 import os
+import json
 from pathlib import Path
 import datetime
 import subprocess
@@ -9,7 +10,9 @@ from PyQt5.QtCore import QObject, QPoint, QThread, pyqtSignal, Qt
 from PyQt5.QtGui import QKeyEvent
 from PyQt5.QtWidgets import QApplication, QWidget
 from qfluentwidgets import (MessageBox, InfoBar, InfoBarManager, ProgressBar)
-from ..common.setting import VERSION, UPDATE_DATE, VERSION_URL
+from ..common.setting import VERSION, UPDATE_DATE, VERSION_URL, VERSION_FILE
+from .http_cache import conditional_get, save_response
+from .downloader import SegmentedDownloader, DownloadCancelled
 from .notification import Notification
 
 
@@ -36,40 +39,21 @@ class DownloadThread(QThread):
         self.url = url
         self.save_path = save_path
         self.is_cancelled = False
+        self.downloader = None
 
     def run(self):
         try:
-            # 创建保存目录
-            os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
-            
-            # 开始下载
-            response = requests.get(self.url, stream=True)
-            response.raise_for_status()  # 如果请求失败，抛出异常
-            
-            total_size = int(response.headers.get('content-length', 0))
-            
-            if total_size == 0:
-                self.finished_signal.emit(False, "无法获取文件大小")
-                return
-                
-            # 写入文件
-            downloaded_size = 0
-            with open(self.save_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if self.is_cancelled:
-                        file.close()
-                        os.remove(self.save_path)
-                        self.finished_signal.emit(False, "下载已取消")
-                        return
-                        
-                    if chunk:
-                        file.write(chunk)
-                        downloaded_size += len(chunk)
-                        # 更新进度
-                        progress = int((downloaded_size / total_size) * 100)
-                        self.progress_signal.emit(progress)
+            # 写入.part文件，中断后再次下载时可以续传
+            self.downloader = SegmentedDownloader(
+                self.url, self.save_path, progress_callback=self._on_progress
+            )
+            if self.is_cancelled:
+                self.downloader.cancel()
+            self.downloader.run()
             
             self.finished_signal.emit(True, "下载完成")
+        except DownloadCancelled:
+            self.finished_signal.emit(False, "下载已取消")
         except requests.exceptions.SSLError as e:
             error_msg = "网络安全连接错误，请检查网络设置或稍后重试"
             print(f"SSL错误: {str(e)}")
@@ -91,9 +75,16 @@ class DownloadThread(QThread):
             print(f"下载错误: {str(e)}")
             self.finished_signal.emit(False, error_msg)
     
+    def _on_progress(self, downloaded_size, total_size):
+        """更新进度"""
+        if total_size > 0:
+            self.progress_signal.emit(int((downloaded_size / total_size) * 100))
+
     def cancel(self):
         """取消下载"""
         self.is_cancelled = True
+        if self.downloader:
+            self.downloader.cancel()
 
 
 @InfoBarManager.register('Custom')
@@ -136,12 +127,14 @@ class CheckUpdateThread(QThread):
     def run(self):
         """线程执行函数，检查更新"""
         try:
-            # 发送请求获取最新版本信息
-            response = requests.get(self.version_url, timeout=10)
-            response.raise_for_status()  # 如果请求失败，抛出异常
-
-            # 解析JSON数据
-            data = response.json()
+            # 发送条件请求获取最新版本信息，未变化时使用本地保存的副本
+            response = conditional_get(self.version_url, VERSION_FILE, timeout=10)
+            if response is None:
+                with open(VERSION_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = response.json()
+                save_response(self.version_url, response, VERSION_FILE)
             remote_version = data.get("version")
             remote_date = data.get("update_date", "")
             changelog = data.get("changelog", [])
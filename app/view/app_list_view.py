@@ -0,0 +1,368 @@
+# coding:utf-8
+from collections import OrderedDict
+
+from qfluentwidgets import ListView, FluentIcon as FIF, Theme, getFont, isDarkTheme
+from PyQt5.QtCore import Qt, QAbstractListModel, QEasingCurve, QElapsedTimer, QModelIndex, QRect, QSize, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QFontMetrics, QPainter, QStaticText
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate, QToolTip
+
+
+CARD_HEIGHT = 70  # 卡片高度
+CARD_SPACING = 10  # 卡片间距
+CARD_MARGINS = (16, 8, 16, 8)  # 卡片内容边距（左、上、右、下）
+BUTTON_SIZE = 32  # 下载按钮大小
+ICON_SIZE = 16  # 下载按钮图标大小
+REVEAL_DURATION = 250  # 每个卡片淡入的时长（毫秒）
+REVEAL_STAGGER = 30  # 相邻卡片开始淡入的间隔（毫秒）
+TEXT_CACHE_SIZE = 256  # 最多缓存多少个卡片的文字排版，应大于一屏能显示的卡片数
+
+AppRole = Qt.UserRole + 1  # 应用数据
+DownloadableRole = Qt.UserRole + 2  # 是否显示下载按钮
+
+
+class AppListModel(QAbstractListModel):
+    """应用列表模型
+
+    只保存应用数据的引用，界面上的卡片由 :class:`AppCardDelegate` 按需绘制，
+    列表再长也只有可见的行需要绘制。
+    """
+
+    def __init__(self, isDownloadable, parent=None):
+        """
+        Args:
+            isDownloadable: 传入应用ID，返回是否显示下载按钮
+        """
+        super().__init__(parent)
+        self.isDownloadable = isDownloadable
+        self._apps = []
+        self._rows = {}  # 应用ID -> 行号
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._apps)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._apps):
+            return None
+
+        app = self._apps[index.row()]
+        if role == Qt.DisplayRole:
+            return app['name']
+        if role == AppRole:
+            return app
+        if role == DownloadableRole:
+            return self.isDownloadable(app.get('id', app['name']))
+        return None
+
+    def setApps(self, apps):
+        """替换显示的应用列表
+
+        新列表与当前列表的应用相同、只是顺序不同（例如切换排序方式）时只调整
+        行的顺序，视图保留滚动位置和悬停状态；否则重置模型。
+        """
+        apps = list(apps)
+        rows = {app.get('id', app['name']): row for row, app in enumerate(apps)}
+        if len(apps) != len(self._apps) or rows.keys() != self._rows.keys():
+            self.beginResetModel()
+            self._apps, self._rows = apps, rows
+            self.endResetModel()
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        oldIndexes = self.persistentIndexList()
+        newIndexes = []
+        for index in oldIndexes:
+            app = self._apps[index.row()]
+            newIndexes.append(self.index(rows[app.get('id', app['name'])]))
+        self._apps, self._rows = apps, rows
+        self.changePersistentIndexList(oldIndexes, newIndexes)
+        self.layoutChanged.emit()
+
+    def appAt(self, row):
+        """第 row 行的应用数据（不经过 QVariant 转换，不会复制字典）"""
+        return self._apps[row]
+
+    def updateApp(self, app_id):
+        """应用的下载状态变化后重新绘制对应的行"""
+        row = self._rows.get(app_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [DownloadableRole])
+
+
+class CardText:
+    """一个卡片的文字排版"""
+    __slots__ = ('app', 'width', 'name', 'version', 'versionX', 'description')
+
+
+class AppCardDelegate(QStyledItemDelegate):
+    """以卡片样式绘制应用，外观与之前每个应用一个的卡片控件相同
+
+    卡片的文字排版（省略后的名称、换行后的描述）按应用ID缓存，滚动、排序
+    和搜索时仍在结果中的应用直接复用之前的排版；缓存满时回收最久未绘制的
+    条目，内容或宽度变化时原地重新排版。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hoverRow = -1
+        self.hoverButton = False
+        self.pressedButtonRow = -1
+        self.nameFont = getFont(14, 600)
+        self.versionFont = getFont(12)
+        self.descriptionFont = getFont(14)
+        self.nameMetrics = QFontMetrics(self.nameFont)
+        self.versionMetrics = QFontMetrics(self.versionFont)
+        self.descriptionMetrics = QFontMetrics(self.descriptionFont)
+        self._texts = OrderedDict()  # 应用ID -> CardText，按最近绘制的顺序排列
+        self._icons = {}  # 是否为深色主题 -> 下载图标
+
+        # 淡入动画：行号 -> 开始淡入的时间（毫秒），不在其中的行直接完整显示
+        self.revealDelays = {}
+        self.revealElapsed = 0
+        self.revealCurve = QEasingCurve(QEasingCurve.InOutCubic)
+
+    def setHoverRow(self, row):
+        self.hoverRow = row
+
+    def setPressedRow(self, row):
+        pass
+
+    def setSelectedRows(self, indexes):
+        pass
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT + CARD_SPACING)
+
+    @staticmethod
+    def cardRect(rect):
+        """行内卡片所在的区域"""
+        return QRect(rect.x(), rect.y(), rect.width(), CARD_HEIGHT)
+
+    @staticmethod
+    def buttonRect(rect):
+        """行内下载按钮所在的区域"""
+        card = AppCardDelegate.cardRect(rect)
+        x = card.right() - CARD_MARGINS[2] - BUTTON_SIZE + 1
+        y = card.y() + (CARD_HEIGHT - BUTTON_SIZE) // 2
+        return QRect(x, y, BUTTON_SIZE, BUTTON_SIZE)
+
+    def paint(self, painter, option, index):
+        app = index.model().appAt(index.row())
+
+        row = index.row()
+        delay = self.revealDelays.get(row)
+        if delay is not None:
+            progress = (self.revealElapsed - delay) / REVEAL_DURATION
+            if progress <= 0:
+                return
+
+        painter.save()
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+        if delay is not None and progress < 1:
+            painter.setOpacity(self.revealCurve.valueForProgress(progress))
+        isDark = isDarkTheme()
+
+        # 卡片背景和边框
+        card = self.cardRect(option.rect)
+        if row == self.hoverRow:
+            painter.setBrush(QColor(255, 255, 255, 21 if isDark else 64))
+        else:
+            painter.setBrush(QColor(255, 255, 255, 13 if isDark else 170))
+        painter.setPen(QColor(0, 0, 0, 48 if isDark else 19))
+        painter.drawRoundedRect(card.adjusted(1, 1, -1, -1), 5, 5)
+
+        left, top, right, bottom = CARD_MARGINS
+        content = card.adjusted(left, top, -right, -bottom)
+
+        # 下载按钮
+        downloadable = index.data(DownloadableRole)
+        if downloadable:
+            button = self.buttonRect(option.rect)
+            if row == self.pressedButtonRow:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(255, 255, 255, 7) if isDark else QColor(0, 0, 0, 6))
+                painter.drawRoundedRect(button, 4, 4)
+            elif row == self.hoverRow and self.hoverButton:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(255, 255, 255, 9) if isDark else QColor(0, 0, 0, 9))
+                painter.drawRoundedRect(button, 4, 4)
+            offset = (BUTTON_SIZE - ICON_SIZE) // 2
+            self.__downloadIcon(isDark).paint(painter, button.adjusted(offset, offset, -offset, -offset))
+            content.setRight(button.left() - 8)
+
+        textColor = QColor(255, 255, 255) if isDark else QColor(0, 0, 0)
+        secondaryColor = QColor(206, 206, 206) if isDark else QColor(96, 96, 96)
+        text = self.__cardText(app, content.width())
+
+        # 名称和版本
+        painter.setFont(self.nameFont)
+        painter.setPen(textColor)
+        painter.drawStaticText(content.topLeft(), text.name)
+
+        if text.version is not None:
+            painter.setFont(self.versionFont)
+            painter.setPen(secondaryColor)
+            versionY = content.y() + self.nameMetrics.ascent() - self.versionMetrics.ascent()
+            painter.drawStaticText(content.x() + text.versionX, versionY, text.version)
+
+        # 描述，最多显示两行
+        if text.description is not None:
+            top = content.y() + self.nameMetrics.height() + 4
+            height = min(content.bottom() - top + 1, self.descriptionMetrics.lineSpacing() * 2)
+            painter.setFont(self.descriptionFont)
+            painter.setPen(textColor)
+            painter.setClipRect(QRect(content.x(), top, content.width(), height))
+            painter.drawStaticText(content.x(), top, text.description)
+
+        painter.restore()
+
+    def __cardText(self, app, width):
+        """获取应用在给定宽度下的文字排版，优先复用缓存"""
+        key = app.get('id', app['name'])
+        text = self._texts.get(key)
+        if text is not None:
+            self._texts.move_to_end(key)
+            if text.app is app and text.width == width:
+                return text
+        elif len(self._texts) >= TEXT_CACHE_SIZE:
+            # 回收最久未绘制的条目
+            _, text = self._texts.popitem(last=False)
+            self._texts[key] = text
+        else:
+            text = CardText()
+            self._texts[key] = text
+
+        text.app = app
+        text.width = width
+
+        version = f"v{app['version']}" if app.get('version') else ""
+        versionWidth = self.versionMetrics.horizontalAdvance(version) + 6 if version else 0
+        name = self.nameMetrics.elidedText(app['name'], Qt.ElideRight, max(width - versionWidth, 0))
+        text.name = self.__staticText(name, self.nameFont)
+        text.versionX = self.nameMetrics.horizontalAdvance(name) + 6
+        text.version = self.__staticText(version, self.versionFont) if version else None
+
+        description = app.get('description')
+        if description:
+            text.description = self.__staticText(description, self.descriptionFont, width)
+        else:
+            text.description = None
+        return text
+
+    def __downloadIcon(self, isDark):
+        """下载图标，QIcon 会缓存渲染好的图像，不必每次都重新绘制SVG"""
+        icon = self._icons.get(isDark)
+        if icon is None:
+            icon = self._icons[isDark] = FIF.DOWNLOAD.icon(Theme.DARK if isDark else Theme.LIGHT)
+        return icon
+
+    @staticmethod
+    def __staticText(string, font, width=None):
+        text = QStaticText(string)
+        text.setTextFormat(Qt.PlainText)
+        text.setPerformanceHint(QStaticText.AggressiveCaching)
+        if width is not None:
+            text.setTextWidth(width)
+        text.prepare(font=font)
+        return text
+
+    def helpEvent(self, event, view, option, index):
+        """鼠标停留在下载按钮上时显示提示"""
+        if index.isValid() and index.data(DownloadableRole) and self.buttonRect(option.rect).contains(event.pos()):
+            QToolTip.showText(event.globalPos(), self.tr("下载"), view)
+        else:
+            QToolTip.hideText()
+        return True
+
+
+class AppListView(ListView):
+    """应用列表，只为可见的行绘制卡片
+
+    列表内容更新后，可见区域内的卡片依次淡入，区域外的卡片直接显示，
+    动画时长与列表长度无关。淡入由委托绘制时设置透明度实现，不需要为
+    卡片创建图形效果和动画对象。
+    """
+    downloadClicked = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(AppCardDelegate(self))
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setUniformItemSizes(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setFocusPolicy(Qt.NoFocus)
+
+        self.revealClock = QElapsedTimer()
+        self.revealTimer = QTimer(self)
+        self.revealTimer.setInterval(16)
+        self.revealTimer.timeout.connect(self.__onRevealTimeout)
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self.__startReveal)
+
+    def __startReveal(self):
+        """依次淡入当前可见的卡片"""
+        self.revealTimer.stop()
+        self.delegate.revealDelays = {}
+        rowCount = self.model().rowCount()
+        if not self.isVisible() or not rowCount:
+            self.viewport().update()
+            return
+
+        rowHeight = CARD_HEIGHT + CARD_SPACING
+        first = self.verticalScrollBar().value() // rowHeight
+        last = min(first + self.viewport().height() // rowHeight + 1, rowCount - 1)
+        self.delegate.revealDelays = {row: (row - first) * REVEAL_STAGGER for row in range(first, last + 1)}
+        self.delegate.revealElapsed = 0
+        self.revealClock.start()
+        self.revealTimer.start()
+
+    def __onRevealTimeout(self):
+        elapsed = self.revealClock.elapsed()
+        if elapsed >= max(self.delegate.revealDelays.values(), default=0) + REVEAL_DURATION:
+            # 动画结束，之后的绘制不再计算透明度
+            self.revealTimer.stop()
+            self.delegate.revealDelays = {}
+        else:
+            self.delegate.revealElapsed = elapsed
+        self.viewport().update()
+
+    def mouseMoveEvent(self, e):
+        super().mouseMoveEvent(e)
+        index = self.indexAt(e.pos())
+        row = index.row() if index.isValid() else -1
+        hoverButton = self.__isOverButton(index, e.pos())
+        if row != self.delegate.hoverRow or hoverButton != self.delegate.hoverButton:
+            self.delegate.setHoverRow(row)
+            self.delegate.hoverButton = hoverButton
+            self.viewport().update()
+
+    def leaveEvent(self, e):
+        self.delegate.hoverButton = False
+        super().leaveEvent(e)
+
+    def mousePressEvent(self, e):
+        index = self.indexAt(e.pos())
+        if e.button() == Qt.LeftButton and self.__isOverButton(index, e.pos()):
+            self.delegate.pressedButtonRow = index.row()
+            self.viewport().update()
+        super().mousePressEvent(e)
+
+    def mouseReleaseEvent(self, e):
+        pressedRow = self.delegate.pressedButtonRow
+        self.delegate.pressedButtonRow = -1
+        super().mouseReleaseEvent(e)
+
+        index = self.indexAt(e.pos())
+        if pressedRow >= 0:
+            self.viewport().update()
+            if index.row() == pressedRow and self.__isOverButton(index, e.pos()):
+                self.downloadClicked.emit(self.model().appAt(index.row()))
+
+    def __isOverButton(self, index, pos):
+        if not index.isValid() or not index.data(DownloadableRole):
+            return False
+        return AppCardDelegate.buttonRect(self.visualRect(index)).contains(pos)
@@ -1,109 +1,165 @@
 # coding:utf-8
 from qfluentwidgets import (
-    ScrollArea, SegmentedWidget, CardWidget, SearchLineEdit, ComboBox, InfoBarPosition,
-    TransparentToolButton, BodyLabel, CaptionLabel, StrongBodyLabel, SubtitleLabel, ToolButton,
+    ScrollArea, SegmentedWidget, SearchLineEdit, ComboBox, InfoBarPosition, SubtitleLabel, ToolButton,
     FluentIcon as FIF
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QPropertyAnimation, QEasingCurve
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QGraphicsOpacityEffect
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget
 import json
 import os
 from PyQt5.QtCore import QTimer
 
 from ..common.style_sheet import StyleSheet
-from ..common.setting import APPS_FILE, DOWNLOADED_APPS_FILE
+from ..common.setting import DOWNLOADED_APPS_FILE
 from ..common.signal_bus import signalBus
+from ..utils.catalog import load_apps_list
+from ..utils.catalog_store import CatalogStore, SortKey, shared_store, update_shared_store
+from ..utils.pinyin import PinyinThread, pinyin_cache
+from ..utils.search_index import SearchIndex
+from ..utils.search_worker import IndexThread, SearchWorker
 from ..utils.notification import Notification
+from .app_list_view import AppListModel, AppListView
 
 
-class AppCard(CardWidget):
-    """应用卡片"""
-    downloadClicked = pyqtSignal(dict)
+SEARCH_DEBOUNCE = 200  # 输入停顿多久后开始搜索（毫秒）
+SORT_KEYS = [SortKey.DEFAULT, SortKey.NAME, SortKey.SIZE, SortKey.UPDATED, SortKey.VERSION]  # 与排序下拉框的选项对应
+FIXED_CATEGORIES = ['应用', '游戏']  # 始终显示的分类，其余分类有应用时才显示
+CATEGORY_ICONS = {'应用': FIF.APPLICATION, '游戏': FIF.GAME}
+TAB_WIDTH = 100  # 每个分类标签的宽度
+
+
+class CatalogPage(QWidget):
+    """一个分类的应用列表页面"""
+    downloadClicked = pyqtSignal(object)
+    refreshClicked = pyqtSignal()
     
-    def __init__(self, app_data, parent=None):
+    def __init__(self, category, index, isDownloadable, parent=None):
+        """
+        Args:
+            category: 分类名称
+            index: 整个目录共用的搜索索引
+            isDownloadable: 传入应用ID，返回是否显示下载按钮
+        """
         super().__init__(parent)
-        self.app_data = app_data
-        self.hBoxLayout = QHBoxLayout(self)
-        self.setObjectName("appCard")
-        
-        # 左侧信息部分
-        self.infoLayout = QVBoxLayout()
+        self.category = category
+        self.vBoxLayout = QVBoxLayout(self)
+        
+        # 应用目录和本分类应用的位集合
+        self.store = CatalogStore()
+        self.bits = 0
+        # 搜索结果（未排序）和排序后显示的应用数据
+        self.matched_positions = []
+        self.filtered_apps = []
         
-        # 标题和版本
-        self.titleLayout = QHBoxLayout()
-        self.nameLabel = StrongBodyLabel(app_data['name'])
-        self.nameLabel.setObjectName("nameLabel")
+        # 搜索在后台线程中执行，输入停顿后才开始查询，只显示最后一次查询的结果
+        self.searchWorker = SearchWorker(index, self)
+        self.searchWorker.resultReady.connect(self.__onSearchResult)
+        self.searchGeneration = 0
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DEBOUNCE)
+        self.searchTimer.timeout.connect(self.startSearch)
         
-        if app_data['version']:
-            self.versionLabel = CaptionLabel(f"v{app_data['version']}")
-            self.versionLabel.setObjectName("versionLabel")
-        else:
-            self.versionLabel = None
-        
-        self.titleLayout.addWidget(self.nameLabel)
-        if self.versionLabel:
-            self.titleLayout.addWidget(self.versionLabel)
-        self.titleLayout.addStretch(1)
+        # 搜索和排序区域
+        self.controlLayout = QHBoxLayout()
+        self.searchEdit = SearchLineEdit(self)
+        self.searchEdit.setPlaceholderText(self.tr("搜索{}...").format(category))
+        self.searchEdit.textChanged.connect(lambda: self.searchTimer.start())
+        
+        self.sortComboBox = ComboBox(self)
+        self.sortComboBox.addItems([
+            self.tr("默认排序"), self.tr("名称排序"), self.tr("大小排序"), self.tr("更新时间"), self.tr("版本排序")
+        ])
+        self.sortComboBox.setCurrentIndex(0)
+        self.sortComboBox.currentIndexChanged.connect(self.__onSortOptionChanged)
         
-        # 描述标签
-        if app_data.get('description'):
-            self.descriptionLabel = BodyLabel(app_data['description'])
-            self.descriptionLabel.setObjectName("descriptionLabel")
-            self.descriptionLabel.setWordWrap(True)
-            self.descriptionLabel.setMaximumHeight(40)
+        # 添加刷新按钮
+        self.refreshButton = ToolButton(FIF.SYNC)
+        self.refreshButton.setToolTip(self.tr("刷新{}列表").format(category))
+        self.refreshButton.clicked.connect(self.refreshClicked)
+        
+        self.controlLayout.addWidget(self.searchEdit, 1)
+        self.controlLayout.addWidget(self.sortComboBox)
+        self.controlLayout.addWidget(self.refreshButton)
+        
+        # 应用列表，卡片由委托按需绘制
+        self.listModel = AppListModel(isDownloadable, self)
+        self.listView = AppListView(self)
+        self.listView.setModel(self.listModel)
+        self.listView.downloadClicked.connect(self.downloadClicked)
+        self.emptyLabel = SubtitleLabel(self.tr("没有找到匹配的{}").format(category))
+        self.emptyLabel.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        self.emptyLabel.setVisible(False)
+        
+        # 列表与搜索栏之间留出间距
+        self.vBoxLayout.addLayout(self.controlLayout)
+        self.vBoxLayout.addSpacing(20)
+        self.vBoxLayout.addWidget(self.emptyLabel, 1)
+        self.vBoxLayout.addWidget(self.listView, 1)
+    
+    def setStore(self, store):
+        """切换到新的应用目录，保留当前的搜索和排序"""
+        self.store = store
+        self.bits = store.facet_bits('category', self.category)
+        self.refreshSearch()
+    
+    def refreshSearch(self):
+        """搜索索引更新后重新搜索，之前的搜索结果已失效"""
+        self.searchWorker.invalidate()
+        self.startSearch()
+    
+    def startSearch(self):
+        """开始搜索，搜索框为空时直接显示全部"""
+        self.searchTimer.stop()
+        text = self.searchEdit.text()
+        if text.strip():
+            self.searchGeneration = self.searchWorker.search(text)
         else:
-            self.descriptionLabel = None
-            
-        # 添加信息到左侧布局
-        self.infoLayout.addLayout(self.titleLayout)
-        if self.descriptionLabel:
-            self.infoLayout.addWidget(self.descriptionLabel)
-        self.infoLayout.addStretch(1)
-        
-        # 右侧操作按钮区域
-        self.buttonLayout = QHBoxLayout()
-        
-        # 下载按钮
-        self.downloadButton = TransparentToolButton(FIF.DOWNLOAD)
-        self.downloadButton.setToolTip("下载")
-        self.downloadButton.setObjectName("downloadButton")
-        
-        self.buttonLayout.addWidget(self.downloadButton)
-        self.buttonLayout.setSpacing(8)
-        self.buttonLayout.setContentsMargins(0, 0, 0, 0)
-        
-        # 添加到主布局
-        self.hBoxLayout.addLayout(self.infoLayout, 1)
-        self.hBoxLayout.addLayout(self.buttonLayout)
-        
-        # 设置样式
-        self.setFixedHeight(70)
-        self.hBoxLayout.setContentsMargins(16, 8, 16, 8)
-        
-        # 连接信号
-        self.downloadButton.clicked.connect(self.__onDownloadClicked)
-        
-    def __onDownloadClicked(self):
-        """处理下载按钮点击事件"""
-        self.downloadClicked.emit(self.app_data)
+            self.searchGeneration = self.searchWorker.cancel()
+            self.__onSearchResult(self.searchGeneration, None)
+    
+    def __onSearchResult(self, generation, matched):
+        """处理搜索结果，忽略已过期的查询"""
+        if generation != self.searchGeneration:
+            return
+        bits = self.bits
+        if matched is not None:
+            # 搜索索引包含整个目录，与本分类的位集合取交集
+            positions = (self.store.position(app_id) for app_id in matched)
+            bits &= self.store.bits_of(position for position in positions if position is not None)
+        self.matched_positions = self.store.positions(bits)
+        self.__onSortOptionChanged(self.sortComboBox.currentIndex())
+    
+    def __onSortOptionChanged(self, index):
+        """处理排序选项变化，按预先计算的名次排列，不访问应用数据"""
+        positions = self.store.sort(self.matched_positions, SORT_KEYS[index])
+        self.filtered_apps = [self.store.apps[i] for i in positions]
+        self.__updateList()
+    
+    def __updateList(self):
+        """更新列表显示"""
+        self.listModel.setApps(self.filtered_apps)
+        self.emptyLabel.setVisible(not self.filtered_apps)
+        self.listView.setVisible(bool(self.filtered_apps))
 
 
 class ApplicationInterface(ScrollArea):
     """ 应用界面 """
-
+    
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.scrollWidget = QWidget()
         self.vBoxLayout = QVBoxLayout(self.scrollWidget)
         self.parent = parent  # 保存父窗口引用
         
-        # 应用和游戏数据
-        self.apps = []
-        self.games = []
-        self.filtered_apps = []
-        self.filtered_games = []
-        self.original_apps_order = []
-        self.original_games_order = []
+        # 应用目录，加载时建立排序键和分类等分面索引
+        self.store = CatalogStore()
+        # 整个目录共用的搜索索引，各分类页面的搜索结果与分类取交集
+        self.index = SearchIndex()
+        # 在后台更新搜索索引和计算缺少的名称拼音
+        self.indexThread = None
+        self.indexPending = False
+        self.pinyinThread = None
         
         # 已添加到下载队列的应用ID
         self.downloaded_app_ids = set()
@@ -116,164 +172,142 @@ class ApplicationInterface(ScrollArea):
         # 创建堆叠小部件用于切换内容
         self.stackedWidget = QStackedWidget(self)
         
-        # 应用页面
-        self.appPage = QWidget(self)
-        self.appPageLayout = QVBoxLayout(self.appPage)
+        # 分类名称 -> 页面，按目录中出现的分类动态增减
+        self.pages = {}
+        for category in FIXED_CATEGORIES:
+            self.__addCategoryPage(category)
         
-        # 搜索和排序区域
-        self.appControlLayout = QHBoxLayout()
-        self.appSearchEdit = SearchLineEdit(self)
-        self.appSearchEdit.setPlaceholderText(self.tr("搜索应用..."))
-        self.appSearchEdit.textChanged.connect(self.__onAppSearchTextChanged)
-        
-        self.appSortComboBox = ComboBox(self)
-        self.appSortComboBox.addItems([self.tr("默认排序"), self.tr("名称排序")])
-        self.appSortComboBox.setCurrentIndex(0)
-        self.appSortComboBox.currentIndexChanged.connect(self.__onAppSortOptionChanged)
-        
-        # 添加刷新按钮
-        self.refreshButton = ToolButton(FIF.SYNC)
-        self.refreshButton.setToolTip(self.tr("刷新应用列表"))
-        self.refreshButton.clicked.connect(self.__onRefreshClicked)
-        
-        self.appControlLayout.addWidget(self.appSearchEdit, 1)
-        self.appControlLayout.addWidget(self.appSortComboBox)
-        self.appControlLayout.addWidget(self.refreshButton)
-        
-        # 应用卡片列表
-        self.appListLayout = QVBoxLayout()
-        
-        # 添加到应用页面布局
-        self.appPageLayout.addLayout(self.appControlLayout)
-        self.appPageLayout.addLayout(self.appListLayout)
-        self.appPage.setObjectName("appPage")
-        
-        # 游戏页面
-        self.gamePage = QWidget(self)
-        self.gamePageLayout = QVBoxLayout(self.gamePage)
-        
-        # 游戏搜索和排序区域
-        self.gameControlLayout = QHBoxLayout()
-        self.gameSearchEdit = SearchLineEdit(self)
-        self.gameSearchEdit.setPlaceholderText(self.tr("搜索游戏..."))
-        self.gameSearchEdit.textChanged.connect(self.__onGameSearchTextChanged)
-        
-        self.gameSortComboBox = ComboBox(self)
-        self.gameSortComboBox.addItems([self.tr("默认排序"), self.tr("名称排序")])
-        self.gameSortComboBox.setCurrentIndex(0)
-        self.gameSortComboBox.currentIndexChanged.connect(self.__onGameSortOptionChanged)
-        
-        # 添加刷新按钮
-        self.gameRefreshButton = ToolButton(FIF.SYNC)
-        self.gameRefreshButton.setToolTip(self.tr("刷新游戏列表"))
-        self.gameRefreshButton.clicked.connect(self.__onRefreshClicked)
-        
-        self.gameControlLayout.addWidget(self.gameSearchEdit, 1)
-        self.gameControlLayout.addWidget(self.gameSortComboBox)
-        self.gameControlLayout.addWidget(self.gameRefreshButton)
-        
-        # 游戏卡片列表
-        self.gameListLayout = QVBoxLayout()
-        
-        # 添加到游戏页面布局
-        self.gamePageLayout.addLayout(self.gameControlLayout)
-        self.gamePageLayout.addLayout(self.gameListLayout)
-        self.gamePage.setObjectName("gamePage")
-        
-        # 添加子界面（带图标）
-        self.addSubInterface(self.appPage, "appPage", self.tr("  应用  "), FIF.APPLICATION)
-        self.addSubInterface(self.gamePage, "gamePage", self.tr("  游戏  "), FIF.GAME)
-
         self.__initWidget()
         self.__loadApps()
         
         # 连接信号
         self.__connectSignalToSlot()
-
+    
     def addSubInterface(self, widget, objectName, text, icon=None):
         """添加子界面"""
         widget.setObjectName(objectName)
         self.stackedWidget.addWidget(widget)
         self.segmentedWidget.addItem(routeKey=objectName, text=text, icon=icon)
-
+    
     def __initWidget(self):
         self.resize(1000, 800)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setWidget(self.scrollWidget)
         self.setWidgetResizable(True)
         self.setObjectName('applicationInterface')
-
+        
         # 初始化样式表
         self.scrollWidget.setObjectName('scrollWidget')
-        self.segmentedWidget.setFixedWidth(200)
+        self.segmentedWidget.setFixedWidth(TAB_WIDTH * len(self.pages))
         
         # 应用样式表
         StyleSheet.SETTING_INTERFACE.apply(self)
-
+        
         # 设置默认显示的页面
-        self.stackedWidget.setCurrentWidget(self.appPage)
-        self.segmentedWidget.setCurrentItem("appPage")
-
+        self.stackedWidget.setCurrentWidget(self.pages[FIXED_CATEGORIES[0]])
+        self.segmentedWidget.setCurrentItem(FIXED_CATEGORIES[0])
+        
         # 初始化布局
         self.__initLayout()
         
         # 加载已下载的应用记录
         self.__loadDownloadedAppIds()
-
+    
     def __initLayout(self):
         self.vBoxLayout.setContentsMargins(36, 10, 36, 0)
         self.vBoxLayout.addSpacing(24)
         self.vBoxLayout.addWidget(self.segmentedWidget, 0, Qt.AlignCenter)
-        self.vBoxLayout.addWidget(self.stackedWidget)
-        self.vBoxLayout.addStretch(1)
-        
-        # 设置垂直列表布局的属性
-        self.appListLayout.setSpacing(10)
-        self.gameListLayout.setSpacing(10)
-        self.appListLayout.setContentsMargins(0, 20, 0, 0)
-        self.gameListLayout.setContentsMargins(0, 20, 0, 0)
-        
+        # 列表自带滚动条，页面填满剩余空间
+        self.vBoxLayout.addWidget(self.stackedWidget, 1)
+    
+    def __addCategoryPage(self, category):
+        """添加分类页面"""
+        page = CatalogPage(category, self.index, self.__isDownloadable, self)
+        page.downloadClicked.connect(self.__onDownloadApp)
+        page.refreshClicked.connect(self.__onRefreshClicked)
+        self.pages[category] = page
+        self.addSubInterface(page, category, f"  {category}  ", CATEGORY_ICONS.get(category, FIF.TAG))
+    
+    def __removeCategoryPage(self, category):
+        """移除已没有应用的分类页面"""
+        page = self.pages.pop(category)
+        if self.stackedWidget.currentWidget() is page:
+            self.stackedWidget.setCurrentWidget(self.pages[FIXED_CATEGORIES[0]])
+            self.segmentedWidget.setCurrentItem(FIXED_CATEGORIES[0])
+        self.segmentedWidget.removeWidget(category)
+        self.stackedWidget.removeWidget(page)
+        page.searchWorker.stop()
+        page.deleteLater()
+    
     def __loadApps(self):
-        """加载应用列表"""
+        """显示共享的应用目录，本地应用列表没有变化时直接从快照恢复，首次启动时为空，由主窗口在后台获取"""
+        self.setApps()
+    
+    def setApps(self, apps=None):
+        """使用新的应用列表原地更新界面，保留当前的搜索和排序
+        
+        apps 为None时显示已加载的共享目录，否则用 apps 替换共享目录
+        """
         try:
-            # 读取应用数据
-            if not os.path.exists(APPS_FILE):
-                self.__showErrorNotification("应用列表文件不存在，尝试创建...")
-                # 如果文件不存在，创建一个空的应用列表文件
-                try:
-                    os.makedirs(os.path.dirname(APPS_FILE), exist_ok=True)
-                    with open(APPS_FILE, 'w', encoding='utf-8') as f:
-                        json.dump([], f)
-                    self.__showSuccessNotification("已创建空的应用列表文件，请刷新或重启应用")
-                    # 使用空列表继续
-                    apps = []
-                except Exception as e:
-                    self.__showErrorNotification(f"创建应用列表文件失败: {e}")
-                    return
-            else:
-                with open(APPS_FILE, 'r', encoding='utf-8') as f:
-                    apps = json.load(f)
-            
-            # 分类应用和游戏
-            self.apps = [app for app in apps if app.get('category') == '应用']
-            self.games = [app for app in apps if app.get('category') == '游戏']
+            # 加载目录时一次性计算好排序键和各分面的位集合，下载界面也读取同一个目录
+            self.store = shared_store() if apps is None else update_shared_store(apps)
             
-            # 保存原始顺序
-            self.original_apps_order = self.apps.copy()
-            self.original_games_order = self.games.copy()
+            # 增量更新搜索索引，只重新索引有变化的条目
+            self.__updateSearchIndex()
             
-            # 初始化筛选后的列表
-            self.filtered_apps = self.apps.copy()
-            self.filtered_games = self.games.copy()
+            # 按目录中的分类增减页面，固定分类在前，其余按应用数量排列
+            categories = self.store.facet_counts('category')
+            for category in list(self.pages):
+                if category not in FIXED_CATEGORIES and category not in categories:
+                    self.__removeCategoryPage(category)
+            for category in categories:
+                if category not in self.pages:
+                    self.__addCategoryPage(category)
+            self.segmentedWidget.setFixedWidth(TAB_WIDTH * len(self.pages))
             
-            # 更新UI显示
-            self.__updateAppList()
-            self.__updateGameList()
-                
+            # 按当前搜索内容和排序方式重新显示
+            for page in self.pages.values():
+                page.setStore(self.store)
+        
         except Exception as e:
             print(f"加载应用列表出错: {e}")
             self.__showErrorNotification(f"加载应用列表出错: {e}")
     
+    def __updateSearchIndex(self):
+        """在后台更新搜索索引，名称的拼音作为别名，缺少的拼音在后台计算后再补充"""
+        if self.indexThread and self.indexThread.isRunning():
+            # 正在更新，完成后按最新的目录再更新一次
+            self.indexPending = True
+        else:
+            store = self.store
+            self.indexThread = IndexThread(self.index, lambda: self.__searchEntries(store), self)
+            self.indexThread.indexUpdated.connect(self.__onIndexUpdated)
+            self.indexThread.start()
+        
+        names = [app['name'] for app in self.store.apps]
+        if pinyin_cache.missing(names) and not (self.pinyinThread and self.pinyinThread.isRunning()):
+            self.pinyinThread = PinyinThread(names, self)
+            self.pinyinThread.pinyinReady.connect(self.__updateSearchIndex)
+            self.pinyinThread.start()
+    
+    @staticmethod
+    def __searchEntries(store):
+        """目录中所有应用的索引内容，在后台线程中调用"""
+        entries = {}
+        for app_id, app in zip(store.ids, store.apps):
+            aliases = pinyin_cache.get(app['name']) or ()
+            entries[app_id] = (app['name'], app.get('description') or '', aliases)
+        return entries
+    
+    def __onIndexUpdated(self, changed):
+        """搜索索引更新完成，各页面重新搜索"""
+        if self.indexPending:
+            self.indexPending = False
+            self.__updateSearchIndex()
+        if changed:
+            for page in self.pages.values():
+                page.refreshSearch()
+    
     def __loadDownloadedAppIds(self):
         """加载已下载的应用ID记录"""
         try:
@@ -297,155 +331,14 @@ class ApplicationInterface(ScrollArea):
             print(f"保存下载记录出错: {e}")
             self.__showErrorNotification(f"保存下载记录出错: {e}")
     
-    def __updateAppList(self):
-        """更新应用列表显示"""
-        # 停止和清理旧的动画定时器和动画
-        self.__clearAnimations("app_animation_timer", "app_animations")
-        
-        self.__clearLayout(self.appListLayout)
-        
-        if not self.filtered_apps:
-            emptyLabel = SubtitleLabel(self.tr("没有找到匹配的应用"))
-            emptyLabel.setAlignment(Qt.AlignCenter)
-            self.appListLayout.addWidget(emptyLabel)
-        else:
-            # 创建单独的卡片和动画列表
-            self.app_cards = []
-            self.app_animations = []
-            
-            for app in self.filtered_apps:
-                card = AppCard(app)
-                card.downloadClicked.connect(self.__onDownloadApp)
-                # 如果应用已经在下载队列中或正在下载中，隐藏下载按钮
-                app_id = app.get('id', app['name'])
-                if app_id in self.downloaded_app_ids or app_id in self.tracking_downloads:
-                    card.downloadButton.setVisible(False)
-                
-                # 初始设置为透明
-                card.setVisible(False)
-                self.appListLayout.addWidget(card)
-                self.app_cards.append(card)
-            
-            # 创建顺序显示卡片的定时器
-            self.app_animation_timer = QTimer()
-            self.app_animation_timer.setInterval(30)
-            self.app_animation_index = 0
-            self.app_animation_timer.timeout.connect(self.__animateNextAppCard)
-            self.app_animation_timer.start()
-        
-        self.appListLayout.addStretch(1)
+    def __isDownloadable(self, app_id):
+        """应用不在下载队列中且没有正在下载时显示下载按钮"""
+        return app_id not in self.downloaded_app_ids and app_id not in self.tracking_downloads
     
-    def __animateNextAppCard(self):
-        """依次显示下一个应用卡片"""
-        if self.app_animation_index < len(self.app_cards):
-            try:
-                card = self.app_cards[self.app_animation_index]
-                if not card.isVisible():
-                    card.setVisible(True)
-                
-                    # 创建淡入动画
-                    opacity = QGraphicsOpacityEffect(card)
-                    card.setGraphicsEffect(opacity)
-                    opacity.setOpacity(0)
-                
-                    animation = QPropertyAnimation(opacity, b"opacity")
-                    animation.setDuration(250)
-                    animation.setStartValue(0)
-                    animation.setEndValue(1)
-                    animation.setEasingCurve(QEasingCurve.InOutCubic)
-                    animation.start()
-                
-                    # 保存动画引用防止被垃圾回收
-                    self.app_animations.append(animation)
-            except (RuntimeError, Exception) as e:
-                # 对象可能已被删除或发生其他错误，跳过这个卡片
-                print(f"动画卡片错误: {e}")
-            
-            self.app_animation_index += 1
-        else:
-            # 所有卡片都已显示，停止定时器
-            self.app_animation_timer.stop()
-            
-    def __updateGameList(self):
-        """更新游戏列表显示"""
-        # 停止和清理旧的动画定时器和动画
-        self.__clearAnimations("game_animation_timer", "game_animations")
-        
-        self.__clearLayout(self.gameListLayout)
-        
-        if not self.filtered_games:
-            emptyLabel = SubtitleLabel(self.tr("没有找到匹配的游戏"))
-            emptyLabel.setAlignment(Qt.AlignCenter)
-            self.gameListLayout.addWidget(emptyLabel)
-        else:
-            # 创建单独的卡片和动画列表
-            self.game_cards = []
-            self.game_animations = []
-            
-            for game in self.filtered_games:
-                card = AppCard(game)
-                card.downloadClicked.connect(self.__onDownloadApp)
-                # 如果游戏已经在下载队列中或正在下载中，隐藏下载按钮
-                game_id = game.get('id', game['name'])
-                if game_id in self.downloaded_app_ids or game_id in self.tracking_downloads:
-                    card.downloadButton.setVisible(False)
-                
-                # 初始设置为透明
-                card.setVisible(False)
-                self.gameListLayout.addWidget(card)
-                self.game_cards.append(card)
-            
-            # 创建顺序显示卡片的定时器
-            self.game_animation_timer = QTimer()
-            self.game_animation_timer.setInterval(30)
-            self.game_animation_index = 0
-            self.game_animation_timer.timeout.connect(self.__animateNextGameCard)
-            self.game_animation_timer.start()
-            
-        self.gameListLayout.addStretch(1)
-        
-    def __animateNextGameCard(self):
-        """依次显示下一个游戏卡片"""
-        if self.game_animation_index < len(self.game_cards):
-            try:
-                card = self.game_cards[self.game_animation_index]
-                if not card.isVisible():
-                    card.setVisible(True)
-                    
-                    # 创建淡入动画
-                    opacity = QGraphicsOpacityEffect(card)
-                    card.setGraphicsEffect(opacity)
-                    opacity.setOpacity(0)
-                    
-                    animation = QPropertyAnimation(opacity, b"opacity")
-                    animation.setDuration(250)
-                    animation.setStartValue(0)
-                    animation.setEndValue(1)
-                    animation.setEasingCurve(QEasingCurve.InOutCubic)
-                    animation.start()
-                    
-                    # 保存动画引用防止被垃圾回收
-                    self.game_animations.append(animation)
-            except (RuntimeError, Exception) as e:
-                # 对象可能已被删除或发生其他错误，跳过这个卡片
-                print(f"动画卡片错误: {e}")
-                
-            self.game_animation_index += 1
-        else:
-            # 所有卡片都已显示，停止定时器
-            self.game_animation_timer.stop()
-    
-    def __clearLayout(self, layout):
-        """清空布局中的所有控件"""
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-            else:
-                layout_to_clear = item.layout()
-                if layout_to_clear is not None:
-                    self.__clearLayout(layout_to_clear)
+    def updateDownloadState(self, app_id):
+        """应用的下载状态变化后更新对应卡片的下载按钮"""
+        for page in self.pages.values():
+            page.listModel.updateApp(app_id)
     
     def __showErrorNotification(self, message):
         """显示错误通知"""
@@ -458,7 +351,7 @@ class ApplicationInterface(ScrollArea):
             duration=3000,
             parent=self.window()
         )
-        
+    
     def __showSuccessNotification(self, message):
         """显示成功通知"""
         Notification.success(
@@ -470,47 +363,7 @@ class ApplicationInterface(ScrollArea):
             duration=2000,
             parent=self.window()
         )
-            
-    def __onAppSearchTextChanged(self, text):
-        """处理应用搜索文本变化"""
-        if not text:
-            self.filtered_apps = self.apps.copy()
-        else:
-            self.filtered_apps = [app for app in self.apps if 
-                                text.lower() in app['name'].lower() or 
-                                (app.get('description') and text.lower() in app['description'].lower())]
-        self.__onAppSortOptionChanged(self.appSortComboBox.currentIndex())
     
-    def __onGameSearchTextChanged(self, text):
-        """处理游戏搜索文本变化"""
-        if not text:
-            self.filtered_games = self.games.copy()
-        else:
-            self.filtered_games = [game for game in self.games if 
-                                 text.lower() in game['name'].lower() or 
-                                 (game.get('description') and text.lower() in game['description'].lower())]
-        self.__onGameSortOptionChanged(self.gameSortComboBox.currentIndex())
-    
-    def __onAppSortOptionChanged(self, index):
-        """处理应用排序选项变化"""
-        if index == 0:  # 默认排序
-            if self.filtered_apps:
-                original_order_dict = {app['name']: i for i, app in enumerate(self.original_apps_order)}
-                self.filtered_apps.sort(key=lambda x: original_order_dict.get(x['name'], 999999))
-        elif index == 1:  # 名称排序
-            self.filtered_apps.sort(key=lambda x: x['name'])
-        self.__updateAppList()
-    
-    def __onGameSortOptionChanged(self, index):
-        """处理游戏排序选项变化"""
-        if index == 0:  # 默认排序
-            if self.filtered_games:
-                original_order_dict = {game['name']: i for i, game in enumerate(self.original_games_order)}
-                self.filtered_games.sort(key=lambda x: original_order_dict.get(x['name'], 999999))
-        elif index == 1:  # 名称排序
-            self.filtered_games.sort(key=lambda x: x['name'])
-        self.__updateGameList()
-            
     def __onDownloadApp(self, app_data):
         """处理应用下载"""
         try:
@@ -524,17 +377,15 @@ class ApplicationInterface(ScrollArea):
                 # 添加到正在下载的临时集合中
                 self.tracking_downloads.add(app_id)
                 
-                # 隐藏发送信号的卡片上的下载按钮
-                sender = self.sender()
-                if isinstance(sender, AppCard):
-                    sender.downloadButton.setVisible(False)
+                # 隐藏该应用卡片上的下载按钮
+                self.updateDownloadState(app_id)
                 
                 self.__showSuccessNotification(f"已添加 {app_data['name']} {app_data.get('version', '')} 到下载队列")
             else:
                 self.__showErrorNotification(f"应用 {app_data['name']} 没有可用的下载链接")
         except Exception as e:
             self.__showErrorNotification(f"下载 {app_data['name']} 时出错: {str(e)}")
-        
+    
     def __onRefreshClicked(self):
         """处理刷新按钮点击事件"""
         # 如果父窗口存在并且有refreshAppsList方法，调用它
@@ -542,38 +393,12 @@ class ApplicationInterface(ScrollArea):
             self.parent.refreshAppsList()
         else:
             # 否则只重新加载本地文件
-            self.__loadApps()
+            self.setApps(load_apps_list())
             self.__showSuccessNotification(self.tr("应用列表已刷新"))
-        
+    
     def __connectSignalToSlot(self):
         """连接信号和槽"""
         # 连接分段导航栏的信号
         self.segmentedWidget.currentItemChanged.connect(
-            lambda k: self.stackedWidget.setCurrentWidget(self.findChild(QWidget, k))
-        ) 
-
-    def __clearAnimations(self, timer_attr_name, animations_attr_name):
-        """清理动画定时器和动画列表
-        
-        Args:
-            timer_attr_name: 定时器属性名称
-            animations_attr_name: 动画列表属性名称
-        """
-        # 停止定时器
-        if hasattr(self, timer_attr_name):
-            timer = getattr(self, timer_attr_name)
-            try:
-                timer.stop()
-                timer.timeout.disconnect()  # 断开所有连接
-            except Exception:
-                pass  # 忽略任何错误
-        
-        # 清空动画列表
-        if hasattr(self, animations_attr_name):
-            animations = getattr(self, animations_attr_name)
-            for animation in animations:
-                try:
-                    animation.stop()
-                except Exception:
-                    pass  # 忽略任何错误
-            setattr(self, animations_attr_name, []) 
\ No newline at end of file
+            lambda k: self.stackedWidget.setCurrentWidget(self.pages[k]) if k in self.pages else None
+        )
@@ -1,16 +1,20 @@
 # coding: utf-8
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
 from PyQt5.QtGui import QFont
 
-from qfluentwidgets import (ScrollArea, SubtitleLabel, BodyLabel, setFont, PrimaryPushButton, LineEdit)
+from qfluentwidgets import (ScrollArea, SubtitleLabel, BodyLabel, setFont, PrimaryPushButton, LineEdit, SpinBox)
 
 from ..common.style_sheet import StyleSheet
 from ..common.config import cfg
 from ..common.setting import DEFAULT_DOWNLOAD_PATH
+from ..utils.download_cache import download_cache
 from ..utils.notification import Notification
 
 
+SPIN_BOX_DEBOUNCE = 500  # 微调框停止变化多久后写入配置（毫秒）
+
+
 class CustomInterface(ScrollArea):
     """ 自定义界面 """
 
@@ -52,6 +56,71 @@ class CustomInterface(ScrollArea):
         self.downloadPathLayout.addWidget(self.downloadPathEdit)
         self.downloadPathLayout.addWidget(self.browseButton)
         self.downloadPathLayout.addWidget(self.resetButton)
+        
+        # 同时下载任务数设置
+        self.concurrencyLabel = SubtitleLabel(self.tr("同时下载任务数"), self)
+        self.concurrencyLabel.setObjectName("concurrencyLabel")
+        
+        self.concurrencyDescriptionLabel = BodyLabel(
+            self.tr("超出数量的任务将排队等待，修改后立即生效"),
+            self
+        )
+        
+        self.concurrencySpinBox = SpinBox(self)
+        self.concurrencySpinBox.setRange(*cfg.maxConcurrentDownloads.range)
+        self.concurrencySpinBox.setValue(cfg.maxConcurrentDownloads.value)
+        self.concurrencySpinBox.setFixedWidth(140)
+        
+        # 下载限速设置
+        self.speedLimitLabel = SubtitleLabel(self.tr("下载限速"), self)
+        self.speedLimitLabel.setObjectName("speedLimitLabel")
+        
+        self.speedLimitDescriptionLabel = BodyLabel(
+            self.tr("单位为 KB/s，0 表示不限速，修改后对正在进行的下载立即生效"),
+            self
+        )
+        
+        self.speedLimitLayout = QHBoxLayout()
+        self.globalSpeedLimitLabel = BodyLabel(self.tr("全局"), self)
+        self.globalSpeedLimitSpinBox = SpinBox(self)
+        self.globalSpeedLimitSpinBox.setRange(*cfg.globalSpeedLimit.range)
+        self.globalSpeedLimitSpinBox.setValue(cfg.globalSpeedLimit.value)
+        self.globalSpeedLimitSpinBox.setFixedWidth(160)
+        
+        self.taskSpeedLimitLabel = BodyLabel(self.tr("单个任务"), self)
+        self.taskSpeedLimitSpinBox = SpinBox(self)
+        self.taskSpeedLimitSpinBox.setRange(*cfg.taskSpeedLimit.range)
+        self.taskSpeedLimitSpinBox.setValue(cfg.taskSpeedLimit.value)
+        self.taskSpeedLimitSpinBox.setFixedWidth(160)
+        
+        self.speedLimitLayout.addWidget(self.globalSpeedLimitLabel)
+        self.speedLimitLayout.addWidget(self.globalSpeedLimitSpinBox)
+        self.speedLimitLayout.addSpacing(20)
+        self.speedLimitLayout.addWidget(self.taskSpeedLimitLabel)
+        self.speedLimitLayout.addWidget(self.taskSpeedLimitSpinBox)
+        self.speedLimitLayout.addStretch(1)
+        
+        # 安装包缓存设置
+        self.cacheLabel = SubtitleLabel(self.tr("安装包缓存"), self)
+        self.cacheLabel.setObjectName("cacheLabel")
+        
+        self.cacheDescriptionLabel = BodyLabel(
+            self.tr("缓存已下载的安装包，重新下载或切换下载路径时无需再次下载。单位为 MB，0 表示禁用缓存"),
+            self
+        )
+        
+        self.cacheLayout = QHBoxLayout()
+        self.cacheSizeSpinBox = SpinBox(self)
+        self.cacheSizeSpinBox.setRange(*cfg.cacheSizeLimit.range)
+        self.cacheSizeSpinBox.setValue(cfg.cacheSizeLimit.value)
+        self.cacheSizeSpinBox.setFixedWidth(160)
+        
+        self.clearCacheButton = PrimaryPushButton(self.tr("清空缓存"), self)
+        self.clearCacheButton.clicked.connect(self.__onClearCacheButtonClicked)
+        
+        self.cacheLayout.addWidget(self.cacheSizeSpinBox)
+        self.cacheLayout.addWidget(self.clearCacheButton)
+        self.cacheLayout.addStretch(1)
          
         # 初始化界面
         self.__initWidget()
@@ -69,6 +138,12 @@ class CustomInterface(ScrollArea):
         # 设置字体
         setFont(self.downloadPathLabel, 18, QFont.Weight.DemiBold)
         setFont(self.downloadPathDescriptionLabel, 14, QFont.Weight.Normal)
+        setFont(self.concurrencyLabel, 18, QFont.Weight.DemiBold)
+        setFont(self.concurrencyDescriptionLabel, 14, QFont.Weight.Normal)
+        setFont(self.speedLimitLabel, 18, QFont.Weight.DemiBold)
+        setFont(self.speedLimitDescriptionLabel, 14, QFont.Weight.Normal)
+        setFont(self.cacheLabel, 18, QFont.Weight.DemiBold)
+        setFont(self.cacheDescriptionLabel, 14, QFont.Weight.Normal)
         
         # 应用样式表
         StyleSheet.SETTING_INTERFACE.apply(self)
@@ -86,11 +161,59 @@ class CustomInterface(ScrollArea):
         self.vBoxLayout.addSpacing(10)
         self.vBoxLayout.addLayout(self.downloadPathLayout)
         
+        # 添加同时下载任务数设置
+        self.vBoxLayout.addWidget(self.concurrencyLabel)
+        self.vBoxLayout.addSpacing(5)
+        self.vBoxLayout.addWidget(self.concurrencyDescriptionLabel)
+        self.vBoxLayout.addSpacing(10)
+        self.vBoxLayout.addWidget(self.concurrencySpinBox)
+        
+        # 添加下载限速设置
+        self.vBoxLayout.addWidget(self.speedLimitLabel)
+        self.vBoxLayout.addSpacing(5)
+        self.vBoxLayout.addWidget(self.speedLimitDescriptionLabel)
+        self.vBoxLayout.addSpacing(10)
+        self.vBoxLayout.addLayout(self.speedLimitLayout)
+        
+        # 添加安装包缓存设置
+        self.vBoxLayout.addWidget(self.cacheLabel)
+        self.vBoxLayout.addSpacing(5)
+        self.vBoxLayout.addWidget(self.cacheDescriptionLabel)
+        self.vBoxLayout.addSpacing(10)
+        self.vBoxLayout.addLayout(self.cacheLayout)
+        
         self.vBoxLayout.addStretch(1)
         
     def __connectSignalToSlot(self):
         """连接信号和槽"""
-        pass
+        self.__connectSpinBox(self.concurrencySpinBox, self.__onConcurrencyChanged)
+        self.__connectSpinBox(self.globalSpeedLimitSpinBox,
+                              lambda value: cfg.set(cfg.globalSpeedLimit, value))
+        self.__connectSpinBox(self.taskSpeedLimitSpinBox,
+                              lambda value: cfg.set(cfg.taskSpeedLimit, value))
+        self.__connectSpinBox(self.cacheSizeSpinBox,
+                              lambda value: cfg.set(cfg.cacheSizeLimit, value))
+
+    def __connectSpinBox(self, spinBox, slot):
+        """微调框的值停止变化后再调用 slot，避免输入或连续点击时每一步都写入配置
+
+        编辑完成（回车或失去焦点）时立即调用，不必等待。
+        """
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(SPIN_BOX_DEBOUNCE)
+
+        def apply():
+            timer.stop()
+            slot(spinBox.value())
+
+        def finish():
+            if timer.isActive():
+                apply()
+
+        spinBox.valueChanged.connect(lambda value: timer.start())
+        spinBox.editingFinished.connect(finish)
+        timer.timeout.connect(apply)
         
     def __onBrowseButtonClicked(self):
         """浏览按钮点击事件"""
@@ -113,6 +236,21 @@ class CustomInterface(ScrollArea):
                 parent=self
             )
     
+    def __onConcurrencyChanged(self, value):
+        """同时下载任务数变化事件"""
+        cfg.set(cfg.maxConcurrentDownloads, value)
+    
+    def __onClearCacheButtonClicked(self):
+        """清空缓存按钮点击事件"""
+        download_cache.clear()
+        
+        Notification.success(
+            self.tr('清空成功'),
+            self.tr('安装包缓存已清空'),
+            duration=2000,
+            parent=self
+        )
+    
     def __onResetButtonClicked(self):
         """重置按钮点击事件"""
         # 重置为默认下载路径
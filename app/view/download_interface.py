@@ -1,26 +1,61 @@
 # coding:utf-8
 from qfluentwidgets import ScrollArea, SegmentedWidget, CardWidget, ProgressBar
-from PyQt5.QtCore import Qt, QUrl, pyqtSlot, pyqtSignal, QObject
+from PyQt5.QtCore import Qt, QUrl, QTimer, pyqtSlot, pyqtSignal, QObject
 from PyQt5.QtGui import QFont, QDesktopServices
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QStackedWidget, QHBoxLayout, QSizePolicy
 from qfluentwidgets import FluentIcon as FIF
 from qfluentwidgets import TransparentToolButton
+import errno
 import os
 import requests
-import threading
 import json
 import time # Added for time.time()
 
 from ..common.style_sheet import StyleSheet
 from qfluentwidgets import setFont
-from ..common.setting import APPS_FILE, DOWNLOADED_APPS_FILE, get_download_path
+from ..common.config import cfg
+from ..common.setting import DOWNLOADED_APPS_FILE, get_download_path
+from ..utils.catalog_store import shared_store
+from ..utils.delta import DeltaDownloader
+from ..utils.downloader import SegmentedDownloader, CancelToken, DownloadCancelled, discard_partial, probe
+from ..utils.download_cache import DownloadCache, download_cache
+from ..utils.download_scheduler import DownloadScheduler
+from ..utils.integrity import IntegrityError, verified_files
+from ..utils.rate_limiter import TokenBucket, global_limiter
+from ..utils.retry import call_with_retry
 from ..utils.notification import Notification
 from ..utils.update import CustomMessageBox
 
 
+PROGRESS_INTERVAL = 100  # 刷新下载进度的间隔（毫秒）
+SPEED_INTERVAL = 0.5  # 计算下载速度的最短时间窗口（秒）
+
+
+class DownloadProgress:
+    """下载进度计数器
+
+    由下载线程直接写入，界面线程的定时器定期读取，无需加锁也无需跨线程信号。
+    """
+
+    __slots__ = ('downloaded', 'total', 'retrying')
+
+    def __init__(self):
+        self.downloaded = 0
+        self.total = 0
+        self.retrying = None  # 正在重试时为 (第几次尝试, 最多尝试次数)
+
+    def snapshot(self):
+        """返回 (进度百分比, 已下载大小)"""
+        downloaded, total = self.downloaded, self.total
+        progress = int(downloaded / total * 100) if total > 0 else 0
+        return min(progress, 100), downloaded
+
+
 class DownloadSignals(QObject):
     """下载相关信号"""
-    updateDownloadSignal = pyqtSignal(str, int, int, float)  # 更新下载信号 (app_id, progress, downloaded_size, current_time)
+    downloadPausedSignal = pyqtSignal(str)  # 下载已暂停信号
+    downloadCancelledSignal = pyqtSignal(str)  # 下载已取消信号
+    downloadStartedSignal = pyqtSignal(str)  # 开始下载信号 (app_id)
     moveToCompletedSignal = pyqtSignal(str)  # 移至已完成信号 (app_id)
     moveToFailedSignal = pyqtSignal(str, str)  # 移至失败信号 (app_id, error_msg)
 
@@ -32,6 +67,10 @@ class DownloadTaskCard(CardWidget):
     redownloadSignal = pyqtSignal(object)
     # 添加文件删除信号
     deleteFileSignal = pyqtSignal(object)
+    # 暂停、继续、取消下载信号
+    pauseSignal = pyqtSignal(object)
+    resumeSignal = pyqtSignal(object)
+    cancelSignal = pyqtSignal(object)
     
     def __init__(self, app_data, parent=None):
         super().__init__(parent)
@@ -43,7 +82,8 @@ class DownloadTaskCard(CardWidget):
         self.file_size = 0  # 添加文件大小属性
         self.download_speed = 0  # 添加下载速度属性
         self.downloaded_size = 0  # 添加已下载大小属性
-        self.last_update_time = 0  # 上次更新时间
+        self.last_update_time = 0  # 上次计算速度的时间
+        self.last_snapshot = None  # 上次显示的进度
         
         # 应用名称和版本
         self.headerLayout = QHBoxLayout()
@@ -82,6 +122,7 @@ class DownloadTaskCard(CardWidget):
         
         # 创建操作按钮
         self.buttons = {}
+        self.controlButtons = {}
         self._createButtons()
         
         # 将按钮布局添加到状态布局
@@ -110,6 +151,16 @@ class DownloadTaskCard(CardWidget):
         
         for key, (icon, tooltip, callback) in button_configs.items():
             self.buttons[key] = self._createButton(icon, tooltip, callback)
+        
+        # 下载过程中的控制按钮
+        control_configs = {
+            'pause': (FIF.PAUSE, self.tr("暂停"), lambda: self.pauseSignal.emit(self.app_data)),
+            'resume': (FIF.PLAY, self.tr("继续"), lambda: self.resumeSignal.emit(self.app_data)),
+            'cancel': (FIF.CLOSE, self.tr("取消下载"), lambda: self.cancelSignal.emit(self.app_data))
+        }
+        
+        for key, (icon, tooltip, callback) in control_configs.items():
+            self.controlButtons[key] = self._createButton(icon, tooltip, callback)
 
     def _createButton(self, icon, tooltip, callback):
         """创建操作按钮"""
@@ -120,9 +171,13 @@ class DownloadTaskCard(CardWidget):
         self.buttonsLayout.addWidget(button)
         return button
 
-    @pyqtSlot(int, int, float)
     def updateDownload(self, progress, downloaded_size, current_time):
         """更新下载进度和速度"""
+        # 进度没有变化时不重绘
+        if self.last_snapshot == (progress, downloaded_size):
+            return
+        self.last_snapshot = (progress, downloaded_size)
+        
         # 更新进度条
         self.progressBar.setValue(progress)
         
@@ -130,9 +185,11 @@ class DownloadTaskCard(CardWidget):
         if progress < 100:
             self.statusLabel.setText(f"{self.tr('正在下载')} {progress}%")
             
-            # 计算下载速度
+            # 计算下载速度，时间窗口太短时数值跳动较大，先累积
             if self.last_update_time > 0:
                 time_diff = current_time - self.last_update_time
+                if time_diff < SPEED_INTERVAL:
+                    return
                 if time_diff > 0:
                     size_diff = downloaded_size - self.downloaded_size
                     self.download_speed = size_diff / time_diff
@@ -165,16 +222,69 @@ class DownloadTaskCard(CardWidget):
             if os.path.exists(self.local_file_path):
                 self._setButtonsVisible(True)
     
+    def setRetrying(self, attempt, max_attempts):
+        """设置为等待重试状态"""
+        if self.last_snapshot == ('retry', attempt):
+            return
+        self.last_snapshot = ('retry', attempt)
+        self.last_update_time = 0  # 恢复下载后重新计算速度
+        self.statusLabel.setText(f"{self.tr('正在重试')} ({attempt}/{max_attempts})")
+        self.downloadDetailsLabel.setText("")
+    
+    def setCompleted(self):
+        """设置为下载完成状态"""
+        self.is_downloaded = True
+        self.progressBar.setValue(100)
+        self.statusLabel.setText(self.tr("下载完成"))
+        self.downloadDetailsLabel.setText("")
+        self._setControlsVisible()
+        self._setButtonsVisible(True)
+    
+    def setFailed(self, error_msg):
+        """设置为下载失败状态"""
+        self.statusLabel.setText(f"{self.tr('下载失败')}: {self.tr(error_msg)}")
+        self.downloadDetailsLabel.setText("")
+        self._setControlsVisible()
+    
+    def setQueued(self, keep_progress=False):
+        """设置为排队等待状态，继续下载时保留进度条"""
+        if not keep_progress:
+            self.progressBar.setValue(0)
+        self.statusLabel.setText(self.tr("排队中..."))
+        self.downloadDetailsLabel.setText("")
+        self.is_downloaded = False
+        self.downloaded_size = 0
+        self.last_update_time = 0
+        self.last_snapshot = None
+        self._setButtonsVisible(False)
+        self._setControlsVisible(pause=True, cancel=True)
+    
+    def setStarted(self):
+        """设置为开始下载状态"""
+        self.statusLabel.setText(self.tr("正在准备下载..."))
+    
+    def setStopping(self, cancelled=False):
+        """已请求暂停或取消，等待下载线程退出"""
+        self.statusLabel.setText(self.tr("正在取消...") if cancelled else self.tr("正在暂停..."))
+        self.downloadDetailsLabel.setText("")
+        self._setControlsVisible(cancel=not cancelled)
+    
+    def setPaused(self):
+        """设置为已暂停状态"""
+        self.statusLabel.setText(f"{self.tr('已暂停')} {self.progressBar.value()}%")
+        self.downloadDetailsLabel.setText("")
+        self._setControlsVisible(resume=True, cancel=True)
+    
+    def _setControlsVisible(self, pause=False, resume=False, cancel=False):
+        """设置下载控制按钮的可见性"""
+        self.controlButtons['pause'].setVisible(pause)
+        self.controlButtons['resume'].setVisible(resume)
+        self.controlButtons['cancel'].setVisible(cancel)
+    
     def _handleRedownload(self):
         """处理重新下载请求"""
         # 发送重新下载信号
         self.redownloadSignal.emit(self.app_data)
-        
-        # 重置进度条和状态
-        self.progressBar.setValue(0)
-        self.statusLabel.setText(self.tr("正在准备下载..."))
-        self.is_downloaded = False
-        self._setButtonsVisible(False)
 
     def setFilename(self, filename):
         """设置下载的文件名"""
@@ -272,9 +382,36 @@ class DownloadInterface(ScrollArea):
         self.signals = DownloadSignals()
         
         # 连接信号到槽
-        self.signals.updateDownloadSignal.connect(self._onUpdateDownload)
         self.signals.moveToCompletedSignal.connect(self._moveToCompleted)
         self.signals.moveToFailedSignal.connect(self._moveToFailed)
+        self.signals.downloadStartedSignal.connect(self._onDownloadStarted)
+        self.signals.downloadPausedSignal.connect(self._onDownloadPaused)
+        self.signals.downloadCancelledSignal.connect(self._onDownloadCancelled)
+        
+        # 暂停/取消令牌，下载线程结束前一直保留
+        self.cancel_tokens = {}
+        # 已暂停的任务
+        self.pausedTasks = set()
+        
+        # 所有任务的下载进度由一个定时器统一刷新
+        self.progress = {}
+        self.progressTimer = QTimer(self)
+        self.progressTimer.setInterval(PROGRESS_INTERVAL)
+        self.progressTimer.timeout.connect(self._refreshProgress)
+        
+        # 下载调度器，限制同时进行的下载任务数
+        self.scheduler = DownloadScheduler(cfg.get(cfg.maxConcurrentDownloads))
+        cfg.maxConcurrentDownloads.valueChanged.connect(self.scheduler.set_max_concurrency)
+        
+        # 下载限速，全局限速器所有任务共享，单任务限速器每个任务一个
+        self.task_limiters = {}
+        global_limiter.set_rate(cfg.get(cfg.globalSpeedLimit) * 1024)
+        cfg.globalSpeedLimit.valueChanged.connect(lambda value: global_limiter.set_rate(value * 1024))
+        cfg.taskSpeedLimit.valueChanged.connect(self._onTaskSpeedLimitChanged)
+        
+        # 安装包缓存
+        download_cache.set_size_limit(cfg.get(cfg.cacheSizeLimit) * 1024 * 1024)
+        cfg.cacheSizeLimit.valueChanged.connect(lambda value: download_cache.set_size_limit(value * 1024 * 1024))
         
         # 确保下载目录存在
         os.makedirs(get_download_path(), exist_ok=True)
@@ -393,6 +530,17 @@ class DownloadInterface(ScrollArea):
         self.vBoxLayout.addWidget(self.stackedWidget, 1, Qt.AlignHCenter)
         self.vBoxLayout.addStretch(1)
         
+    def _connectTaskCard(self, task_card):
+        """连接下载任务卡片的信号"""
+        # 连接重新下载信号
+        task_card.redownloadSignal.connect(self._handleRedownload)
+        # 连接文件删除信号
+        task_card.deleteFileSignal.connect(self._handleDeleteFile)
+        # 连接暂停、继续、取消信号
+        task_card.pauseSignal.connect(self._handlePause)
+        task_card.resumeSignal.connect(self._handleResume)
+        task_card.cancelSignal.connect(self._handleCancel)
+        
     def addDownloadTask(self, app_data):
         """添加下载任务"""
         # 如果已存在，则不重复添加
@@ -407,10 +555,7 @@ class DownloadInterface(ScrollArea):
             
         # 创建下载任务卡片
         task_card = DownloadTaskCard(app_data)
-        # 连接重新下载信号
-        task_card.redownloadSignal.connect(self._handleRedownload)
-        # 连接文件删除信号
-        task_card.deleteFileSignal.connect(self._handleDeleteFile)
+        self._connectTaskCard(task_card)
         self.downloadingTasks[app_id] = task_card
         
         # 添加到下载中界面，并确保占满宽度
@@ -436,108 +581,337 @@ class DownloadInterface(ScrollArea):
             return f"{name}_{version}.{format}"
         return f"{name}.{format}"
         
-    def _startDownloadThread(self, app_data, app_id, task_card):
-        """启动下载线程的通用方法"""
+    def _startDownloadThread(self, app_data, app_id, task_card, resume=False):
+        """将下载任务加入调度队列的通用方法"""
         # 获取文件名
         filename = self._getAppFilename(app_data)
         
         # 设置文件名
         task_card.setFilename(filename)
         
-        # 启动下载线程
+        # 加入下载队列，由调度器在有空闲名额时开始下载
         if app_data.get('download_url'):
-            download_thread = threading.Thread(
-                target=self._downloadFile,
-                args=(app_data['download_url'], filename, app_id)
-            )
-            download_thread.daemon = True
-            download_thread.start()
+            task_card.setQueued(keep_progress=resume)
+            self.pausedTasks.discard(app_id)
+            self.cancel_tokens[app_id] = CancelToken()
+            self.progress[app_id] = DownloadProgress()
+            self.progressTimer.start()
+            sha256 = app_data.get('sha256')
+            # 缓存中已有相同内容时优先处理，无需等待前面的下载
+            priority = -1 if sha256 and download_cache.contains(sha256.lower()) else 0
+            self.scheduler.submit(
+                app_id, lambda task_id: self._downloadFile(app_data, filename, task_id), priority)
             return True
         else:
             # 如果没有下载URL，显示错误
-            self._moveToFailed(app_id, "没有可用的下载链接")
+            self.signals.moveToFailedSignal.emit(app_id, "没有可用的下载链接")
             return False
             
-    def _downloadFile(self, url, filename, app_id):
-        """下载文件"""
+    def _downloadFile(self, app_data, filename, app_id):
+        """下载文件
+
+        提供sha256/size时边下载边校验；缓存命中时直接从缓存还原；提供分块清单
+        且下载目录中有旧版本时，只下载变化的部分。
+        """
+        url = app_data['download_url']
+        sha256 = app_data.get('sha256')
+        size = app_data.get('size') if isinstance(app_data.get('size'), int) else 0
+        
         # 获取最新的下载路径
         download_path = get_download_path()
         local_path = os.path.join(download_path, filename)
         task_card = self.downloadingTasks.get(app_id)
+        progress = self.progress.get(app_id)
+        token = self.cancel_tokens.get(app_id)
+        
+        if not task_card or not progress or not token:
+            return
         
-        if not task_card:
+        # 排队期间已被暂停或取消
+        if token.is_set():
+            self._emitCancelled(app_id, token, local_path)
             return
+        
+        self.signals.downloadStartedSignal.emit(app_id)
+        rate_limiter = None
             
         try:
-            # 如果是重新下载，需要删除原有文件
+            # 如果是重新下载，需要删除原有文件（未完成的.part文件会保留用于续传）
             if os.path.exists(local_path):
                 try:
                     os.remove(local_path)
                 except Exception:
                     pass  # 如果无法删除，会覆盖写入
             
-            # 设置请求头
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+            # 保存文件名
+            task_card.setFilename(filename)
             
-            # 使用requests流式下载文件
-            with requests.get(url, headers=headers, stream=True, timeout=30) as response:
-                # 确保请求成功
-                response.raise_for_status()
-                
-                # 获取文件大小
-                file_size = int(response.headers.get('Content-Length', 0))
-                
-                # 确保目录存在
-                os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                
-                # 保存文件名
-                task_card.setFilename(filename)
-                
-                # 已下载的数据大小
-                downloaded = 0
-                # 增大块大小到 1MB，提高下载效率
-                chunk_size = 1024 * 1024
-                
-                # 下载开始时间
-                start_time = time.time()
-                last_update_time = start_time
-                
-                # 打开文件准备写入
-                with open(local_path, 'wb') as f:
-                    # 读取和写入数据块
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:  # 过滤keep-alive新块
-                            # 写入文件
-                            f.write(chunk)
-                            
-                            # 更新下载进度
-                            downloaded += len(chunk)
-                            progress = int(downloaded / file_size * 100) if file_size > 0 else 100
-                            
-                            # 每0.5秒更新一次UI，避免频繁更新
-                            current_time = time.time()
-                            if current_time - last_update_time > 0.5 or progress >= 100:
-                                # 使用信号槽更新UI
-                                self.signals.updateDownloadSignal.emit(app_id, progress, downloaded, current_time)
-                                last_update_time = current_time
+            # 已知哈希时按内容查找缓存，无需访问网络；还原时已重新计算哈希
+            if sha256 and download_cache.restore(sha256.lower(), local_path) == sha256.lower():
+                verified_files.record(local_path, sha256)
+                self.signals.moveToCompletedSignal.emit(app_id)
+                return
+            
+            # 只更新计数器，由界面定时器统一读取刷新
+            def on_progress(downloaded, file_size):
+                if downloaded != progress.downloaded:
+                    progress.retrying = None  # 重新收到数据，重试成功
+                progress.total = file_size
+                progress.downloaded = downloaded
+            
+            def on_retry(attempt, max_attempts):
+                progress.retrying = (attempt, max_attempts)
+            
+            # 否则按URL和ETag/Last-Modified查找缓存，只需一次探测请求
+            info = call_with_retry(lambda: probe(url), cancel_event=token, retry_callback=on_retry)
+            if not sha256 and info.validator:
+                if download_cache.restore(DownloadCache.url_key(url, info.validator), local_path):
+                    self.signals.moveToCompletedSignal.emit(app_id)
+                    return
+            progress.retrying = None
+            
+            # 单任务限速器，设置调整时会同步更新
+            rate_limiter = TokenBucket(cfg.get(cfg.taskSpeedLimit) * 1024)
+            self.task_limiters[app_id] = rate_limiter
+            
+            # 有旧版本和分块清单时尝试增量更新，失败则回退为完整下载
+            downloader = self._downloadDelta(app_data, filename, local_path, on_progress, on_retry, rate_limiter, token)
+            
+            if downloader is None:
+                # 服务器支持Range时分段并行下载并可断点续传，否则回退为单连接下载
+                downloader = SegmentedDownloader(
+                    url, local_path,
+                    segments=cfg.get(cfg.downloadSegments),
+                    progress_callback=on_progress,
+                    rate_limiter=rate_limiter,
+                    expected_sha256=sha256,
+                    expected_size=size,
+                    info=info,
+                    write_size=cfg.get(cfg.writeBufferSize) * 1024 * 1024,
+                    retry_callback=on_retry,
+                    cancel_token=token
+                )
+                downloader.run()
+                info = downloader.info
+            
+            # 记录校验通过的哈希，之后判断是否已下载时无需重新计算
+            if downloader.sha256:
+                verified_files.record(local_path, downloader.sha256)
             
             # 下载完成后，发送完成信号
             self.signals.moveToCompletedSignal.emit(app_id)
             
+            # 在后台放入缓存（已启用时），之后重新下载或切换下载目录时无需再次下载
+            if sha256:
+                cache_key = sha256.lower()
+            elif info.validator:
+                cache_key = DownloadCache.url_key(url, info.validator)
+            else:
+                cache_key = None
+            try:
+                download_cache.store_later(cache_key, local_path, downloader.sha256)
+            except Exception as e:
+                print(f"写入缓存出错: {e}")
+            
+        except DownloadCancelled:
+            self._emitCancelled(app_id, token, local_path)
+        except IntegrityError as e:
+            print(f"文件校验失败: {str(e)}")
+            self.signals.moveToFailedSignal.emit(app_id, "文件校验失败")
         except Exception as e:
-            # 统一处理所有错误
-            error_type = "网络错误" if isinstance(e, requests.RequestException) else "下载失败"
+            # 等待重试期间被暂停或取消
+            if token.is_set():
+                self._emitCancelled(app_id, token, local_path)
+                return
+            # 统一处理其他错误
+            error_type = self._failureReason(e)
             print(f"{error_type}: {str(e)}")
-            self.signals.moveToFailedSignal.emit(app_id, "网络错误")
+            self.signals.moveToFailedSignal.emit(app_id, error_type)
+        finally:
+            # 暂停后立即继续时，新的下载线程可能已登记了自己的限速器
+            if self.task_limiters.get(app_id) is rate_limiter:
+                self.task_limiters.pop(app_id, None)
+    
+    @staticmethod
+    def _failureReason(error):
+        """显示在任务卡片上的失败原因"""
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return f"服务器错误 ({error.response.status_code})"
+        # requests 的异常同时也是 OSError，需要先判断
+        if isinstance(error, requests.RequestException):
+            return "网络错误"
+        if isinstance(error, OSError):
+            return "磁盘空间不足" if error.errno == errno.ENOSPC else "写入文件出错"
+        return "下载失败"
+    
+    def _emitCancelled(self, app_id, token, local_path):
+        """下载线程响应暂停或取消后通知界面，取消时删除未完成的数据"""
+        if token.paused:
+            self.signals.downloadPausedSignal.emit(app_id)
+        else:
+            try:
+                discard_partial(local_path)
+            except OSError as e:
+                print(f"删除未完成的下载文件出错: {e}")
+            self.signals.downloadCancelledSignal.emit(app_id)
 
-    @pyqtSlot(str, int, int, float)
-    def _onUpdateDownload(self, app_id, progress, downloaded_size, current_time):
-        """处理下载更新信号"""
+    def _findPreviousVersion(self, app_data, filename):
+        """在下载目录中查找同一应用的其他版本文件，返回最近修改的一个"""
+        name = app_data['name']
+        format = app_data.get('format', 'exe')
+        download_path = get_download_path()
+        
+        try:
+            candidates = [
+                entry for entry in os.scandir(download_path)
+                if entry.is_file() and entry.name != filename
+                and entry.name.startswith(f"{name}_") and entry.name.endswith(f".{format}")
+            ]
+        except OSError:
+            return None
+        
+        if not candidates:
+            return None
+        return max(candidates, key=lambda entry: entry.stat().st_mtime).path
+    
+    def _downloadDelta(self, app_data, filename, local_path, on_progress, on_retry, rate_limiter, token):
+        """尝试增量更新，成功返回下载器，不满足条件或失败时返回None"""
+        manifest_url = app_data.get('block_manifest')
+        if not manifest_url:
+            return None
+        
+        old_path = self._findPreviousVersion(app_data, filename)
+        if not old_path:
+            return None
+        
+        downloader = DeltaDownloader(
+            app_data['download_url'], manifest_url, old_path, local_path,
+            progress_callback=on_progress,
+            rate_limiter=rate_limiter,
+            retry_callback=on_retry,
+            cancel_token=token
+        )
+        try:
+            downloader.run()
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            if token.is_set():
+                raise DownloadCancelled("下载已取消")
+            print(f"增量更新失败，改为完整下载: {e}")
+            return None
+        
+        sha256 = app_data.get('sha256')
+        if sha256 and downloader.sha256 != sha256.lower():
+            os.remove(local_path)
+            raise IntegrityError(f"SHA-256校验失败: 应为 {sha256}，实际为 {downloader.sha256}")
+        
+        # 之前暂停的完整下载已不再需要
+        try:
+            discard_partial(local_path)
+        except OSError as e:
+            print(f"删除未完成的下载文件出错: {e}")
+        
+        print(f"增量更新完成: 复用 {downloader.reused_size} 字节，下载 {downloader.fetched_size} 字节")
+        return downloader
+    
+    def _onTaskSpeedLimitChanged(self, value):
+        """单任务限速调整后立即作用于正在进行的下载"""
+        for rate_limiter in list(self.task_limiters.values()):
+            rate_limiter.set_rate(value * 1024)
+    
+    @pyqtSlot(object)
+    def _handlePause(self, app_data):
+        """暂停下载，释放连接和调度名额，已下载的数据保留"""
+        app_id = app_data.get('id', app_data['name'])
+        token = self.cancel_tokens.get(app_id)
+        if app_id not in self.downloadingTasks or not token:
+            return
+        
+        token.cancel(CancelToken.PAUSE)
+        if self.scheduler.remove(app_id):
+            # 尚未开始，直接暂停
+            self._onDownloadPaused(app_id)
+        else:
+            # 等待下载线程退出
+            self.downloadingTasks[app_id].setStopping()
+    
+    @pyqtSlot(object)
+    def _handleResume(self, app_data):
+        """继续已暂停的下载，从已下载的位置续传"""
+        app_id = app_data.get('id', app_data['name'])
+        task_card = self.downloadingTasks.get(app_id)
+        if task_card and app_id in self.pausedTasks:
+            self._startDownloadThread(app_data, app_id, task_card, resume=True)
+    
+    @pyqtSlot(object)
+    def _handleCancel(self, app_data):
+        """取消下载并删除未完成的数据"""
+        app_id = app_data.get('id', app_data['name'])
+        if app_id not in self.downloadingTasks:
+            return
+        
+        token = self.cancel_tokens.get(app_id)
+        if token and not self.scheduler.remove(app_id):
+            # 正在下载，由下载线程退出后清理
+            token.cancel(CancelToken.CANCEL)
+            self.downloadingTasks[app_id].setStopping(cancelled=True)
+            return
+        
+        # 排队中或已暂停，直接删除未完成的数据
+        discard_partial(os.path.join(get_download_path(), self._getAppFilename(app_data)))
+        self.signals.downloadCancelledSignal.emit(app_id)
+    
+    @pyqtSlot(str)
+    def _onDownloadPaused(self, app_id):
+        """处理下载已暂停信号"""
+        self.cancel_tokens.pop(app_id, None)
+        self.progress.pop(app_id, None)
+        task_card = self.downloadingTasks.get(app_id)
+        if task_card:
+            self.pausedTasks.add(app_id)
+            task_card.setPaused()
+    
+    @pyqtSlot(str)
+    def _onDownloadCancelled(self, app_id):
+        """处理下载已取消信号，移除任务卡片"""
+        self.cancel_tokens.pop(app_id, None)
+        self.progress.pop(app_id, None)
+        self.pausedTasks.discard(app_id)
+        task_card = self.downloadingTasks.pop(app_id, None)
+        if task_card:
+            self.pages["downloadingPage"]["layout"].removeWidget(task_card)
+            task_card.deleteLater()
+            
+            # 如果下载列表为空，显示"暂无下载"提示
+            if not self.downloadingTasks:
+                self.pages["downloadingPage"]["infoLabel"].show()
+            
+            self._showNotification('已取消', f"{task_card.app_data['name']} {self.tr('已取消下载')}")
+    
+    @pyqtSlot(str)
+    def _onDownloadStarted(self, app_id):
+        """处理开始下载信号"""
         task_card = self.downloadingTasks.get(app_id)
         if task_card:
-            task_card.updateDownload(progress, downloaded_size, current_time)
+            task_card.setStarted()
+    
+    def _refreshProgress(self):
+        """定时读取所有任务的进度快照，只刷新有变化的卡片"""
+        if not self.progress:
+            self.progressTimer.stop()
+            return
+        
+        current_time = time.time()
+        for app_id, progress in list(self.progress.items()):
+            task_card = self.downloadingTasks.get(app_id)
+            token = self.cancel_tokens.get(app_id)
+            if not task_card or (token and token.is_set()):
+                continue  # 正在暂停或取消时保持提示文字
+            if progress.retrying:
+                task_card.setRetrying(*progress.retrying)
+            elif progress.total > 0:
+                task_card.updateDownload(*progress.snapshot(), current_time)
     
     def resizeEvent(self, event):
         """处理窗口大小调整事件"""
@@ -581,56 +955,48 @@ class DownloadInterface(ScrollArea):
     def _loadCompletedDownloads(self):
         """加载已完成的下载记录"""
         try:
-            # 加载已下载应用列表
-            if not os.path.exists(APPS_FILE):
+            # 与应用列表界面共用已加载的应用目录
+            store = shared_store()
+            if not len(store):
                 return
                 
-            with open(APPS_FILE, 'r', encoding='utf-8') as f:
-                all_apps = json.load(f)
-                
             # 用于存储真正已下载完成的应用ID
             verified_download_ids = set()
+            
+            # 获取当前下载路径
+            download_path = get_download_path()
                 
             # 检查每个已下载的应用ID
             for app_id in self.downloaded_app_ids:
-                for app in all_apps:
-                    app_identifier = app.get('id', app['name'])
-                    if app_identifier == app_id:
-                        # 获取文件名
-                        filename = self._getAppFilename(app)
-                            
-                        # 获取当前下载路径
-                        download_path = get_download_path()
-                        local_path = os.path.join(download_path, filename)
-                        
-                        # 如果文件存在，添加到已完成列表
-                        if os.path.exists(local_path):
-                            verified_download_ids.add(app_id)
-                            
-                            task_card = DownloadTaskCard(app)
-                            task_card.setFilename(filename)
-                            task_card.is_downloaded = True
-                            task_card.statusLabel.setText(self.tr("下载完成"))
-                            task_card.updateProgress(100)  # 设置进度条为100%
-                            # 确保按钮可见
-                            task_card._setButtonsVisible(True)
-                            
-                            # 连接重新下载信号
-                            task_card.redownloadSignal.connect(self._handleRedownload)
-                            # 连接文件删除信号
-                            task_card.deleteFileSignal.connect(self._handleDeleteFile)
-                            
-                            # 添加到已完成列表
-                            self.completedTasks[app_id] = task_card
-                            
-                            # 隐藏"暂无完成"提示
-                            self.pages["completedPage"]["infoLabel"].hide()
-                            
-                            # 添加到已完成界面
-                            self.pages["completedPage"]["layout"].insertWidget(0, task_card, 0, Qt.AlignTop | Qt.AlignHCenter)
-                            task_card.setMinimumWidth(self.width() - 80)  # 设置最小宽度，考虑左右边距
-                        
-                        break
+                position = store.position(app_id)
+                if position is None:
+                    continue
+                app = store.apps[position]
+                
+                # 获取文件名
+                filename = self._getAppFilename(app)
+                local_path = os.path.join(download_path, filename)
+                
+                # 如果文件存在，添加到已完成列表；
+                # 有校验记录的文件只需比较大小和修改时间即可确认未被改动
+                if os.path.exists(local_path) and self._isFileIntact(app, local_path):
+                    verified_download_ids.add(app_id)
+                    
+                    task_card = DownloadTaskCard(app)
+                    task_card.setFilename(filename)
+                    task_card.setCompleted()
+                    # 重新下载后同样需要暂停、继续和取消
+                    self._connectTaskCard(task_card)
+                    
+                    # 添加到已完成列表
+                    self.completedTasks[app_id] = task_card
+                    
+                    # 隐藏"暂无完成"提示
+                    self.pages["completedPage"]["infoLabel"].hide()
+                    
+                    # 添加到已完成界面
+                    self.pages["completedPage"]["layout"].insertWidget(0, task_card, 0, Qt.AlignTop | Qt.AlignHCenter)
+                    task_card.setMinimumWidth(self.width() - 80)  # 设置最小宽度，考虑左右边距
             
             # 更新下载记录，只保留真正已下载的应用ID
             self.downloaded_app_ids = verified_download_ids
@@ -640,6 +1006,13 @@ class DownloadInterface(ScrollArea):
         except Exception as e:
             print(f"加载已完成下载记录出错: {e}")
 
+    def _isFileIntact(self, app_data, local_path):
+        """判断已下载文件是否完整，没有校验记录的文件视为完整"""
+        sha256 = app_data.get('sha256')
+        if not sha256 or not verified_files.has_record(local_path):
+            return True
+        return verified_files.is_verified(local_path, sha256)
+
     def _moveTaskBetweenLists(self, app_id, source_dict, source_page_key, target_dict, target_page_key, status_text=None):
         """在不同任务列表间移动任务卡片的通用方法"""
         if app_id in source_dict:
@@ -690,12 +1063,15 @@ class DownloadInterface(ScrollArea):
         )
         
         if task_card:
+            self.progress.pop(app_id, None)
+            self.cancel_tokens.pop(app_id, None)
+            
             # 添加到已下载应用ID列表并保存
             self.downloaded_app_ids.add(app_id)
             self._saveDownloadedAppIds()
             
-            # 确保按钮可见
-            task_card._setButtonsVisible(True)
+            # 设置为完成状态并确保按钮可见
+            task_card.setCompleted()
                 
             # 显示通知
             app_name = task_card.app_data['name']
@@ -709,16 +1085,19 @@ class DownloadInterface(ScrollArea):
             self.downloadingTasks, 
             "downloadingPage",
             self.failedTasks, 
-            "failedPage",
-            f"{self.tr('下载失败')}: {self.tr('网络错误')}"
+            "failedPage"
         )
         
         if task_card:
+            self.progress.pop(app_id, None)
+            self.cancel_tokens.pop(app_id, None)
+            task_card.setFailed(error_msg)
+            
             # 只显示友好通知
             app_name = task_card.app_data['name']
             self._showNotification(
                 '添加失败', 
-                f"{app_name} {self.tr('网络错误')}", 
+                f"{app_name} {self.tr(error_msg)}", 
                 'error',
                 3000
             )
@@ -777,6 +1156,9 @@ class DownloadInterface(ScrollArea):
             # 保存到JSON文件
             self._saveDownloadedAppIds()
         
+        # 删除校验记录
+        verified_files.remove(os.path.join(get_download_path(), self._getAppFilename(app_data)))
+        
         # 从已完成列表中移除卡片
         if app_id in self.completedTasks:
             task_card = self.completedTasks.pop(app_id)
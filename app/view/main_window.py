@@ -1,6 +1,4 @@
 # coding:utf-8
-import os
-import requests
 import time
 
 from PyQt5.QtCore import QSize, QTimer
@@ -17,8 +15,8 @@ from .custom_interface import CustomInterface
 from ..common.config import cfg
 from ..common.icon import Icon
 from ..common.signal_bus import signalBus
-from ..common.setting import APPS_LIST_URL, CONFIG_FOLDER, APPS_FILE
 from ..common.style_sheet import StyleSheet
+from ..utils.catalog import FetchAppsThread
 from ..utils.update import UpdateManager
 from ..utils.notification import Notification
 
@@ -27,9 +25,8 @@ class MainWindow(MSFluentWindow):
     def __init__(self):
         super().__init__()
         self.initWindow()
-
-        # 获取应用列表
-        self.fetchAppsList()
+        self.fetchAppsThread = None
+        self.notifyFetchResult = False  # 获取完成后是否显示提示
 
         # 主题切换防抖控制
         self.last_theme_update = 0
@@ -53,19 +50,16 @@ class MainWindow(MSFluentWindow):
         # 同步两个界面的下载记录
         self.syncDownloadRecords()
 
+        # 界面先显示本地保存的应用列表，再在后台获取最新列表
+        self.fetchAppsList()
+
         # 如果配置中启用了启动时检查更新，则在启动时检查更新
         if cfg.get(cfg.checkUpdateAtStartUp):
             self.checkUpdate()
 
     def refreshAppsList(self):
         """重新获取应用列表并刷新应用界面"""
-        # 先获取应用列表
-        self.fetchAppsList()
-        
-        # 然后重新加载应用界面
-        if hasattr(self, 'applicationInterface'):
-            self.applicationInterface._ApplicationInterface__loadApps()
-            self.__showInfoMessage("应用列表已刷新")
+        self.fetchAppsList(notify=True)
             
     def __showInfoMessage(self, message):
         """显示信息通知"""
@@ -83,6 +77,8 @@ class MainWindow(MSFluentWindow):
         signalBus.checkUpdateSig.connect(self.checkUpdate)
         signalBus.downloadApp.connect(self.onDownloadApp)
         self.downloadInterface.signals.moveToCompletedSignal.connect(self.onDownloadComplete)
+        self.downloadInterface.signals.moveToFailedSignal.connect(self.onDownloadFailed)
+        self.downloadInterface.signals.downloadCancelledSignal.connect(self.onDownloadCancelled)
         
         # 统一处理主题变更，只更新当前可见的界面
         cfg.themeChanged.connect(self.onThemeChanged)
@@ -150,9 +146,16 @@ class MainWindow(MSFluentWindow):
             
     def onDownloadFailed(self, app_id, error_msg):
         """处理下载失败事件"""
+        self.__stopTrackingDownload(app_id)
+        
+    def onDownloadCancelled(self, app_id):
+        """处理下载取消事件"""
+        self.__stopTrackingDownload(app_id)
+        
+    def __stopTrackingDownload(self, app_id):
+        """下载没有完成，恢复应用列表中的下载按钮以便再次下载"""
         # 从正在下载的临时集合中移除
-        if hasattr(self.applicationInterface, 'tracking_downloads') and app_id in self.applicationInterface.tracking_downloads:
-            self.applicationInterface.tracking_downloads.remove(app_id)
+        self.applicationInterface.tracking_downloads.discard(app_id)
         
         # 只更新对应卡片的状态，不刷新整个列表
         self.__updateAppCardDownloadButton(app_id)
@@ -163,47 +166,41 @@ class MainWindow(MSFluentWindow):
         Args:
             app_id: 应用ID
         """
-        # 在应用界面查找并更新对应的卡片
-        appInterface = self.applicationInterface
-        
-        # 检查应用界面中的卡片
-        if hasattr(appInterface, 'app_cards'):
-            for card in appInterface.app_cards:
-                card_id = card.app_data.get('id', card.app_data['name'])
-                if card_id == app_id:
-                    card.downloadButton.setVisible(False)
-                    break
-        
-        # 检查游戏界面中的卡片
-        if hasattr(appInterface, 'game_cards'):
-            for card in appInterface.game_cards:
-                card_id = card.app_data.get('id', card.app_data['name'])
-                if card_id == app_id:
-                    card.downloadButton.setVisible(False)
-                    break
+        self.applicationInterface.updateDownloadState(app_id)
 
     def checkUpdate(self):
         """检查更新"""
         self.updateManager.check_for_updates()
         
-    def fetchAppsList(self):
-        """从指定URL获取应用列表并保存到AppData目录"""
-        try:
-            response = requests.get(APPS_LIST_URL, timeout=5)
-            
-            if response.status_code == 200:
-                # 确保AppData目录存在
-                os.makedirs(CONFIG_FOLDER, exist_ok=True)
-                
-                # 保存到AppData目录中的apps.json文件
-                with open(APPS_FILE, "w", encoding="utf-8") as f:
-                    f.write(response.text)
-                print(f"应用列表已更新: {APPS_FILE}")
-            else:
-                print(f"获取应用列表失败，状态码: {response.status_code}")
-                
-        except Exception as e:
-            print(f"获取应用列表出错: {str(e)}")
+    def fetchAppsList(self, notify=False):
+        """在后台线程中获取应用列表，有变化时原地更新应用界面
+
+        Args:
+            notify: 完成后是否显示提示
+        """
+        # 上一次获取尚未完成时不再重复获取，完成后再显示提示
+        self.notifyFetchResult = self.notifyFetchResult or notify
+        if self.fetchAppsThread and self.fetchAppsThread.isRunning():
+            return
+        
+        self.fetchAppsThread = FetchAppsThread(self)
+        self.fetchAppsThread.fetchFinished.connect(self.onAppsListFetched)
+        self.fetchAppsThread.start()
+    
+    def onAppsListFetched(self, success, changed, apps):
+        """处理应用列表获取结果"""
+        if changed:
+            self.applicationInterface.setApps(apps)
+        
+        notify, self.notifyFetchResult = self.notifyFetchResult, False
+        if not notify:
+            return
+        if not success:
+            self.__showInfoMessage("获取应用列表失败，请检查网络连接")
+        elif changed:
+            self.__showInfoMessage("应用列表已刷新")
+        else:
+            self.__showInfoMessage("应用列表已是最新")
 
     def initNavigation(self):
         # 设置所有接口的 objectName
@@ -0,0 +1,182 @@
+# coding: utf-8
+"""应用列表增量同步的测试，服务器为本地的静态文件目录
+
+运行: python -m unittest discover tests
+"""
+import functools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from app.utils import catalog, http_cache
+from app.utils.catalog import make_delta, merge_delta, publish, sync_apps_list
+from app.utils.http_cache import ValidatorStore
+
+
+def make_apps(count, version='1.0'):
+    return [{'id': f'app{i}', 'name': f'App {i}', 'version': version} for i in range(count)]
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    """静态文件服务，记录请求的路径，errors 中的路径返回对应的错误码"""
+
+    requests = []
+    errors = {}
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        code = self.errors.get(self.path)
+        if code:
+            self.send_error(code)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MergeDeltaTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        old = make_apps(10)
+        new = [app for app in old if app['id'] != 'app3']
+        new[5] = dict(new[5], version='2.0')
+        new.append({'id': 'app10', 'name': 'App 10', 'version': '1.0'})
+
+        delta = make_delta(old, new, 2)
+        self.assertEqual(delta['base'], 1)
+        self.assertEqual(delta['remove'], ['app3'])
+        self.assertEqual([app['id'] for app in delta['upsert']], ['app6', 'app10'])
+        self.assertEqual(merge_delta(old, delta), new)
+
+    def test_app_without_id(self):
+        old = [{'name': 'A', 'version': '1'}]
+        new = [{'name': 'A', 'version': '2'}]
+        self.assertEqual(merge_delta(old, make_delta(old, new, 2)), new)
+
+
+class SyncAppsListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.server_folder = os.path.join(self.folder, 'server')
+        self.client_folder = os.path.join(self.folder, 'client')
+        os.makedirs(self.server_folder)
+        os.makedirs(self.client_folder)
+
+        StaticHandler.requests = []
+        StaticHandler.errors = {}
+        handler = functools.partial(StaticHandler, directory=self.server_folder)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+        self.apps_file = os.path.join(self.client_folder, 'apps.json')
+        store = ValidatorStore(os.path.join(self.client_folder, 'http_validators.json'))
+        self.patches = [
+            mock.patch.multiple(
+                catalog,
+                APPS_FILE=self.apps_file,
+                APPS_REVISION_FILE=os.path.join(self.client_folder, 'apps.revision.json'),
+                APPS_LIST_URL=f'{base_url}/apps.json',
+                APPS_REVISION_URL=f'{base_url}/apps.revision.json',
+                APPS_DELTA_URL=base_url + '/apps.delta/{revision}.json',
+                validators=store,
+            ),
+            mock.patch.object(http_cache, 'validators', store),
+            mock.patch('builtins.print'),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def publish(self, apps):
+        path = os.path.join(self.folder, 'new_apps.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(apps, f)
+        revision = publish(path, self.server_folder)
+        # Last-Modified 精确到秒，同一秒内再次发布会被当作未变化，发布的文件按版本号推迟修改时间
+        mtime = time.time() + revision * 10
+        for name in ('apps.json', 'apps.revision.json'):
+            os.utime(os.path.join(self.server_folder, name), (mtime, mtime))
+        return revision
+
+    def local_apps(self):
+        with open(self.apps_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_full_then_delta(self):
+        self.publish(make_apps(20))
+        self.assertEqual(sync_apps_list(), make_apps(20))
+        self.assertIn('/apps.json', StaticHandler.requests)
+
+        # 新版本只获取增量数据
+        apps = make_apps(20)
+        apps[3]['version'] = '2.0'
+        apps.append({'id': 'app20', 'name': 'App 20', 'version': '1.0'})
+        self.assertEqual(self.publish(apps), 2)
+        StaticHandler.requests = []
+        self.assertEqual(sync_apps_list(), apps)
+        self.assertEqual(self.local_apps(), apps)
+        self.assertIn('/apps.delta/2.json', StaticHandler.requests)
+        self.assertNotIn('/apps.json', StaticHandler.requests)
+
+        # 没有新版本
+        self.assertIsNone(sync_apps_list())
+
+    def test_missing_delta_falls_back(self):
+        self.publish(make_apps(5))
+        sync_apps_list()
+        apps = make_apps(6, '2.0')
+        self.publish(apps)
+        os.remove(os.path.join(self.server_folder, 'apps.delta', '2.json'))
+
+        self.assertEqual(sync_apps_list(), apps)
+        self.assertEqual(self.local_apps(), apps)
+
+    def test_revision_unavailable_falls_back(self):
+        apps = make_apps(5)
+        self.publish(apps)
+        for code in (403, 404, 500):
+            with self.subTest(code=code):
+                StaticHandler.errors = {'/apps.revision.json': code}
+                if os.path.exists(self.apps_file):
+                    os.remove(self.apps_file)
+                self.assertEqual(sync_apps_list(), apps)
+
+    def test_invalid_revision_falls_back(self):
+        apps = make_apps(5)
+        self.publish(apps)
+        revision_path = os.path.join(self.server_folder, 'apps.revision.json')
+        for content in ('<html>维护中</html>', '{"oldest": 1}', '[1]'):
+            with self.subTest(content=content):
+                with open(revision_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                if os.path.exists(self.apps_file):
+                    os.remove(self.apps_file)
+                self.assertEqual(sync_apps_list(), apps)
+
+    def test_missing_local_list_downloads_full_list(self):
+        apps = make_apps(5)
+        self.publish(apps)
+        sync_apps_list()
+        os.remove(self.apps_file)
+
+        self.assertEqual(sync_apps_list(), apps)
+        self.assertEqual(self.local_apps(), apps)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# coding: utf-8
+"""应用目录排序和分面索引的测试
+
+运行: python -m unittest discover tests
+"""
+import unittest
+
+from app.utils.catalog_store import (FACETS, UNCATEGORIZED, CatalogStore, SortKey, bits_to_positions, parse_date,
+                                     parse_size, parse_version, positions_to_bits)
+
+
+APPS = [
+    {'id': 'a', 'name': 'App 10', 'size': '1.5 MB', 'update_date': '2024-03-01', 'version': '1.9'},
+    {'id': 'b', 'name': 'app 2', 'size': 2048, 'update_date': '2024-05-01T08:00:00Z', 'version': 'v1.10.0'},
+    {'id': 'c', 'name': '微信', 'size': '2 GB', 'version': '3.9.12'},
+    {'id': 'd', 'name': 'Zip', 'size': 'unknown', 'update_date': '2023-12-31', 'version': ''},
+    {'id': 'e', 'name': 'App 10', 'size': '1.5MB', 'update_date': 1717200000, 'version': '1.9'},
+]
+
+
+def ids(store, positions):
+    return [store.ids[position] for position in positions]
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size(2048), 2048.0)
+        self.assertEqual(parse_size('1.5 MB'), 1.5 * 1024 ** 2)
+        self.assertEqual(parse_size('2gb'), 2 * 1024 ** 3)
+        self.assertEqual(parse_size('512'), 512.0)
+        self.assertIsNone(parse_size('unknown'))
+        self.assertIsNone(parse_size(True))
+        self.assertIsNone(parse_size(None))
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date(1717200000), 1717200000.0)
+        self.assertLess(parse_date('2024-03-01'), parse_date('2024-05-01T08:00:00Z'))
+        self.assertIsNone(parse_date('yesterday'))
+        self.assertIsNone(parse_date(''))
+
+    def test_parse_version(self):
+        self.assertEqual(parse_version('v1.10.2-beta'), (1, 10, 2))
+        self.assertGreater(parse_version('1.10'), parse_version('1.9'))
+        self.assertEqual(parse_version(None), ())
+
+
+class SortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CatalogStore(APPS)
+
+    def test_default_order(self):
+        self.assertEqual(ids(self.store, self.store.order()), ['a', 'b', 'c', 'd', 'e'])
+
+    def test_name_order(self):
+        # 数字按数值比较，不区分大小写，同名的应用保持原来的顺序
+        order = ids(self.store, self.store.order(SortKey.NAME))
+        self.assertLess(order.index('b'), order.index('a'))
+        self.assertLess(order.index('a'), order.index('e'))
+        self.assertLess(order.index('e'), order.index('d'))
+
+    def test_size_order(self):
+        # 从大到小，无法解析的排在最后，相同大小保持原来的顺序
+        self.assertEqual(ids(self.store, self.store.order(SortKey.SIZE)), ['c', 'a', 'e', 'b', 'd'])
+
+    def test_updated_order(self):
+        self.assertEqual(ids(self.store, self.store.order(SortKey.UPDATED)), ['e', 'b', 'a', 'd', 'c'])
+
+    def test_version_order(self):
+        self.assertEqual(ids(self.store, self.store.order(SortKey.VERSION)), ['c', 'b', 'a', 'e', 'd'])
+
+    def test_rank_matches_order(self):
+        for sort_key in SortKey:
+            order = self.store.order(sort_key)
+            ranks = self.store.rank(sort_key)
+            self.assertEqual(sorted(range(len(order)), key=ranks.__getitem__), order, sort_key)
+
+    def test_sort_subset(self):
+        for sort_key in SortKey:
+            subset = [4, 0, 3]
+            expected = [position for position in self.store.order(sort_key) if position in subset]
+            self.assertEqual(self.store.sort(subset, sort_key), expected, sort_key)
+
+    def test_snapshot_keeps_order(self):
+        restored = CatalogStore.from_snapshot(self.store.snapshot())
+        for sort_key in SortKey:
+            self.assertEqual(restored.order(sort_key), self.store.order(sort_key), sort_key)
+        self.assertEqual(restored.position('c'), 2)
+        self.assertEqual(dict(restored.apps[1]), APPS[1])
+
+    def test_incomplete_snapshot(self):
+        state = self.store.snapshot()
+        state['ids'] = state['ids'][:-1]
+        with self.assertRaises(ValueError):
+            CatalogStore.from_snapshot(state)
+
+
+FACET_APPS = [
+    {'id': 'game1', 'name': '游戏一', 'category': '游戏', 'tags': ['单机', '休闲'],
+     'download_url': 'https://example.com/game1.ZIP?x=1', 'publisher': 'A'},
+    {'id': 'game2', 'name': '游戏二', 'category': '游戏', 'tags': ['联网'], 'format': '7z', 'publisher': 'B'},
+    {'id': 'tool1', 'name': '工具一', 'category': '工具', 'tags': '单机',
+     'download_url': 'https://example.com/tool1.exe', 'publisher': 'A'},
+    {'id': 'misc', 'name': '未分类', 'tags': [None, ''], 'download_url': 'https://example.com/download'},
+    {'id': 'game3', 'name': '游戏三', 'category': '游戏', 'download_url': 'https://example.com/game3.zip'},
+]
+
+
+class FacetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CatalogStore(FACET_APPS)
+
+    def select(self, bits=None, **filters):
+        return ids(self.store, self.store.positions(self.store.select(bits, **filters)))
+
+    def test_bits_roundtrip(self):
+        for positions in ([], [0], [3, 7, 8, 200], list(range(17))):
+            self.assertEqual(bits_to_positions(positions_to_bits(positions, 201)), sorted(positions))
+
+    def test_facet_counts(self):
+        self.assertEqual(list(self.store.facet_counts('category').items()),
+                         [('游戏', 3), ('工具', 1), (UNCATEGORIZED, 1)])
+        self.assertEqual(self.store.facet_counts('tags'), {'单机': 2, '休闲': 1, '联网': 1})
+        # 格式未指定时取下载链接的扩展名，没有扩展名的不计入
+        self.assertEqual(self.store.facet_counts('format'), {'zip': 2, '7z': 1, 'exe': 1})
+        self.assertEqual(self.store.facet_counts('publisher'), {'A': 2, 'B': 1})
+
+    def test_facet_counts_within_bits(self):
+        games = self.store.select(category='游戏')
+        counts = self.store.facet_counts('format', games)
+        self.assertEqual(counts, {'zip': 2, '7z': 1})
+        self.assertNotIn('exe', counts)
+
+    def test_select(self):
+        self.assertEqual(self.select(), ['game1', 'game2', 'tool1', 'misc', 'game3'])
+        self.assertEqual(self.select(category='游戏'), ['game1', 'game2', 'game3'])
+        self.assertEqual(self.select(category=UNCATEGORIZED), ['misc'])
+        self.assertEqual(self.select(category='不存在'), [])
+
+    def test_select_any_of_values(self):
+        self.assertEqual(self.select(format=['7z', 'exe']), ['game2', 'tool1'])
+        self.assertEqual(self.select(tags=[]), [])
+
+    def test_select_all_facets(self):
+        self.assertEqual(self.select(category='游戏', tags='单机'), ['game1'])
+        self.assertEqual(self.select(publisher='A', format=['zip', 'exe']), ['game1', 'tool1'])
+        self.assertEqual(self.select(category='工具', format='zip'), [])
+
+    def test_select_within_bits(self):
+        bits = self.store.bits_of([1, 2, 4])
+        self.assertEqual(self.select(bits, category='游戏'), ['game2', 'game3'])
+
+    def test_snapshot_keeps_facets(self):
+        restored = CatalogStore.from_snapshot(self.store.snapshot())
+        for facet in FACETS:
+            self.assertEqual(restored.facet_counts(facet), self.store.facet_counts(facet))
+        self.assertEqual(restored.select(category='游戏', tags='单机'),
+                         self.store.select(category='游戏', tags='单机'))
+
+
+if __name__ == '__main__':
+    unittest.main()
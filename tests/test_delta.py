@@ -0,0 +1,195 @@
+# coding: utf-8
+"""增量更新的测试，包括失败后回退为完整下载的回归测试
+
+运行: python -m unittest discover tests
+"""
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from app.utils import delta as delta_module
+from app.utils.delta import DELTA_SUFFIX, DeltaDownloader, build_manifest
+from app.utils.downloader import (JOURNAL_SUFFIX, PART_SUFFIX, CancelToken, DownloadCancelled,
+                                  SegmentedDownloader)
+from app.utils.integrity import IntegrityError
+from app.utils.retry import RetryPolicy
+
+
+FILE_SIZE = 12 * 1024 * 1024
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """支持Range请求的静态文件服务，放慢发送速度以便在下载中途暂停"""
+
+    files = {}
+
+    def do_GET(self):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        start, end = 0, len(data) - 1
+        header = self.headers.get('Range')
+        if header:
+            first, _, last = header.removeprefix('bytes=').partition('-')
+            start, end = int(first), int(last) if last else len(data) - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', '"v2"')
+        self.end_headers()
+
+        try:
+            for offset in range(start, end + 1, 64 * 1024):
+                self.wfile.write(data[offset:min(offset + 64 * 1024, end + 1)])
+                time.sleep(0.002)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DeltaFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(8)
+        self.new_data = rng.randbytes(FILE_SIZE)
+        manifest = build_manifest_for(self.new_data)
+        manifest['sha256'] = '0' * 64  # 增量结果无法通过校验
+        RangeHandler.files = {
+            '/app.exe': self.new_data,
+            '/app.exe.blocks.json': json.dumps(manifest).encode(),
+        }
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+        self.folder = tempfile.mkdtemp()
+        self.save_path = os.path.join(self.folder, 'app_2.0.exe')
+        self.old_path = os.path.join(self.folder, 'app_1.0.exe')
+        with open(self.old_path, 'wb') as f:
+            f.write(self.new_data[:FILE_SIZE // 2] + rng.randbytes(FILE_SIZE // 2))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_failed_delta_keeps_paused_download(self):
+        url = f'{self.base_url}/app.exe'
+
+        # 完整下载进行到一半时暂停
+        token = CancelToken()
+
+        def pause(downloaded, total):
+            if downloaded >= FILE_SIZE // 4:
+                token.cancel(CancelToken.PAUSE)
+
+        paused = SegmentedDownloader(url, self.save_path, segments=2, progress_callback=pause, cancel_token=token)
+        with self.assertRaises(DownloadCancelled):
+            paused.run()
+        part_digest = file_digest(self.save_path + PART_SUFFIX)
+        with open(self.save_path + JOURNAL_SUFFIX, 'rb') as f:
+            journal = f.read()
+
+        # 继续时先尝试增量更新，失败后回退
+        delta = DeltaDownloader(url, f'{url}.blocks.json', self.old_path, self.save_path,
+                                retry_policy=RetryPolicy(max_attempts=1))
+        with self.assertRaises(IntegrityError):
+            delta.run()
+        self.assertFalse(os.path.exists(self.save_path + DELTA_SUFFIX))
+        self.assertEqual(file_digest(self.save_path + PART_SUFFIX), part_digest)
+        with open(self.save_path + JOURNAL_SUFFIX, 'rb') as f:
+            self.assertEqual(f.read(), journal)
+
+        # 完整下载从暂停的位置继续，结果与服务器上的文件一致
+        SegmentedDownloader(url, self.save_path, segments=2).run()
+        self.assertEqual(file_digest(self.save_path), hashlib.sha256(self.new_data).hexdigest())
+        self.assertFalse(os.path.exists(self.save_path + JOURNAL_SUFFIX))
+
+
+class DeltaSuccessTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(80)
+        self.new_data = rng.randbytes(FILE_SIZE)
+        RangeHandler.files = {
+            '/app.exe': self.new_data,
+            '/app.exe.blocks.json': json.dumps(build_manifest_for(self.new_data)).encode(),
+        }
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/app.exe'
+
+        self.folder = tempfile.mkdtemp()
+        self.save_path = os.path.join(self.folder, 'app_2.0.exe')
+        self.old_path = os.path.join(self.folder, 'app_1.0.exe')
+        self.rng = rng
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write_old(self, data):
+        with open(self.old_path, 'wb') as f:
+            f.write(data)
+
+    def run_delta(self):
+        delta = DeltaDownloader(self.url, f'{self.url}.blocks.json', self.old_path, self.save_path,
+                                retry_policy=RetryPolicy(max_attempts=1))
+        delta.run()
+        expected = hashlib.sha256(self.new_data).hexdigest()
+        self.assertEqual(delta.sha256, expected)
+        self.assertEqual(file_digest(self.save_path), expected)
+        self.assertFalse(os.path.exists(self.save_path + DELTA_SUFFIX))
+        return delta
+
+    def test_identical_file(self):
+        self.write_old(self.new_data)
+        delta = self.run_delta()
+        self.assertEqual(delta.reused_size, FILE_SIZE)
+        self.assertEqual(delta.fetched_size, 0)
+
+    def test_inserted_and_changed_data(self):
+        # 旧文件在中间多出一段数据（之后的数据块整体错位），另有一段内容不同
+        insert_at, change_at, change_size = 3 * 1024 * 1024, 8 * 1024 * 1024, 100 * 1000
+        self.write_old(self.new_data[:insert_at] + self.rng.randbytes(1000)
+                       + self.new_data[insert_at:change_at] + self.rng.randbytes(change_size)
+                       + self.new_data[change_at + change_size:])
+        # 放宽滚动查找的时间，机器较慢时也能找到全部错位的数据块
+        with mock.patch.object(delta_module, 'ROLLING_SCAN_TIME', 30):
+            delta = self.run_delta()
+        self.assertGreater(delta.reused_size, FILE_SIZE * 3 // 4)
+        self.assertLess(delta.fetched_size, FILE_SIZE // 4)
+        self.assertGreaterEqual(delta.fetched_size, change_size)
+
+
+def build_manifest_for(data):
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(data)
+    try:
+        return build_manifest(f.name)
+    finally:
+        os.remove(f.name)
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# coding: utf-8
+"""安装包缓存的测试
+
+运行: python -m unittest discover tests
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from app.utils.download_cache import DownloadCache
+
+
+class DownloadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = DownloadCache(os.path.join(self.folder, 'cache'), size_limit=1024 * 1024)
+        self.file_path = os.path.join(self.folder, 'app.exe')
+        self.data = os.urandom(200 * 1024)
+        with open(self.file_path, 'wb') as f:
+            f.write(self.data)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        self.target = os.path.join(self.folder, 'restored', 'app.exe')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_disabled_without_size_limit(self):
+        cache = DownloadCache(os.path.join(self.folder, 'other'))
+        cache.store(self.sha256, self.file_path)
+        self.assertFalse(cache.contains(self.sha256))
+
+    def test_store_and_restore(self):
+        self.cache.store(self.sha256, self.file_path, self.sha256)
+        self.assertTrue(self.cache.contains(self.sha256))
+        # 缓存是独立的副本，不与下载的文件共用数据
+        self.assertNotEqual(os.stat(self.cache.lookup(self.sha256)).st_ino, os.stat(self.file_path).st_ino)
+
+        self.assertEqual(self.cache.restore(self.sha256, self.target), self.sha256)
+        with open(self.target, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertNotEqual(os.stat(self.target).st_ino, os.stat(self.cache.lookup(self.sha256)).st_ino)
+
+    def test_modified_file_does_not_affect_cache(self):
+        self.cache.store(self.sha256, self.file_path, self.sha256)
+        with open(self.file_path, 'r+b') as f:
+            f.write(b'changed')
+        self.assertEqual(self.cache.restore(self.sha256, self.target), self.sha256)
+
+    def test_corrupted_object_is_discarded(self):
+        self.cache.store(self.sha256, self.file_path, self.sha256)
+        with open(self.cache.lookup(self.sha256), 'r+b') as f:
+            f.write(b'corrupt')
+
+        self.assertIsNone(self.cache.restore(self.sha256, self.target))
+        self.assertFalse(os.path.exists(self.target))
+        self.assertFalse(self.cache.contains(self.sha256))
+
+    def test_mismatched_hash_is_not_stored(self):
+        self.cache.store(self.sha256, self.file_path, '0' * 64)
+        self.assertFalse(self.cache.contains(self.sha256))
+
+    def test_file_changed_before_copy_is_not_stored(self):
+        stat = os.stat(self.file_path)
+        with open(self.file_path, 'ab') as f:
+            f.write(b'more')
+        self.cache.store(self.sha256, self.file_path, stat=(stat.st_size, stat.st_mtime_ns))
+        self.assertFalse(self.cache.contains(self.sha256))
+
+    def test_store_later(self):
+        self.cache.store_later(self.sha256, self.file_path, self.sha256)
+        deadline = time.monotonic() + 5
+        while not self.cache.contains(self.sha256) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.cache.contains(self.sha256))
+
+    def test_eviction(self):
+        cache = DownloadCache(os.path.join(self.folder, 'small'), size_limit=300 * 1024)
+        keys = []
+        for i in range(3):
+            path = os.path.join(self.folder, f'app{i}.exe')
+            with open(path, 'wb') as f:
+                f.write(os.urandom(120 * 1024))
+            keys.append(f'{i:064x}')
+            cache.store(keys[-1], path)
+        self.assertFalse(cache.contains(keys[0]))
+        self.assertTrue(cache.contains(keys[2]))
+        self.assertLessEqual(cache.total_size, 300 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+# coding: utf-8
+"""下载调度器的测试
+
+运行: python -m unittest discover tests
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.utils.download_scheduler import DownloadScheduler
+
+
+TIMEOUT = 5
+
+
+class Tasks:
+    """记录同时运行的任务数，任务一直运行到被放行"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = set()
+        self.started = []
+        self.max_running = 0
+        self.release = {}
+
+    def __call__(self, task_id):
+        event = self.release.setdefault(task_id, threading.Event())
+        with self.lock:
+            self.running.add(task_id)
+            self.started.append(task_id)
+            self.max_running = max(self.max_running, len(self.running))
+        event.wait(TIMEOUT)
+        with self.lock:
+            self.running.discard(task_id)
+
+    def finish(self, task_id):
+        self.release.setdefault(task_id, threading.Event()).set()
+
+    def finish_all(self):
+        for task_id in list(self.release):
+            self.finish(task_id)
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            with self.lock:
+                if condition():
+                    return True
+            time.sleep(0.005)
+        return False
+
+
+class DownloadSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = Tasks()
+
+    def tearDown(self):
+        self.tasks.finish_all()
+
+    def submit(self, scheduler, task_ids, priority=0):
+        for task_id in task_ids:
+            self.tasks.release.setdefault(task_id, threading.Event())
+            self.assertTrue(scheduler.submit(task_id, self.tasks, priority))
+
+    def test_concurrency_cap(self):
+        scheduler = DownloadScheduler(2)
+        self.submit(scheduler, range(6))
+        self.assertTrue(self.tasks.wait_for(lambda: len(self.tasks.running) == 2))
+        time.sleep(0.05)
+        self.assertEqual(len(self.tasks.running), 2)
+
+        # 每完成一个任务，排队的任务补上
+        for task_id in range(6):
+            self.tasks.wait_for(lambda: task_id in self.tasks.running)
+            self.tasks.finish(task_id)
+        self.assertTrue(self.tasks.wait_for(lambda: len(self.tasks.started) == 6 and not self.tasks.running))
+        self.assertEqual(self.tasks.max_running, 2)
+
+    def test_duplicate_submit(self):
+        scheduler = DownloadScheduler(1)
+        self.submit(scheduler, ['a', 'b'])
+        self.assertFalse(scheduler.submit('b', self.tasks))
+
+    def test_priority_order(self):
+        scheduler = DownloadScheduler(1)
+        self.submit(scheduler, ['first'])
+        self.assertTrue(self.tasks.wait_for(lambda: 'first' in self.tasks.running))
+        self.submit(scheduler, ['low1', 'low2'])
+        self.submit(scheduler, ['high'], priority=-1)
+
+        for task_id in ['first', 'high', 'low1', 'low2']:
+            self.assertTrue(self.tasks.wait_for(lambda: task_id in self.tasks.running))
+            self.tasks.finish(task_id)
+        self.assertEqual(self.tasks.started, ['first', 'high', 'low1', 'low2'])
+
+    def test_remove(self):
+        scheduler = DownloadScheduler(1)
+        self.submit(scheduler, ['a', 'b', 'c'])
+        self.assertTrue(self.tasks.wait_for(lambda: 'a' in self.tasks.running))
+
+        self.assertTrue(scheduler.is_queued('b'))
+        self.assertTrue(scheduler.remove('b'))
+        self.assertFalse(scheduler.is_queued('b'))
+        self.assertFalse(scheduler.remove('b'))
+        self.assertFalse(scheduler.remove('a'))  # 已开始的任务不在队列中
+
+        self.tasks.finish('a')
+        self.assertTrue(self.tasks.wait_for(lambda: 'c' in self.tasks.running))
+        self.tasks.finish('c')
+        time.sleep(0.05)
+        self.assertNotIn('b', self.tasks.started)
+
+    def test_set_max_concurrency(self):
+        scheduler = DownloadScheduler(1)
+        self.submit(scheduler, range(6))
+        self.assertTrue(self.tasks.wait_for(lambda: len(self.tasks.running) == 1))
+
+        scheduler.set_max_concurrency(3)
+        self.assertEqual(scheduler.max_concurrency, 3)
+        self.assertTrue(self.tasks.wait_for(lambda: len(self.tasks.running) == 3))
+
+        # 调低后正在运行的任务不受影响，完成后多余的线程退出
+        scheduler.set_max_concurrency(1)
+        for task_id in list(self.tasks.running):
+            self.tasks.finish(task_id)
+        self.assertTrue(self.tasks.wait_for(lambda: len(self.tasks.started) == 4))
+        time.sleep(0.05)
+        self.assertEqual(len(self.tasks.running), 1)
+        self.assertEqual(len(self.tasks.started), 4)
+
+    def test_failed_task_does_not_stop_worker(self):
+        scheduler = DownloadScheduler(1)
+        done = threading.Event()
+
+        def fail(task_id):
+            raise RuntimeError("失败")
+
+        with mock.patch('builtins.print'):
+            scheduler.submit('fail', fail)
+            scheduler.submit('ok', lambda task_id: done.set())
+            self.assertTrue(done.wait(TIMEOUT))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# coding: utf-8
+"""边下载边校验的测试
+
+运行: python -m unittest discover tests
+"""
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from app.utils.integrity import READ_SIZE, StreamingHasher, VerifiedFiles
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StreamingHasherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'app.exe.part')
+        self.rng = random.Random(6)
+        self.data = self.rng.randbytes(3 * READ_SIZE + 12345)
+        self.expected = hashlib.sha256(self.data).hexdigest()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def make_segments(self, count):
+        size = len(self.data) // count
+        segments = []
+        for i in range(count):
+            start = i * size
+            end = len(self.data) - 1 if i == count - 1 else start + size - 1
+            segments.append([start, end, start])
+        return segments
+
+    def download(self, hasher, segments, order):
+        """按 order 中分段的顺序逐块写入文件，模拟各分段交替完成"""
+        with open(self.path, 'r+b') as f:
+            for index in order:
+                segment = segments[index]
+                offset = segment[2]
+                data = self.data[offset:min(offset + CHUNK_SIZE, segment[1] + 1)]
+                f.seek(offset)
+                f.write(data)
+                f.flush()
+                segment[2] = offset + len(data)
+                hasher.feed(offset, data)
+
+    def chunk_order(self, segments, shuffle):
+        order = []
+        for index, (start, end, _) in enumerate(segments):
+            order.extend([index] * -(-(end - start + 1) // CHUNK_SIZE))
+        if shuffle:
+            self.rng.shuffle(order)
+        return order
+
+    def create_file(self):
+        with open(self.path, 'wb') as f:
+            f.truncate(len(self.data))
+
+    def test_sequential(self):
+        hasher = StreamingHasher(self.path)
+        for offset in range(0, len(self.data), CHUNK_SIZE):
+            hasher.feed(offset, self.data[offset:offset + CHUNK_SIZE])
+        self.assertEqual(hasher.finish(), self.expected)
+
+    def test_later_segments_finish_first(self):
+        self.create_file()
+        segments = self.make_segments(4)
+        hasher = StreamingHasher(self.path, segments)
+        # 后面的分段先全部完成，第一个分段最后完成
+        order = self.chunk_order(segments, shuffle=False)
+        order.sort(key=lambda index: -index)
+        self.download(hasher, segments, order)
+        self.assertEqual(hasher.finish(), self.expected)
+
+    def test_interleaved_segments(self):
+        self.create_file()
+        segments = self.make_segments(5)
+        hasher = StreamingHasher(self.path, segments)
+        self.download(hasher, segments, self.chunk_order(segments, shuffle=True))
+        self.assertEqual(hasher.offset, len(self.data))
+        self.assertEqual(hasher.finish(), self.expected)
+
+    def test_resumed_segments(self):
+        # 续传：文件中已有部分数据，哈希从文件开头补读
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        segments = self.make_segments(3)
+        for segment in segments:
+            segment[2] = segment[0] + (segment[1] - segment[0]) // 2
+        hasher = StreamingHasher(self.path, segments)
+        self.download(hasher, segments, self.chunk_order(
+            [[pos, end, pos] for _, end, pos in segments], shuffle=True))
+        self.assertEqual(hasher.finish(), self.expected)
+
+    def test_detects_corruption(self):
+        self.create_file()
+        segments = self.make_segments(2)
+        hasher = StreamingHasher(self.path, segments)
+        self.data = self.data[:100] + b'x' + self.data[101:]
+        self.download(hasher, segments, self.chunk_order(segments, shuffle=True))
+        self.assertNotEqual(hasher.finish(), self.expected)
+
+
+class VerifiedFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.records = VerifiedFiles(os.path.join(self.folder, 'verified.json'))
+        self.path = os.path.join(self.folder, 'app.exe')
+        with open(self.path, 'wb') as f:
+            f.write(b'data')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_record_and_modify(self):
+        self.records.record(self.path, 'AB' * 32)
+        self.assertTrue(self.records.is_verified(self.path, 'ab' * 32))
+        self.assertFalse(self.records.is_verified(self.path, 'cd' * 32))
+
+        with open(self.path, 'ab') as f:
+            f.write(b'more')
+        self.assertFalse(self.records.is_verified(self.path, 'ab' * 32))
+        self.assertTrue(self.records.has_record(self.path))
+
+        self.records.remove(self.path)
+        self.assertFalse(self.records.has_record(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
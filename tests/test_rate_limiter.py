@@ -0,0 +1,109 @@
+# coding: utf-8
+"""令牌桶限速器的测试，使用模拟的时钟，不实际等待
+
+运行: python -m unittest discover tests
+"""
+import threading
+import unittest
+from unittest import mock
+
+from app.utils import rate_limiter
+from app.utils.rate_limiter import TokenBucket
+
+
+class FakeTime:
+    """模拟 time 模块，sleep 直接推进时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeTime()
+        patch = mock.patch.object(rate_limiter, 'time', self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(0)
+        bucket.consume(10 ** 9)
+        self.assertEqual(self.clock.slept, 0)
+
+    def test_burst_is_one_second(self):
+        bucket = TokenBucket(1000)
+        bucket.consume(1000)  # 桶初始是满的
+        self.assertEqual(self.clock.slept, 0)
+        bucket.consume(500)
+        self.assertAlmostEqual(self.clock.slept, 0.5)
+
+    def test_idle_refill_is_capped(self):
+        bucket = TokenBucket(1000)
+        bucket.consume(1000)
+        self.clock.advance(10)  # 空闲很久也只积累一秒的令牌
+        bucket.consume(2000)
+        self.assertAlmostEqual(self.clock.slept, 1.0)
+
+    def test_average_rate(self):
+        bucket = TokenBucket(64 * 1024)
+        start = self.clock.now
+        for _ in range(100):
+            bucket.consume(16 * 1024)
+        # 共 1600KB，第一秒的 64KB 来自初始令牌
+        self.assertAlmostEqual(self.clock.now - start, (1600 - 64) / 64)
+
+    def test_oversized_chunk(self):
+        bucket = TokenBucket(1000)
+        bucket.consume(3000)  # 一次超过桶容量，欠账按速度还清
+        self.assertAlmostEqual(self.clock.slept, 2.0)
+
+    def test_set_rate(self):
+        bucket = TokenBucket(0)
+        bucket.consume(10 ** 6)
+        # 从不限速切换过来时桶是空的，不会先放过一秒的流量
+        bucket.set_rate(1000)
+        self.assertEqual(bucket.rate, 1000)
+        bucket.consume(1000)
+        self.assertAlmostEqual(self.clock.slept, 1.0)
+
+        bucket.set_rate(0)
+        bucket.consume(10 ** 6)
+        self.assertAlmostEqual(self.clock.slept, 1.0)
+
+    def test_lowering_rate_drops_extra_tokens(self):
+        bucket = TokenBucket(10000)
+        bucket.set_rate(1000)
+        bucket.consume(2000)
+        self.assertAlmostEqual(self.clock.slept, 1.0)
+
+    def test_cancel(self):
+        bucket = TokenBucket(1000)
+        event = threading.Event()
+        event.set()
+        bucket.consume(10 ** 6, event)
+        self.assertEqual(self.clock.slept, 0)
+
+    def test_sleeps_in_slices(self):
+        bucket = TokenBucket(1000)
+        sleeps = []
+        original = self.clock.sleep
+        self.clock.sleep = lambda seconds: (sleeps.append(seconds), original(seconds))
+        bucket.consume(1500)
+        self.assertTrue(sleeps)
+        self.assertLessEqual(max(sleeps), rate_limiter.SLEEP_SLICE + 1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
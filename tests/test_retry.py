@@ -0,0 +1,125 @@
+# coding: utf-8
+"""重试策略的测试
+
+运行: python -m unittest discover tests
+"""
+import threading
+import time
+import unittest
+from email.utils import formatdate
+
+import requests
+
+from app.utils.retry import MAX_RETRY_AFTER, RetryPolicy, TransientError, call_with_retry
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status}", response=response)
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_retryable_errors(self):
+        policy = RetryPolicy()
+        for error in (TransientError(), requests.ConnectionError(), requests.ReadTimeout(),
+                      requests.exceptions.ChunkedEncodingError(), ConnectionResetError(),
+                      http_error(429), http_error(503)):
+            self.assertTrue(policy.is_retryable(error), error)
+        for error in (http_error(404), http_error(403), ValueError(), requests.HTTPError("no response")):
+            self.assertFalse(policy.is_retryable(error), error)
+
+    def test_exponential_backoff_with_jitter(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+        for attempt, limit in ((1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)):
+            for _ in range(50):
+                delay = policy.get_delay(attempt)
+                self.assertGreaterEqual(delay, limit / 2)
+                self.assertLessEqual(delay, limit)
+
+    def test_retry_after_seconds(self):
+        policy = RetryPolicy(max_delay=1.0)
+        self.assertEqual(policy.get_delay(1, http_error(503, {'Retry-After': '7'})), 7.0)
+        self.assertEqual(policy.get_delay(1, http_error(429, {'Retry-After': '100000'})), MAX_RETRY_AFTER)
+
+    def test_retry_after_date(self):
+        policy = RetryPolicy()
+        error = http_error(503, {'Retry-After': formatdate(time.time() + 20, usegmt=True)})
+        self.assertAlmostEqual(policy.get_delay(1, error), 20, delta=1.5)
+        past = http_error(503, {'Retry-After': formatdate(time.time() - 60, usegmt=True)})
+        self.assertEqual(policy.get_delay(1, past), 0.0)
+
+    def test_invalid_retry_after_uses_backoff(self):
+        policy = RetryPolicy(base_delay=1.0)
+        delay = policy.get_delay(1, http_error(503, {'Retry-After': 'soon'}))
+        self.assertTrue(0.5 <= delay <= 1.0)
+
+    def test_max_attempts_at_least_one(self):
+        self.assertEqual(RetryPolicy(max_attempts=0).max_attempts, 1)
+
+    def test_sleep_cancelled(self):
+        event = threading.Event()
+        event.set()
+        self.assertFalse(RetryPolicy().sleep(10, event))
+        self.assertTrue(RetryPolicy().sleep(0, threading.Event()))
+
+
+class CallWithRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+    def test_succeeds_after_transient_errors(self):
+        calls = []
+        retries = []
+
+        def func():
+            calls.append(1)
+            if len(calls) < 3:
+                raise TransientError()
+            return 'ok'
+
+        result = call_with_retry(func, self.policy, retry_callback=lambda *args: retries.append(args))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(retries, [(2, 3), (3, 3)])
+
+    def test_gives_up_after_max_attempts(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise TransientError()
+
+        with self.assertRaises(TransientError):
+            call_with_retry(func, self.policy)
+        self.assertEqual(len(calls), 3)
+
+    def test_does_not_retry_permanent_errors(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise http_error(404)
+
+        with self.assertRaises(requests.HTTPError):
+            call_with_retry(func, self.policy)
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelled_while_waiting(self):
+        event = threading.Event()
+        event.set()
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise TransientError()
+
+        with self.assertRaises(TransientError):
+            call_with_retry(func, RetryPolicy(max_attempts=5, base_delay=10), event)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
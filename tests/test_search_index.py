@@ -0,0 +1,91 @@
+# coding: utf-8
+"""搜索索引保存和恢复的测试
+
+运行: python -m unittest discover tests
+"""
+import marshal
+import unittest
+
+from app.utils.search_index import SEPARATOR, SearchIndex, _query_grams, normalize
+
+
+QUERIES = ['微信', '音乐', 'player', 'ply', 'weixin', 'wx', 'tool 1', '新增', 'changed']
+FUZZY_QUERIES = ['playr', 'ofice', 'changd']
+
+
+def make_entries(count):
+    names = ['微信', '音乐播放器', 'Player', 'Office Tool']
+    return {
+        f'id{i}': (f'{names[i % len(names)]} {i}', f'描述{i % 7}', ('weixin', 'wx') if i % 4 == 0 else ())
+        for i in range(count)
+    }
+
+
+def round_trip(index):
+    restored = SearchIndex()
+    restored.restore(marshal.loads(marshal.dumps(index.state())))
+    return restored
+
+
+class SearchIndexStateTest(unittest.TestCase):
+
+    def assertSameResults(self, index, expected):
+        for query in QUERIES:
+            self.assertEqual(index.search(query), expected.search(query), query)
+        for query in FUZZY_QUERIES:
+            self.assertEqual(index.fuzzy_search(query), expected.fuzzy_search(query), query)
+
+    def test_restore(self):
+        entries = make_entries(500)
+        index = SearchIndex()
+        index.update(entries)
+
+        restored = round_trip(index)
+        self.assertEqual(len(restored), len(index))
+        self.assertFalse(restored.update(entries))
+        self.assertSameResults(restored, index)
+
+    def test_update_after_restore(self):
+        entries = make_entries(500)
+        index = SearchIndex()
+        index.update(entries)
+        restored = round_trip(index)
+
+        # 少量条目删除、修改和新增，增量更新后再保存和恢复一次
+        for i in range(0, 500, 25):
+            del entries[f'id{i}']
+        for i in range(1, 500, 31):
+            entries[f'id{i}'] = ('Changed Player', '', ())
+        for i in range(500, 510):
+            entries[f'id{i}'] = ('新增应用', '', ('xinzeng',))
+        self.assertTrue(restored.update(entries))
+        restored = round_trip(restored)
+        self.assertFalse(restored.update(entries))
+
+        expected = SearchIndex()
+        expected.update(entries)
+        self.assertSameResults(restored, expected)
+
+
+class ShortQueryTest(unittest.TestCase):
+
+    def test_short_queries_use_index(self):
+        for query in ('wx', 'a1', '微信', '微', 'q音'):
+            self.assertIsNotNone(_query_grams(query), query)
+        self.assertIsNone(_query_grams('w'))
+
+    def test_short_queries_match_scan(self):
+        entries = make_entries(300)
+        index = SearchIndex()
+        index.update(entries)
+        texts = {
+            key: SEPARATOR.join([normalize(name), normalize(description), *map(normalize, aliases)])
+            for key, (name, description, aliases) in entries.items()
+        }
+        for query in ('wx', 'WX', 'er', '12', '微信', '乐播', 'r 1', 'w', '1'):
+            expected = {key for key, text in texts.items() if normalize(query) in text}
+            self.assertEqual(index.search(query), expected, query)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ args = [
     "--windows-console-mode=disable",  # force显示控制台 disable不显示控制台
     "--enable-plugin=pyqt5",
     "--include-qt-plugins=sensible,sqldrivers",
+    "--include-package-data=pypinyin",  # pypinyin 运行时读取的拼音字典数据
     "--assume-yes-for-downloads",
     "--mingw64",  # Use MinGW
     "--show-memory",